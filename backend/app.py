@@ -4,22 +4,37 @@ eventlet.monkey_patch()
 
 import os
 import json
-import random
 import time
-import copy
 import logging
 from datetime import datetime, timedelta
-from threading import Lock
 
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_, desc
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from sqlalchemy import or_, and_, case, desc, select, union_all
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_socketio import SocketIO, join_room, leave_room, emit, disconnect
+from flask_socketio import SocketIO, join_room, leave_room, rooms, emit
 
-from models import db, User, Game, GameMode
+from models import db, User, Game, GameMode, Move
 import game_data
+from matchmaking import Matchmaker, MatchQueue, TicketStatus, GAME_MODES
+from matchmaking_store import create_matchmaking_store
+from dictionary import get_dictionary, turkish_upper
+from socketio_queue import socketio_queue_options
+from game_cache import (create_game_store, game_boards, remember_boards, GameResyncRequired,
+                        FLUSH_INTERVAL_SECONDS)
+from game_history import (MOVE_DEAL, MOVE_RESIGN, game_record, snapshot_row, move_to_dict,
+                          reconstruct_game_record)
+from game_state import (bump_state_version, serialize_game_state, player_game_state, build_move_delta,
+                        player_move_delta, player_room)
+from board import BOARD_SIZE
+from scoring import score_words
+from board_layouts import default_layout_id, get_layout
+from migrations import upgrade as upgrade_database
+from letter_bag import LetterBag, draw_balanced_rack
+from game_templates import GameTemplatePool, DEFAULT_POOL_SIZE, REFILL_INTERVAL_SECONDS
+from ttl_cache import TTLCache
+from word_validator import check_word_placement, PlacementValidationResult, ValidationStatus, FoundWord
 
 # ARTIK BUNUNLA BAŞLAT
 # python app.py
@@ -35,27 +50,171 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get('DATABASE_URL', "mysql+pymysql://root@127.0.0.1/yazlab2_2")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Oturum anahtarlarını imzalar; birden fazla worker aynı SECRET_KEY ile çalışmalıdır
+app.config["SECRET_KEY"] = os.environ.get('SECRET_KEY') or os.urandom(32).hex()
 
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 db.init_app(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
-
-waiting_players = {
-    "TWO_MIN": [],
-    "FIVE_MIN": [],
-    "TWELVE_HOUR": [],
-    "TWENTYFOUR_HOUR": []
-}
-
-cancel_flags = {}
-matched_players = {}
-lock = Lock()
+# Birden fazla worker için SOCKETIO_MESSAGE_QUEUE=redis://... (bkz. socketio_queue.py)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet',
+                    **socketio_queue_options(os.environ.get('SOCKETIO_MESSAGE_QUEUE')))
 
 logger = logging.getLogger(__name__)
 
-TURKISH_VOWELS = "AEIİOÖUÜ"
-REWARD_PUNISHMENT_BOARD = game_data.reward_punishment_board
 LETTER_SCORES = {letter: data['score'] for letter, data in game_data.remaining_letters.items()}
+MATCHMAKING_TIMEOUT_SECONDS = 15  # Rakip arama süresi
+SESSION_TOKEN_MAX_AGE = 30 * 24 * 3600  # /login'in verdiği oturum anahtarının geçerlilik süresi (saniye)
+COMPLETED_GAMES_PAGE_SIZE = 20  # /completed-games varsayılan sayfa boyu
+COMPLETED_GAMES_MAX_PAGE_SIZE = 100
+ACTIVE_GAMES_PAGE_SIZE = 50  # /active-games varsayılan sayfa boyu
+ACTIVE_GAMES_MAX_PAGE_SIZE = 100
+# Kullanıcı başına aktif oyun listesi önbelleği. Oyun oluşturma ve bitişte bu worker'da hemen silinir; diğer
+# worker'larda en fazla ACTIVE_GAMES_CACHE_TTL saniye eski kalabilir.
+active_games_cache = TTLCache(ttl=float(os.environ.get('ACTIVE_GAMES_CACHE_TTL', 30)),
+                              max_entries=int(os.environ.get('ACTIVE_GAMES_CACHE_SIZE', 10000)))
+# Kullanıcı profilleri (id -> kullanıcı adı, puan). Kullanıcı adını veya total_points'i değiştiren kod
+# user_profiles_changed(user_id) çağırmalıdır (oyun bitişi forget_active_game üzerinden çağırır); diğer
+# worker'larda eski profil en fazla USER_PROFILE_CACHE_TTL saniye görülür.
+user_profile_cache = TTLCache(ttl=float(os.environ.get('USER_PROFILE_CACHE_TTL', 300)),
+                              max_entries=int(os.environ.get('USER_PROFILE_CACHE_SIZE', 50000)))
+USERS_MAX_IDS = 100  # /users?ids=... tek istekte en fazla kullanıcı
+# /login'in verdiği oturum anahtarı; Socket.IO bağlantısı bu anahtarla kimliğini doğrular
+session_tokens = URLSafeTimedSerializer(app.config["SECRET_KEY"], salt='session')
+# sid -> bağlantının doğrulanmış kullanıcısı. Bağlantı hangi worker'daysa olayları da orada işlenir.
+socket_users = {}
+
+
+def get_active_opponents(user_id):
+    """Kullanıcının aktif oyunu olan tüm rakiplerini tek sorguda döndürür."""
+    rows = db.session.query(Game.user1, Game.user2).filter(
+        or_(Game.user1 == user_id, Game.user2 == user_id),
+        Game.status == 'active'
+    ).all()
+    return {user2 if user1 == user_id else user1 for user1, user2 in rows}
+
+
+def get_user_rating(user_id):
+    """Eşleştirmede kullanılan puan (User.total_points)."""
+    total_points = db.session.query(User.total_points).filter(User.id == user_id).scalar()
+    return total_points or 0
+
+
+# MATCHMAKING_STORE=redis://... ile birden fazla worker aynı kuyrukları paylaşır (varsayılan: bellek içi)
+matchmaker = Matchmaker(store=create_matchmaking_store())
+matchmaking_sweeper_started = False
+MATCHMAKING_SWEEP_INTERVAL = 1  # Genişleyen puan pencerelerini kontrol etme aralığı (saniye)
+
+
+def matchmaking_sweeper():
+    """Bekleyenlerin puan penceresi zamanla genişler; artık uyuşan çiftleri periyodik olarak eşleştirir."""
+    while True:
+        socketio.sleep(MATCHMAKING_SWEEP_INTERVAL)
+        try:
+            for mode in GAME_MODES:
+                for ticket, opponent_ticket in matchmaker.sweep(mode):
+                    finalize_match(ticket, opponent_ticket)
+        except Exception as e:
+            logger.error(f"Eşleştirme taraması sırasında hata: {e}", exc_info=True)
+
+
+def ensure_matchmaking_sweeper():
+    global matchmaking_sweeper_started
+    if not matchmaking_sweeper_started:
+        matchmaking_sweeper_started = True
+        socketio.start_background_task(matchmaking_sweeper)
+
+
+# Eşleşen çiftlerin oyunları eşleşmeyi bulan istekte değil, bu kuyruktan bir worker ile toplu oluşturulur
+match_queue = MatchQueue()
+match_persister_started = False
+MATCH_PERSIST_BATCH = int(os.environ.get('MATCH_PERSIST_BATCH', 32))  # Tek commit'te oluşturulan en fazla oyun
+
+
+def match_persister():
+    """Kuyruktaki çiftlerin oyunlarını oluşturur ve oyuncuları bilgilendirir."""
+    while True:
+        pairs = match_queue.take_batch(MATCH_PERSIST_BATCH)
+        try:
+            with app.app_context():
+                persist_matches(pairs)
+        except Exception as e:
+            logger.error(f"Eşleşen oyunlar kaydedilirken hata: {e}", exc_info=True)
+            for ticket, opponent_ticket in pairs:
+                matchmaker.fail(ticket, opponent_ticket)
+
+
+def ensure_match_persister():
+    global match_persister_started
+    if not match_persister_started:
+        match_persister_started = True
+        socketio.start_background_task(match_persister)
+
+
+# Aktif oyunların yetkili kopyası bellekte; veritabanına arka planda yazılır (GAME_CACHE=0 ile kapatılır)
+game_store = create_game_store()
+game_store_started = False
+
+
+def game_store_flusher():
+    """Önbellekteki kaydedilmemiş hamleleri periyodik olarak veritabanına yazar."""
+    while True:
+        socketio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            with app.app_context():
+                game_store.flush()
+        except Exception as e:
+            logger.error(f"Oyun önbelleği veritabanına yazılırken hata: {e}", exc_info=True)
+
+
+@app.errorhandler(GameResyncRequired)
+def game_resync_required(error):
+    """Oyunun önbellekteki kopyası veritabanıyla çakıştı (bkz. game_cache.py): oyunda işlem yapılmaz."""
+    logger.error(f"Oyun {error.game_id} eşitleme bekliyor, istek reddedildi.")
+    return jsonify({"message": "Oyun durumu eşitleniyor, lütfen daha sonra tekrar deneyin.",
+                    "game_id": error.game_id}), 409
+
+
+def ensure_game_store():
+    """İlk kullanımda günlükte kalan hamleleri kurtarır ve yazma görevini başlatır (app context içinde)."""
+    global game_store_started
+    if not game_store_started:
+        game_store_started = True
+        game_store.recover()
+        socketio.start_background_task(game_store_flusher)
+
+
+def create_game_template():
+    """Yeni oyunun başlangıç verisi: iki oyuncunun eli, kalan torba ve gizli tahta."""
+    letter_result = distribute_letters_from_json(game_data.remaining_letters)
+    return {
+        "user1_letters": letter_result["user1_letters"],
+        "user2_letters": letter_result["user2_letters"],
+        "remaining_letters": letter_result["remaining_letters"],
+        "hidden_board": game_data.generate_hidden_board(),
+    }
+
+
+# Eşleşmede şablon havuzdan alınır; havuz arka planda doldurulur (GAME_TEMPLATE_POOL_SIZE=0 ile kapatılır)
+game_template_pool = GameTemplatePool(create_game_template,
+                                      capacity=int(os.environ.get('GAME_TEMPLATE_POOL_SIZE', DEFAULT_POOL_SIZE)))
+game_template_refiller_started = False
+
+
+def game_template_refiller():
+    """Alınan şablonların yerine yenilerini üretir (her şablondan sonra diğer işlere sıra verir)."""
+    while True:
+        try:
+            game_template_pool.refill(pause=socketio.sleep)
+        except Exception as e:
+            logger.error(f"Oyun şablonu üretilirken hata: {e}", exc_info=True)
+        socketio.sleep(REFILL_INTERVAL_SECONDS)
+
+
+def ensure_game_template_refiller():
+    global game_template_refiller_started
+    if not game_template_refiller_started:
+        game_template_refiller_started = True
+        socketio.start_background_task(game_template_refiller)
 
 
 @app.route('/register', methods=['POST', 'OPTIONS'])
@@ -124,7 +283,8 @@ def login():
             return jsonify({"message": "Geçersiz şifre"}), 401
 
         logger.info(f"Başarılı giriş: {username}")
-        return jsonify({"message": "Giriş başarılı", "user_id": user.id}), 200
+        return jsonify({"message": "Giriş başarılı", "user_id": user.id,
+                        "token": session_tokens.dumps(user.id)}), 200
     except Exception as e:
         logger.error(f"Login sırasında hata: {e}")
         return jsonify({"message": "Giriş sırasında bir hata oluştu"}), 500
@@ -132,7 +292,6 @@ def login():
 
 @app.route('/find-opponent', methods=['POST'])
 def find_opponent():
-    remaining_time = None
     data = request.get_json()
     if not data:
         logger.warning("find_opponent: İstek gövdesinde JSON verisi eksik.")
@@ -146,293 +305,290 @@ def find_opponent():
         logger.warning(f"find_opponent: Geçersiz veya eksik parametre: {e} - Veri: {data}")
         return jsonify({"message": "Geçersiz veya eksik parametre."}), 400
 
-    # Oyun süresine göre bitiş zamanını hesapla
-    try:
-        match game_duration:
-            case "TWO_MIN":
-                remaining_time = datetime.utcnow() + timedelta(minutes=2)
-            case "FIVE_MIN":
-                remaining_time = datetime.utcnow() + timedelta(minutes=5)
-            case "TWELVE_HOUR":
-                remaining_time = datetime.utcnow() + timedelta(hours=12)
-            case "TWENTYFOUR_HOUR":
-                remaining_time = datetime.utcnow() + timedelta(hours=24)
-            case _:
-                logger.warning(f"Geçersiz game_duration: {game_duration}"); return jsonify(
-                    {"message": "Geçersiz oyun süresi."}), 400
-    except NameError:
-        logger.error("datetime veya timedelta import edilmemiş!")
-        return jsonify({"message": "Sunucu yapılandırma hatası."}), 500
-    except Exception as e:
-        logger.error(f"Zaman hesaplama hatası: {e}")
-        return jsonify({"message": "Oyun süresi işlenirken hata."}), 500
-
-    if game_duration not in waiting_players:
+    if not matchmaker.is_valid_mode(game_duration):
         logger.warning(f"Desteklenmeyen game_duration alındı: {game_duration}")
         return jsonify({"message": f"Geçersiz oyun süresi belirtildi: {game_duration}"}), 400
 
-    # Kullanıcıyı kuyruğa ekle
-    with lock:
-        if user_id not in waiting_players[game_duration]:
-            waiting_players[game_duration].append(user_id)
-            logger.info(f"Kullanıcı {user_id}, {game_duration} kuyruğuna eklendi.")
-        else:
-            # Kullanıcı zaten kuyruktaysa, belki mevcut arama isteğini sonlandırıp yeni timeout başlatmak gerekir?
-            # Şimdilik sadece logluyoruz. Dikkat: Bu durum client'ta çift arama isteğine neden olabilir.
-            logger.info(f"Kullanıcı {user_id} zaten {game_duration} kuyruğunda bekliyor.")
-        cancel_flags[user_id] = False  # Her yeni aramada iptal bayrağını sıfırla
-
-    timeout_seconds = 15  # Rakip arama süresi
-    start_time = time.time()
-
     try:
-        while time.time() < start_time + timeout_seconds:
-            opponent_id = None
-            opponent_index = -1
-            my_index = -1
-            found_match_in_loop = False
-
-            # 1. Önceden eşleşme kontrolü (Başka bir istek tarafından eşleştirildiyse)
-            with lock:
-                if user_id in matched_players:
-                    game_id, opponent_id = matched_players.pop(user_id)
-                    # İptal bayrağını da temizleyelim (artık gereksiz)
-                    cancel_flags.pop(user_id, None)
-                    logger.info(
-                        f"Kullanıcı {user_id} için eşleşme bulundu (önceden eşleşmiş): {opponent_id}, GameID: {game_id}")
-                    return jsonify({"opponentFound": True, "game_id": game_id, "opponent_id": opponent_id}), 200
-
-            # 2. Rakip arama ve aktif oyun kontrolü
-            with lock:
-                # 2a. İptal Kontrolü
-                if cancel_flags.get(user_id):
-                    logger.info(f"Kullanıcı {user_id} aramayı iptal etti ({game_duration}).")
-                    # Kuyruktan güvenli çıkarma
-                    try:
-                        waiting_players[game_duration].remove(user_id)
-                    except ValueError:
-                        logger.warning(f"İptal eden kullanıcı {user_id} kuyrukta bulunamadı.")
-                    cancel_flags.pop(user_id, None)
-                    return jsonify({"opponentFound": False, "cancelled": True}), 200
-
-                current_queue = waiting_players[game_duration]
-                # Kendi index'imizi bulalım (her döngüde tekrar bulmak gerekebilir, liste değişmiş olabilir)
-                try:
-                    my_index = current_queue.index(user_id)
-                except ValueError:
-                    # Eğer kullanıcı listeden çıkarıldıysa (başka bir thread eşleştirdi veya iptal ettiyse)
-                    logger.warning(f"Kullanıcı {user_id} döngü içinde kuyrukta bulunamadı.")
-                    break  # While döngüsünden çık, timeout'a gitsin veya matched_players ile yakalanır
-
-                # 2b. Kuyruktaki Diğerlerini Kontrol Et
-                for i, potential_opponent_id in enumerate(current_queue):
-                    # Kendimiz değilse ve iptal etmemişse
-                    if i != my_index and not cancel_flags.get(potential_opponent_id):
-                        logger.debug(
-                            f"{user_id} potansiyel rakip buldu: {potential_opponent_id}. Aktif oyun kontrol ediliyor...")
-
-                        # --- Aktif Oyun Sorgusu ---
-                        existing_active_game = Game.query.filter(
-                            or_(
-                                (Game.user1 == user_id) & (Game.user2 == potential_opponent_id),
-                                (Game.user1 == potential_opponent_id) & (Game.user2 == user_id)
-                            ),
-                            Game.status == 'active'
-                        ).first()
-                        # --- Sorgu Sonu ---
-
-                        if existing_active_game:
-                            # Aktif oyun VARSA: Bu rakibi atla, logla ve for döngüsüne devam et
-                            logger.info(
-                                f"User {user_id} ve {potential_opponent_id} arasında zaten aktif oyun var (ID: {existing_active_game.id}). Rakip atlanıyor.")
-                            continue  # Bir sonraki potansiyel rakibe geç
-                        else:
-                            # Aktif oyun YOKSA: Bu rakiple eşleşebiliriz!
-                            opponent_id = potential_opponent_id
-                            opponent_index = i
-                            found_match_in_loop = True
-                            logger.info(f"Aktif oyun yok. {user_id} ile {opponent_id} eşleşti.")
-                            break  # Rakip bulundu, for döngüsünden çık
-                # --- Rakip Arama For Döngüsü Sonu ---
-
-                # 2c. Eşleşme Bulunduysa Yeni Oyun Oluştur
-                if found_match_in_loop:
-                    # İki oyuncuyu da kuyruktan güvenli şekilde çıkar
-                    try:
-                        # Önce yüksek index'i silmek sorun çıkarmaz
-                        idx1, idx2 = sorted([my_index, opponent_index], reverse=True)
-                        del current_queue[idx1]
-                        del current_queue[idx2]
-                        logger.info(f"Kullanıcılar {user_id} ve {opponent_id}, {game_duration} kuyruğundan çıkarıldı.")
-                    except IndexError:
-                        logger.error(
-                            f"find_opponent: Kuyruktan silerken Index Hatası! user={user_id}({my_index}), opp={opponent_id}({opponent_index}), queue={current_queue}")
-                        continue  # While döngüsünün başına dön, tekrar dene
-
-                    # --- Yeni Oyun Oluşturma ---
-                    try:
-                        gamemode = GameMode[game_duration.upper()]
-                        # Harf dağıtımı (doğru fonksiyonu çağırır ve Python objeleri döner)
-                        letter_result = distribute_letters_from_json(game_data.remaining_letters)
-                        # Gizli tahta oluştur (doğru fonksiyonu çağırır ve dict döner)
-                        hidden_board_dict = game_data.generate_hidden_board()
-
-                        new_game = Game(
-                            user1=user_id, user2=opponent_id,
-                            reward_punishment_board=game_data.reward_punishment_board,  # Direkt dict
-                            game_board={},  # Boş dict
-                            hidden_board=hidden_board_dict,  # Direkt dict
-                            user1_rewards=[], user2_rewards=[],  # Boş liste
-                            score1=0, score2=0, turn_order=user_id,
-                            remaining_letters=letter_result["remaining_letters"],  # Direkt dict
-                            gamemode=gamemode, created_at=datetime.utcnow(),
-                            remaining_time=remaining_time,
-                            user1_letters=letter_result["user1_letters"],  # Direkt liste
-                            user2_letters=letter_result["user2_letters"],  # Direkt liste
-                            status='active'
-                        )
-                        db.session.add(new_game)
-                        db.session.commit()
-                        game_id_to_return = new_game.id
-                        logger.info(
-                            f"Yeni oyun {game_id_to_return} oluşturuldu. User1={user_id}, User2={opponent_id}. İlk sıra: User {new_game.turn_order}")
-
-                        # Eşleşenleri kaydet
-                        matched_players[user_id] = (game_id_to_return, opponent_id)
-                        matched_players[opponent_id] = (game_id_to_return, user_id)
-                        # İptal bayraklarını temizle
-                        cancel_flags.pop(user_id, None);
-                        cancel_flags.pop(opponent_id, None)
-
-                        # Başarılı yanıtı döndür
-                        return jsonify(
-                            {"opponentFound": True, "game_id": game_id_to_return, "opponent_id": opponent_id}), 200
-
-                    except KeyError as e:  # GameMode hatası
-                        logger.error(f"Geçersiz gamemode key: {game_duration} - {e}");
-                        # Oyuncuları geri eklemek yerine direkt hata dönelim, client tekrar dener.
-                        return jsonify({"message": "Geçersiz oyun modu."}), 400
-                    except Exception as create_err:
-                        logger.error(f"Yeni oyun oluşturma sırasında hata: {create_err}", exc_info=True)
-                        db.session.rollback()  # Hata olursa rollback yap
-                        # Oyuncuları geri eklemek yerine direkt hata dönelim.
-                        return jsonify({"message": "Oyun oluşturma hatası."}), 500
-                    # --- Yeni Oyun Oluşturma Sonu ---
-
-            # Kilit dışı bekleme (lock bloğu burada biter)
-            if not found_match_in_loop:  # Eğer bu turda eşleşme olmadıysa veya tüm rakipler atlandıysa
-                time.sleep(1)  # 1 saniye bekle ve while döngüsüne devam et
-            # else: Eşleşme oldu ve return yapıldıysa burası çalışmaz.
-
-        # --- While Döngüsü Bitti (Timeout) ---
-        logger.info(f"{user_id} için timeout (find_opponent).")
-        with lock:  # Kuyruktan ve bayraktan temizle
-            if user_id in waiting_players[game_duration]:
-                try:
-                    waiting_players[game_duration].remove(user_id)
-                except ValueError:
-                    pass
-            cancel_flags.pop(user_id, None)
+        # Kullanıcıyı kuyruğa ekle; kuyrukta uygun rakip varsa hemen eşleşir
+        # Aktif oyun kontrolü kuyruk kilidi alınmadan önce tek sorguyla yapılır
+        ensure_matchmaking_sweeper()
+        ensure_game_template_refiller()
+        ticket, opponent_ticket = matchmaker.join(user_id, game_duration,
+                                                  excluded_opponents=get_active_opponents(user_id),
+                                                  rating=get_user_rating(user_id))
+        # Beklerken veritabanı bağlantısı tutulmaz; oyunu oluşturan worker havuzda bağlantı bulabilmeli
+        db.session.close()
+
+        if opponent_ticket is not None:
+            finalize_match(ticket, opponent_ticket)
+
+        # Eşleşme, iptal veya zaman aşımına kadar bekle (Event ile uyandırılır)
+        ticket = matchmaker.wait(ticket, MATCHMAKING_TIMEOUT_SECONDS)
+
+        if ticket.status == TicketStatus.Matched:
+            logger.info(f"Kullanıcı {user_id} için eşleşme bulundu: {ticket.opponent_id}, GameID: {ticket.game_id}")
+            return jsonify({"opponentFound": True, "game_id": ticket.game_id, "opponent_id": ticket.opponent_id}), 200
+        if ticket.status == TicketStatus.Cancelled:
+            return jsonify({"opponentFound": False, "cancelled": True}), 200
+        if ticket.status == TicketStatus.Failed:
+            return jsonify({"message": "Oyun oluşturma hatası."}), 500
         return jsonify({"opponentFound": False, "timeout": True}), 200
 
-    # --- Genel Hata Yakalama ---
     except Exception as e:
         logger.error(f"find_opponent içinde beklenmedik genel hata: {e}", exc_info=True)
-        # Hata durumunda kullanıcıyı kuyruktan/bayraktan temizlemeyi dene
-        with lock:
-            if game_duration in waiting_players and user_id in waiting_players[game_duration]:
-                try:
-                    waiting_players[game_duration].remove(user_id)
-                except ValueError:
-                    pass
-            cancel_flags.pop(user_id, None)
+        matchmaker.cancel(user_id)
         return jsonify({"message": "Rakip aranırken sunucu hatası oluştu."}), 500
 
 
+def calculate_remaining_time(game_duration):
+    """Oyun süresine göre bitiş zamanını hesaplar (geçersiz süre için None)."""
+    match game_duration:
+        case "TWO_MIN":
+            return datetime.utcnow() + timedelta(minutes=2)
+        case "FIVE_MIN":
+            return datetime.utcnow() + timedelta(minutes=5)
+        case "TWELVE_HOUR":
+            return datetime.utcnow() + timedelta(hours=12)
+        case "TWENTYFOUR_HOUR":
+            return datetime.utcnow() + timedelta(hours=24)
+        case _:
+            return None
+
+
+def finalize_match(ticket, opponent_ticket):
+    """
+    Eşleşen çifti oyun oluşturma kuyruğuna ekler. Oyun match_persister tarafından oluşturulur; iki taraf da
+    (HTTP veya Socket.IO) matchmaker.complete / fail ile bilgilendirilir.
+    """
+    ensure_match_persister()
+    match_queue.put(ticket, opponent_ticket)
+
+
+def persist_matches(pairs):
+    """Çiftlerin oyunlarını tek commit ile oluşturur. Toplu kayıt başarısız olursa çiftler tek tek denenir."""
+    try:
+        game_ids = create_matched_games([(ticket.user_id, opponent_ticket.user_id, ticket.mode)
+                                         for ticket, opponent_ticket in pairs])
+    except Exception as create_err:
+        db.session.rollback()
+        if len(pairs) > 1:
+            logger.warning(f"{len(pairs)} oyunluk toplu kayıt başarısız, tek tek deneniyor: {create_err}")
+            for pair in pairs:
+                persist_matches([pair])
+            return
+        logger.error(f"Yeni oyun oluşturma sırasında hata: {create_err}", exc_info=True)
+        matchmaker.fail(*pairs[0])
+        return
+    # Socket.IO bildirimi, oyuncu hangi worker'da bekliyorsa orada matchmaker.on_resolved ile yapılır
+    for (ticket, opponent_ticket), game_id in zip(pairs, game_ids):
+        matchmaker.complete(ticket, opponent_ticket, game_id)
+
+
+def notify_match(ticket):
+    """Socket.IO ile bekleyen oyuncuya eşleşme sonucunu kendi sid'ine gönderir."""
+    if ticket.sid is None:
+        return
+    if ticket.status == TicketStatus.Matched:
+        matchmaker.pop_match(ticket.user_id)
+        socketio.emit('match_found', {"opponentFound": True, "game_id": ticket.game_id,
+                                      "opponent_id": ticket.opponent_id}, to=ticket.sid)
+        logger.info(f"'match_found' gönderildi: user={ticket.user_id}, sid={ticket.sid}, game={ticket.game_id}")
+    else:
+        socketio.emit('match_error', {"message": "Oyun oluşturma hatası."}, to=ticket.sid)
+
+
+matchmaker.on_resolved = notify_match
+
+
+def build_matched_game(user_id, opponent_id, game_duration):
+    """Eşleşen iki oyuncu için yeni (henüz kaydedilmemiş) Game nesnesi."""
+    gamemode = GameMode[game_duration.upper()]
+    remaining_time = calculate_remaining_time(game_duration)
+    # Harf dağıtımı ve gizli tahta önceden üretilmiş şablondan (havuz boşsa burada üretilir)
+    template = game_template_pool.take()
+
+    return Game(
+        user1=user_id, user2=opponent_id,
+        board_layout_id=default_layout_id(),  # Paylaşılan ödül tahtası düzeni
+        game_board={},  # Boş dict
+        hidden_board=template["hidden_board"],  # Direkt dict
+        user1_rewards=[], user2_rewards=[],  # Boş liste
+        score1=0, score2=0, turn_order=user_id,
+        remaining_letters=template["remaining_letters"],  # Direkt dict
+        gamemode=gamemode, created_at=datetime.utcnow(),
+        remaining_time=remaining_time,
+        user1_letters=template["user1_letters"],  # Direkt liste
+        user2_letters=template["user2_letters"],  # Direkt liste
+        status='active', state_version=0
+    )
+
+
+def create_matched_games(matches):
+    """(user_id, opponent_id, game_duration) listesindeki oyunları tek commit ile oluşturur, ID'lerini döndürür."""
+    new_games = [build_matched_game(user_id, opponent_id, game_duration)
+                 for user_id, opponent_id, game_duration in matches]
+    db.session.add_all(new_games)
+    db.session.flush()
+    # Başlangıç durumu: hamle geçmişi bu snapshot'tan itibaren yeniden oynatılabilir
+    db.session.add_all([snapshot_row(new_game.id, game_record(new_game)) for new_game in new_games])
+    db.session.commit()
+    active_games_cache.invalidate(*{user for new_game in new_games for user in (new_game.user1, new_game.user2)})
+    for new_game in new_games:
+        logger.info(f"Yeni oyun {new_game.id} oluşturuldu. User1={new_game.user1}, User2={new_game.user2}. "
+                    f"İlk sıra: User {new_game.turn_order}")
+    return [new_game.id for new_game in new_games]
+
+
+def create_matched_game(user_id, opponent_id, game_duration):
+    """Eşleşen iki oyuncu için yeni oyunu oluşturur ve ID'sini döndürür."""
+    return create_matched_games([(user_id, opponent_id, game_duration)])[0]
+
+
 @app.route('/cancel-find-opponent', methods=['POST'])
 def cancel_find_opponent():
     data = request.get_json()
-    user_id = data.get('user_id')
+    try:
+        user_id = int(data.get('user_id'))
+    except (TypeError, ValueError, AttributeError):
+        return jsonify({"message": "Geçersiz veya eksik parametre."}), 400
 
-    with lock:
-        cancel_flags[user_id] = True
+    # Bekleyen istek hemen uyandırılır
+    matchmaker.cancel(user_id)
 
     return jsonify({"cancelled": True}), 200
 
 
+@app.route('/matchmaking/stats', methods=['GET'])
+def matchmaking_stats():
+    # Kuyruk uzunlukları, mod başına kilit bekleme süreleri ve oyun oluşturma kuyruğu (izleme için)
+    stats = matchmaker.stats()
+    stats["persistence"] = match_queue.stats()
+    return jsonify(stats), 200
+
+
+@app.route('/game-cache/stats', methods=['GET'])
+def game_cache_stats():
+    """Canlı oyun önbelleğinin durumu (önbellekteki / kaydedilmemiş oyunlar, isabet oranı)."""
+    return jsonify(game_store.stats()), 200
+
+
+@app.route('/game-templates/stats', methods=['GET'])
+def game_template_stats():
+    """Hazır oyun şablonu havuzu (doluluk, isabet / ıskalama sayıları)."""
+    return jsonify(game_template_pool.stats()), 200
+
+
+@app.route('/active-games/stats', methods=['GET'])
+def active_games_stats():
+    """Aktif oyun listesi önbelleği (boyut, isabet / ıskalama sayıları)."""
+    return jsonify(active_games_cache.stats()), 200
+
+
+@app.route('/board-layouts/<int:layout_id>', methods=['GET'])
+def get_board_layout(layout_id):
+    """Ödül tahtası düzeni (önceden kodlanmış JSON). Düzenler değişmediği için istemci önbelleğinde tutulabilir."""
+    layout = get_layout(layout_id)
+    if layout is None:
+        return jsonify({"error": "Düzen bulunamadı."}), 404
+    return Response(layout.encoded, mimetype='application/json',
+                    headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+
+def load_user_profiles(user_ids):
+    """Önbellekte olmayan kullanıcıların profilleri tek sorguda: id -> {username, total_points}."""
+    rows = db.session.execute(
+        select(User.id, User.username, User.total_points).where(User.id.in_(user_ids))
+    ).all()
+    return {row.id: {"username": row.username, "total_points": row.total_points} for row in rows}
+
+
+def get_user_profiles(user_ids):
+    """id -> profil; bulunamayan kullanıcılar sonuçta yer almaz (ve önbelleğe yazılmaz)."""
+    return user_profile_cache.get_many_or_load(user_ids, load_user_profiles)
+
+
+def user_profiles_changed(*user_ids):
+    """Kullanıcı adı veya total_points değiştiğinde çağrılır: profiller bir sonraki istekte yeniden yüklenir."""
+    user_profile_cache.invalidate(*user_ids)
+
+
 @app.route('/user/<int:user_id>', methods=['GET'])
 def get_username(user_id):
-    user = User.query.filter_by(id=user_id).first()
-    if not user:
+    profile = get_user_profiles([user_id]).get(user_id)
+    if not profile:
         return jsonify({"message": "Kullanıcı bulunamadı"}), 404
-    return jsonify({"username": user.username}), 200
+    return jsonify({"username": profile["username"]}), 200
+
+
+@app.route('/users', methods=['GET'])
+def get_users():
+    """Toplu profil sorgusu: /users?ids=3,7,12 -> {"users": {"3": {username, total_points}, ...}, "missing": [...]}"""
+    try:
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in request.args.get('ids', '').split(',') if user_id))
+    except ValueError:
+        return jsonify({"message": "Geçersiz kullanıcı ID listesi"}), 400
+    if not user_ids or len(user_ids) > USERS_MAX_IDS:
+        return jsonify({"message": f"1 ile {USERS_MAX_IDS} arasında kullanıcı ID'si gerekli"}), 400
 
+    profiles = get_user_profiles(user_ids)
+    return jsonify({"users": {str(user_id): profiles[user_id] for user_id in user_ids if user_id in profiles},
+                    "missing": [user_id for user_id in user_ids if user_id not in profiles]}), 200
 
-def draw_letters(remaining_pool, num=7):
-    flat_pool = []
-    drawn_letters = set()  # Çekilen harfleri tutmak için bir set kullanıyoruz
 
-    # Torbayı oluştur
-    for letter, info in remaining_pool.items():
-        flat_pool.extend([letter] * info['count'])
+@app.route('/users/stats', methods=['GET'])
+def user_profile_stats():
+    """Kullanıcı profili önbelleği (boyut, isabet / ıskalama sayıları)."""
+    return jsonify(user_profile_cache.stats()), 200
 
-    random.shuffle(flat_pool)
 
+def draw_letters(bag, num=7):
+    """Torbadan birbirinden farklı num harf çeker (torba yerinde azalır)."""
     drawn = []
     for _ in range(num):
-        while flat_pool:
-            letter = flat_pool.pop()
-            if letter not in drawn_letters:  # Eğer harf daha önce çekilmediyse
-                drawn.append(letter)
-                drawn_letters.add(letter)  # Çekilen harfi ekle
-                remaining_pool[letter]["count"] -= 1  # Harfin sayısını azalt
-                break
-
+        letter = bag.draw(exclude=drawn)
+        if letter is None:
+            break
+        drawn.append(letter)
     return drawn
 
 
 @app.route('/game/<int:game_id>/initialize', methods=['GET'])
 def initialize_game(game_id):
+    """Oyunun tam durumu; el sadece isteyen oyuncunun (?user_id=) kendisininkidir, rakibin sadece harf sayısı."""
     logger.info(f"initialize_game endpointine istek alındı. game_id: {game_id}")
-    game = db.session.query(Game).filter_by(id=game_id).first()
+    user_id = request.args.get('user_id', type=int)
+    ensure_game_store()
+    game = game_store.acquire(game_id)
     if not game:
         return jsonify({"error": "Oyun bulunamadı."}), 500
+    try:
+        return _initialize_game(game, user_id)
+    finally:
+        game_store.release(game)
+
 
+def _initialize_game(game, user_id):
     updated = False
-    current_remaining = copy.deepcopy(game_data.remaining_letters)
+    bag = LetterBag.from_pool(game_data.remaining_letters)
 
     logger.info(f"game initialize girdik")
 
     # Eğer kullanıcı harfleri boşsa dağıtım yap
     if not game.user1_letters or not isinstance(game.user1_letters, list):
-        game.user1_letters = draw_letters(current_remaining, num=7)
+        game.user1_letters = draw_letters(bag, num=7)
         updated = True
 
     if not game.user2_letters or not isinstance(game.user2_letters, list):
-        game.user2_letters = draw_letters(current_remaining, num=7)
+        game.user2_letters = draw_letters(bag, num=7)
         updated = True
 
     if updated:
-        game.remaining_letters = current_remaining
-        db.session.commit()
+        game.remaining_letters = bag.to_pool()
+        bump_state_version(game)
+        game_store.commit(game, kind=MOVE_DEAL)
 
-    return jsonify({
-        "id": game.id,
-        "user1": game.user1,
-        "user2": game.user2,
-        "reward_punishment_board": game.reward_punishment_board,
-        "game_board": game.game_board,
-        "score1": game.score1,
-        "score2": game.score2,
-        "turn_order": game.turn_order,
-        "remaining_letters": game.remaining_letters,
-        "gamemode": game.gamemode.name if game.gamemode else None,
-        "created_at": game.created_at.isoformat() if game.created_at else None,
-        "remaining_time": game.remaining_time.isoformat() if game.remaining_time else None,
-        "status": game.status,
-        "user1_letters": game.user1_letters,
-        "user2_letters": game.user2_letters,
-    })
+    return jsonify(player_game_state(serialize_game_state(game), game, user_id))
 
 
 @app.route('/submit-move', methods=['POST'])
@@ -459,12 +615,18 @@ def submit_move_secure():
         logger.warning(
             f"submit_move: Eksik veya geçersiz parametreler. GameID: {game_id}, UserID: {user_id}, Tiles: {placed_tiles}")
         return jsonify({"message": "Eksik veya geçersiz parametre."}), 400
+    # Harfler Türkçe büyük harfe çevrilir (istemci küçük harf gönderebilir): el kontrolü, doğrulama, skor ve
+    # tahtaya yazılan harf aynı biçimde olur
+    placed_tiles = [dict(tile, letter=turkish_upper(str(tile['letter'])))
+                    if isinstance(tile, dict) and tile.get('letter') else tile for tile in placed_tiles]
 
     logger.debug(f"Gelen Hamle (Doğrulanacak): Game={game_id}, User={user_id}, Tiles={len(placed_tiles)}")
 
+    ensure_game_store()
+    game = None
     try:
-        # Oyunu Veritabanından Çek ve Kilitle
-        game = db.session.query(Game).filter_by(id=game_id).with_for_update().first()
+        # Oyunu önbellekten al ve kilitle (bu oyunun hamleleri sırayla işlenir)
+        game = game_store.acquire(game_id)
 
         # 1. Oyun Var mı Kontrolü
         if not game:
@@ -492,7 +654,7 @@ def submit_move_secure():
 
         for tile in placed_tiles:
             is_blank_tile = tile.get('is_blank', False)
-            played_letter_value = tile.get('letter', '').upper()  # Client'ın seçtiği harf
+            played_letter_value = turkish_upper(tile.get('letter', ''))  # Client'ın seçtiği harf
 
             # DÜZELTME: Elde ne aranacağını belirle
             # Eğer blank ise DB'deki gibi "Blank" string'ini ara, değilse harfi ara
@@ -530,17 +692,9 @@ def submit_move_secure():
         logger.debug(f"submit_move: El kontrolü başarılı. Elden çıkanlar: {played_letters_from_hand}")
 
         # 4. Sunucu Tarafı Hamle Doğrulama (Kelime ve Yerleştirme)
-        committed_board = game.game_board or {}  # Zaten dict (db.JSON)
-        # !!! GERÇEK DOĞRULAMA FONKSİYONU ÇAĞRILMALI !!!
-        # validation_result = checkWordPlacement_server(placed_tiles, committed_board, turkish_words_set_server)
-        # Placeholder Kullanımı (MUTLAKA GERÇEK IMPLEMENTASYONLA DEĞİŞTİRİN):
-        logger.warning(
-            f"Game {game_id}: Sunucu tarafı kelime/yerleştirme doğrulaması atlanıyor (placeholder kullanılıyor)!")
-        validation_result = PlacementValidationResult(status=ValidationStatus.Ok, message="OK (Placeholder)",
-                                                      validWords=[
-                                                          {"word": "".join(t['letter'] for t in placed_tiles) or "TEST",
-                                                           "path": [{'row': t['row'], 'col': t['col']} for t in
-                                                                    placed_tiles]}])
+        # 225 hücrelik düz tahtalar (doğrulama, skorlama ve gizli öğeler); önbellekteki oyunda hamleler arasında tutulur
+        board, hidden_cells = game_boards(game)
+        validation_result = checkWordPlacement_server(placed_tiles, board, get_dictionary())
 
         if validation_result.status != ValidationStatus.Ok:
             logger.warning(
@@ -554,8 +708,9 @@ def submit_move_secure():
 
         # 5. Gizli Öğeleri Kontrol Et ve Etkileri Belirle
         hidden_items = game.hidden_board or {}
-        my_rewards_list = (game.user1_rewards if user_id == game.user1 else game.user2_rewards) or []
-        if not isinstance(my_rewards_list, list): my_rewards_list = []  # Güvenlik
+        current_rewards = game.user1_rewards if user_id == game.user1 else game.user2_rewards
+        # Kopya üzerinde çalışılır (copy-on-write): oyunun listesi yerinde değiştirilmez
+        my_rewards_list = list(current_rewards) if isinstance(current_rewards, list) else []
 
         triggered_traps_info = []
         earned_rewards_info = []
@@ -568,9 +723,10 @@ def submit_move_secure():
         grant_extra_turn = False
 
         for tile in placed_tiles:
-            tile_key = f"{tile['row']}_{tile['col']}"
-            if tile_key in hidden_items:
-                item_type = hidden_items[tile_key]
+            row, col = int(tile['row']), int(tile['col'])  # Doğrulamadan geçti: tahtanın içinde
+            item_type = hidden_cells[row * BOARD_SIZE + col]
+            if item_type is not None:
+                tile_key = f"{row}_{col}"
                 logger.info(
                     f"Gizli öğe tetiklendi! Game: {game_id}, User: {user_id}, Key: {tile_key}, Type: {item_type}")
                 triggered_keys_to_remove.append(tile_key)
@@ -624,13 +780,19 @@ def submit_move_secure():
             logger.info(f"Game {game_id}: Kelime iptal edildi. Skor: 0")
             final_score_gain = 0
         else:
-            letter_scores_map = {letter: data['score'] for letter, data in (game.remaining_letters or {}).items()}
-            if '*' not in letter_scores_map: letter_scores_map['*'] = 0  # Blank puanını ekle (varsa)
-
-            # !!! GERÇEK SKORLAMA FONKSİYONU ÇAĞRILMALI !!!
-            # Bu fonksiyon gelen placed_tiles içindeki is_blank:true durumunu dikkate alarak puanı 0 hesaplamalı.
-            server_calculated_score = calculate_score_server_side(
-                valid_words, placed_tiles, game.reward_punishment_board or {}, letter_scores_map, block_bonuses
+            letter_scores_map = LETTER_SCORES  # Harf puanları oyundan oyuna değişmez (blank/'*' 0 puan)
+
+            # Skor motoru (scoring.py): is_blank taşlar 0 puan, ödül kareleri oyunun düzeninin (işlem başına bir kez
+            # yüklenen) çarpan dizilerinden
+            layout = get_layout(game.board_layout_id)
+            if layout is None:
+                # Düzen satırı silinmiş / bulunamıyor: hamle reddedilmez, standart düzenle puanlanır
+                logger.warning(f"Game {game_id}: Ödül tahtası düzeni {game.board_layout_id} bulunamadı, "
+                               f"standart düzen kullanılıyor.")
+                layout = get_layout(default_layout_id())
+            server_calculated_score = score_words(
+                valid_words, placed_tiles, letter_scores_map, block_bonuses,
+                layout.letter_multipliers, layout.word_multipliers
             )
 
             if block_bonuses: logger.info(f"Game {game_id}: Bonuslar bloklandı (Gerçek skor hesaplaması TODO)")
@@ -666,52 +828,45 @@ def submit_move_secure():
         logger.debug(f"Game {game_id}: Ödüller güncellendi: {my_rewards_list}")
 
         # --- Kalan Harfleri Güncelleme (played_letters_from_hand Kullanımı) ---
-        # Bu bölüm artık doğru çalışmalı çünkü played_letters_from_hand 'Blank' veya harf içeriyor
-        remaining_letters_dict = game.remaining_letters or {}
-        temp_remaining_letters = json.loads(json.dumps(remaining_letters_dict))  # Derin kopya al
+        # Tek bir torba nesnesi: oynananlar düşülür, yeni harfler aynı torbadan çekilir (JSON kopyası yok)
+        letter_bag = LetterBag.from_pool(game.remaining_letters)
         for letter_key in played_letters_from_hand:  # 'Blank' veya 'A' gibi
-            if letter_key in temp_remaining_letters:
-                temp_remaining_letters[letter_key]['count'] = max(0, temp_remaining_letters[letter_key]['count'] - 1)
-            else:
+            if not letter_bag.remove(letter_key):
                 logger.warning(f"Kalan harfler güncellenirken {letter_key} bulunamadı!")
-        final_remaining_letters_dict = temp_remaining_letters  # Bu, draw_new_letters'a gidecek
         logger.debug(f"Game {game_id}: Kalan harfler oynananlara göre azaltıldı.")
         # --- Kalan Harfler Güncellendi ---
 
-        # --- Eli Güncelle (Oynananları Çıkar) ---
-        updated_hand_before_draw = list(current_hand)
-        for played_letter in played_letters_from_hand:  # 'Blank' veya 'A' gibi
-            try:
-                updated_hand_before_draw.remove(played_letter)
-            except ValueError:
-                logger.error(f"Game {game_id}: Elden {played_letter} silinirken hata?")
+        # --- El: oynananlar El Kontrolü sırasında temp_hand'den zaten çıkarıldı ---
+        updated_hand_before_draw = temp_hand
         logger.debug(f"El güncellendi (Çekmeden Önce): {updated_hand_before_draw}")
-        # --- El Güncelleme Bitti ---
 
         # 7e. Yeni Harf Çek (Azaltılmış Havuzdan)
         num_to_draw = 7 if discard_hand else len(placed_tiles)
         if discard_hand: updated_hand_before_draw = []
-
-        # draw_new_letters güncellenmiş havuzu (final_remaining_letters_dict) kullanmalı
-        new_player_hand, final_remaining_letters_dict_after_draw = draw_new_letters(
-            final_remaining_letters_dict,  # Azaltılmış havuzu ver
-            updated_hand_before_draw,
-            num_to_draw
-        )
+        new_player_hand = draw_new_letters(letter_bag, updated_hand_before_draw, num_to_draw)
 
         # Güncel eli ve ÇEKİM SONRASI kalan harfleri kaydet
         if user_id == game.user1:
             game.user1_letters = new_player_hand
         else:
             game.user2_letters = new_player_hand
-        game.remaining_letters = final_remaining_letters_dict_after_draw  # Çekim sonrası son hali
+        game.remaining_letters = letter_bag.to_pool()  # Çekim sonrası son hali
         logger.debug(f"Game {game_id}: Yeni harfler çekildi. Güncel el: {new_player_hand}")
 
         # 7f. Tahtayı Güncelle
         committed_board = game.game_board or {}  # En güncel halini al (başka bir güncelleme olmamıştır varsayımı)
         new_game_board = committed_board.copy()
-        for tile in placed_tiles: new_game_board[f"{tile['row']}_{tile['col']}"] = tile['letter']
+        for tile in placed_tiles: new_game_board[f"{tile['row']}_{tile['col']}"] = turkish_upper(tile['letter'])
         game.game_board = new_game_board
+        # Bir sonraki hamle tahtaları sözlüklerden yeniden kurmasın (tetiklenen gizli öğeler konan taşların altında)
+        new_board = board.copy()
+        new_hidden_cells = hidden_cells.copy() if triggered_keys_to_remove else hidden_cells
+        for tile in placed_tiles:
+            index = int(tile['row']) * BOARD_SIZE + int(tile['col'])
+            new_board[index] = turkish_upper(tile['letter'])
+            if triggered_keys_to_remove:
+                new_hidden_cells[index] = None
+        remember_boards(game, new_board, new_hidden_cells)
         logger.debug(f"Game {game_id}: Tahta güncellendi.")
 
         # 7g. Sırayı Değiştir (Ekstra Hamle kontrolü dahil)
@@ -734,42 +889,27 @@ def submit_move_secure():
         #   Örn: if not game.remaining_letters or len(parse_db_json(game.remaining_letters, default={})) == 0: ...
         #   Örn: if pas_sayisi >= 2: ...
 
-        # 8. Değişiklikleri Veritabanına İşle
-        db.session.commit()
-        logger.info(f"Oyun {game_id} veritabanına başarıyla kaydedildi.")
+        # 8. Değişiklikleri İşle (günlüğe yazılır, veritabanına arka planda aktarılır)
+        bump_state_version(game)
+        game_store.commit(game, user_id)
+        logger.info(f"Oyun {game_id} hamlesi kaydedildi (v{game.state_version}).")
         # --- Veritabanı Güncelleme Sonu ---
 
         # --- 9. WebSocket ile Güncelleme Gönder ---
         try:
-            # Güncel durumu hazırla
-            updated_game_state = {
-                "id": game.id, "user1": game.user1, "user2": game.user2,
-                "reward_punishment_board": game.reward_punishment_board or {},
-                "game_board": game.game_board or {},
-                "score1": game.score1, "score2": game.score2,
-                "turn_order": game.turn_order,
-                "remaining_letters": game.remaining_letters or {},
-                "gamemode": game.gamemode.name if game.gamemode else None,
-                "created_at": game.created_at.isoformat() if game.created_at else None,
-                "remaining_time": game.remaining_time.isoformat() if game.remaining_time else None,
-                "status": game.status,
-                "user1_letters": game.user1_letters or [],
-                "user2_letters": game.user2_letters or [],
-                "user1_rewards": game.user1_rewards or [],
-                "user2_rewards": game.user2_rewards or [],
-                "last_move_info": {
-                    "player_id": user_id, "placed_tiles": placed_tiles,
-                    "score_gained": final_score_gain if not transfer_score else 0,
-                    "opponent_score_gained": final_score_gain if transfer_score else 0,
-                    "triggered_traps": triggered_traps_info,
-                    "earned_rewards": earned_rewards_info,
-                    "extra_turn_used": grant_extra_turn,
-                    "hand_discarded": discard_hand
-                }
+            # Sadece hamlenin değiştirdiklerini gönder (tam durum 'request_resync' ile istenebilir)
+            last_move_info = {
+                "player_id": user_id,  # Taşlar delta'nın placed_tiles alanında
+                "score_gained": final_score_gain if not transfer_score else 0,
+                "opponent_score_gained": final_score_gain if transfer_score else 0,
+                "triggered_traps": triggered_traps_info,
+                "earned_rewards": earned_rewards_info,
+                "extra_turn_used": grant_extra_turn,
+                "hand_discarded": discard_hand
             }
-            room_id = str(game.id)
-            socketio.emit('game_updated', updated_game_state, to=room_id)
-            logger.info(f"'{room_id}' odasına 'game_updated' olayı gönderildi.")
+            move_delta = build_move_delta(game, user_id, placed_tiles, last_move_info)
+            emit_game_update(game, move_delta, player_move_delta)
+            logger.info(f"Oyun {game.id} için 'game_updated' (delta, v{move_delta['version']}) olayı gönderildi.")
         except Exception as socket_err:
             logger.error(f"SocketIO emit hatası: {socket_err}", exc_info=True)
 
@@ -786,33 +926,87 @@ def submit_move_secure():
             "earned_rewards": earned_rewards_info
         }), 200
 
+    except GameResyncRequired:
+        raise  # 409 (game_resync_required)
     except Exception as e:
         db.session.rollback();
         logger.error(f"submit_move sırasında beklenmedik hata: {e}", exc_info=True)
         return jsonify({"message": "Hamle işlenirken sunucu hatası."}), 500
+    finally:
+        if game is not None:
+            game_store.release(game)  # Kaydedilmemiş değişiklikler geri alınır
+
+
+def emit_game_update(game, payload, personalize):
+    """
+    'game_updated' yayını: ortak payload bir kez oluşturulur, her oyuncunun odasına personalize ile
+    sadece kendi eli/ödülleri eklenmiş sığ kopyası gider. Oyuncu kimliği vermeden katılanlar ortak payload'u alır.
+    """
+    for player_id in (game.user1, game.user2):
+        socketio.emit('game_updated', personalize(payload, game, player_id), to=player_room(game.id, player_id))
+    socketio.emit('game_updated', payload, to=str(game.id))
+
+
+def load_active_games(user_id):
+    """
+    Kullanıcının aktif oyunları (en yeni önce), liste ekranının ihtiyaç duyduğu sütunlar ve rakip kullanıcı adıyla
+    tek sorguda. JSON sütunları (tahta, harfler) okunmaz.
+    """
+    opponent_id = case((Game.user1 == user_id, Game.user2), else_=Game.user1).label('opponent_id')
+    rows = db.session.execute(
+        select(Game.id, Game.created_at, Game.gamemode, Game.remaining_time, opponent_id,
+               User.username.label('opponent_name'))
+        .outerjoin(User, User.id == opponent_id)
+        .where(or_(Game.user1 == user_id, Game.user2 == user_id), Game.status == 'active')
+        .order_by(desc(Game.created_at), desc(Game.id))
+    ).all()
+    return tuple(rows)
+
+
+def forget_active_game(game):
+    """Biten oyunu iki oyuncunun aktif oyun listesinden çıkarır; oyun sonu puanları için profilleri de yeniler."""
+    active_games_cache.invalidate(game.user1, game.user2)
+    user_profiles_changed(game.user1, game.user2)
+
+
+def finished_game_persisted(game):
+    """
+    Bitiş kaydı veritabanına yazıldı. Write-behind önbellekte bu, bitişten sonraki flush'ta olur; arada
+    veritabanından okunan (oyunu hâlâ aktif gösteren) listeler burada silinir.
+    """
+    active_games_cache.invalidate(game.user1, game.user2)
+
+
+game_store.on_finished = finished_game_persisted
 
 
 @app.route('/active-games/<int:user_id>', methods=['GET'])
 def get_active_games(user_id):
+    """Aktif oyunlar (JSON), sayfa sayfa: ?limit=N ve ?cursor=<next_cursor>. Liste kullanıcı başına önbelleklenir."""
     try:
-        # Kullanıcının aktif oyunlarını sorgula
-        active_games = Game.query.filter(
-            ((Game.user1 == user_id) | (Game.user2 == user_id)) & (Game.status == 'active')
-        ).all()
-
-        if not active_games:
-            return Response("No active games found", status=200)
-
-        # Aktif oyunları düz bir metin formatında döndür
-        active_games_data = []
-        for game in active_games:
-            active_games_data.append(
-                f"Game ID: {game.id}, Opponent: {game.user2 if game.user1 == user_id else game.user1}, Remaining Time: {game.remaining_time}, Gamemode: {game.gamemode}")
+        limit = min(max(int(request.args.get('limit', ACTIVE_GAMES_PAGE_SIZE)), 1), ACTIVE_GAMES_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        cursor = decode_game_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Geçersiz limit veya imleç."}), 400
 
-        return Response("\n".join(active_games_data), status=200)
+    try:
+        rows = active_games_cache.get_or_load(user_id, lambda: load_active_games(user_id))
+        if cursor is not None:
+            rows = [row for row in rows if (row.created_at, row.id) < cursor]
+        page = rows[:limit]
+        next_cursor = encode_game_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+        games = [{
+            "id": row.id,
+            "opponentId": row.opponent_id,
+            "opponentName": row.opponent_name or "Bilinmeyen Rakip",
+            "gamemode": row.gamemode.name if row.gamemode else None,
+            "remainingTime": row.remaining_time.isoformat() if row.remaining_time else None,
+        } for row in page]
+        return jsonify({"games": games, "next_cursor": next_cursor}), 200
     except Exception as e:
         logger.error(f"Active games sorgusu sırasında hata: {e}", exc_info=True)
-        return Response("Error occurred while fetching active games", status=500)
+        return jsonify({"error": "Aktif oyunlar alınırken sunucu hatası oluştu."}), 500
 
 
 @app.route('/leave-game/<int:game_id>', methods=['POST'])
@@ -831,9 +1025,11 @@ def leave_game(game_id):
 
     logger.info(f"Kullanıcı {resigning_user_id}, oyun {game_id}'den ayrılma/pes etme isteği gönderdi.")
 
+    ensure_game_store()
+    game = None
     try:
-        # Oyunu bul ve kilitle (opsiyonel ama güvenli)
-        game = db.session.query(Game).filter_by(id=game_id).with_for_update().first()
+        # Oyunu bul ve kilitle
+        game = game_store.acquire(game_id)
 
         if not game:
             logger.warning(f"leave_game: Oyun bulunamadı. Game ID: {game_id}")
@@ -857,41 +1053,24 @@ def leave_game(game_id):
         # Oyunun durumunu ve kazananı güncelle
         game.status = 'finished' # 'passive' yerine 'finished' daha anlamlı olabilir
         game.winner = winner_id  # Yeni eklenen winner sütununu set et
+        bump_state_version(game)
 
-        db.session.commit() # Değişiklikleri kaydet
+        game_store.commit(game, resigning_user_id, MOVE_RESIGN) # Değişiklikleri kaydet
+        forget_active_game(game)
         logger.info(f"Game {game_id} durumu '{game.status}' ve kazanan {game.winner} olarak güncellendi.")
 
         # --- WebSocket ile Diğer Oyuncuya Bildirim (Önerilir) ---
         try:
             # Oyunun son durumunu hazırla (initialize gibi)
-            final_game_state = {
-                 "id": game.id, "user1": game.user1, "user2": game.user2,
-                 "reward_punishment_board": game.reward_punishment_board or {},
-                 "game_board": game.game_board or {},
-                 "score1": game.score1, "score2": game.score2,
-                 "turn_order": game.turn_order, # Sıra önemsizleşti ama gönderilebilir
-                 "remaining_letters": game.remaining_letters or {},
-                 "gamemode": game.gamemode.name if game.gamemode else None,
-                 "created_at": game.created_at.isoformat() if game.created_at else None,
-                 "remaining_time": game.remaining_time.isoformat() if game.remaining_time else None,
-                 "status" : game.status, # 'finished' olacak
-                 "winner_id": game.winner, # Kazanan ID'si eklendi
-                 "user1_letters": game.user1_letters or [],
-                 "user2_letters": game.user2_letters or [],
-                 "user1_rewards": game.user1_rewards or [],
-                 "user2_rewards": game.user2_rewards or [],
-                 "last_move_info": { # Özel bir olay tipi de tanımlanabilir
-                     "type": "resign",
-                     "player_id": resigning_user_id,
-                     "winner_id": winner_id
-                 }
-            }
-            room_id = str(game.id)
-            # Odaya oyunun bittiğini ve kazananı bildir
+            final_game_state = serialize_game_state(game, last_move_info={  # Özel bir olay tipi de tanımlanabilir
+                "type": "resign",
+                "player_id": resigning_user_id,
+                "winner_id": winner_id
+            })
+            # Oyunculara oyunun bittiğini ve kazananı bildir
             # 'game_updated' yerine 'game_over' gibi özel bir event daha iyi olabilir
-            socketio.emit('game_updated', final_game_state, to=room_id)
-            # veya socketio.emit('game_over', final_game_state, to=room_id)
-            logger.info(f"'{room_id}' odasına oyunun bittiği bilgisi gönderildi.")
+            emit_game_update(game, final_game_state, player_game_state)
+            logger.info(f"Oyun {game.id} oyuncularına oyunun bittiği bilgisi gönderildi.")
         except Exception as socket_err:
             logger.error(f"SocketIO emit (leave_game) hatası: {socket_err}", exc_info=True)
         # --- WebSocket Bildirimi Sonu ---
@@ -900,75 +1079,94 @@ def leave_game(game_id):
         # Başarılı yanıtı döndür
         return jsonify({"message": "Oyundan başarıyla ayrıldınız, rakibiniz kazandı."}), 200
 
+    except GameResyncRequired:
+        raise  # 409 (game_resync_required)
     except Exception as e:
         db.session.rollback() # Hata olursa geri al
         logger.error(f"Oyundan çıkış sırasında genel hata: {e}", exc_info=True)
         return jsonify({"error": "Oyundan çıkış sırasında bir sunucu hatası oluştu."}), 500
+    finally:
+        if game is not None:
+            game_store.release(game)
+
+def encode_game_cursor(created_at, game_id):
+    """Sayfalama imleci: listenin son oyununun (created_at, id) değeri."""
+    return f"{created_at.isoformat()}_{game_id}"
+
+
+def decode_game_cursor(cursor):
+    """encode_game_cursor'ın tersi; geçersiz imleçte ValueError."""
+    created_at, _, game_id = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(game_id)
+
+
+def completed_games_page(user_id, limit, cursor=None):
+    """
+    Kullanıcının biten oyunlarından (en yeni önce) bir sayfa ve sonraki sayfanın imleci. Tek sorgu: user1 ve user2
+    dalları ayrı ayrı (user, status, created_at) indeksinde sıralı okunup sayfa boyu + 1 satırla sınırlanır, rakibin
+    kullanıcı adı JOIN ile alınır. Sayfa maliyeti oyuncunun toplam oyun sayısından bağımsızdır.
+    """
+    branches = []
+    for own, other, own_score, other_score in ((Game.user1, Game.user2, Game.score1, Game.score2),
+                                               (Game.user2, Game.user1, Game.score2, Game.score1)):
+        # Biten oyunların durumu 'finished' (leave_game); eşitlik koşulu indeks sırasını korur
+        branch = select(Game.id, Game.created_at, Game.winner, other.label('opponent_id'),
+                        own_score.label('user_score'), other_score.label('opponent_score')).where(
+            own == user_id, Game.status == 'finished')
+        if cursor is not None:
+            created_at, game_id = cursor
+            branch = branch.where(or_(Game.created_at < created_at,
+                                      and_(Game.created_at == created_at, Game.id < game_id)))
+        branches.append(select(branch.order_by(desc(Game.created_at), desc(Game.id)).limit(limit + 1).subquery()))
+    page = union_all(*branches).subquery()
+    rows = db.session.execute(
+        select(page, User.username).outerjoin(User, User.id == page.c.opponent_id)
+        .order_by(desc(page.c.created_at), desc(page.c.id)).limit(limit + 1)
+    ).all()
+    next_cursor = encode_game_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
 
 @app.route('/completed-games/<int:user_id>', methods=['GET'])
 def get_completed_games(user_id):
+    """Biten oyunlar, sayfa sayfa: ?limit=N (en fazla COMPLETED_GAMES_MAX_PAGE_SIZE) ve ?cursor=<next_cursor>."""
     logger.info(f"Kullanıcı {user_id} için biten oyunlar isteniyor.")
     try:
-        # Kullanıcının varlığını kontrol et (opsiyonel ama iyi pratik)
-        user = db.session.query(User).filter_by(id=user_id).first()
-        if not user:
-             logger.warning(f"get_completed_games: Kullanıcı bulunamadı: {user_id}")
-             return jsonify({"error": "Kullanıcı bulunamadı."}), 404
+        limit = min(max(int(request.args.get('limit', COMPLETED_GAMES_PAGE_SIZE)), 1), COMPLETED_GAMES_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        cursor = decode_game_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Geçersiz limit veya imleç."}), 400
 
-        # Oyunları sorgula: Kullanıcı user1 VEYA user2 olacak VE status 'active' OLMAYACAK
-        # Son biten oyunlar en üstte olsun diye created_at'e göre tersten sırala
-        completed_games_query = Game.query.filter(
-            or_(Game.user1 == user_id, Game.user2 == user_id),
-            Game.status != 'active' # 'finished', 'passive', 'resigned' vb. durumları kapsar
-        ).order_by(desc(Game.created_at)).all()
+    try:
+        # Kullanıcının varlığını kontrol et (opsiyonel ama iyi pratik)
+        if db.session.get(User, user_id) is None:
+            logger.warning(f"get_completed_games: Kullanıcı bulunamadı: {user_id}")
+            return jsonify({"error": "Kullanıcı bulunamadı."}), 404
 
+        rows, next_cursor = completed_games_page(user_id, limit, cursor)
         results = []
-        for game in completed_games_query:
-            # Rakip ID ve skoru belirle
-            opponent_id = None
-            user_score = 0
-            opponent_score = 0
-            if game.user1 == user_id:
-                opponent_id = game.user2
-                user_score = game.score1
-                opponent_score = game.score2
-            else:
-                opponent_id = game.user1
-                user_score = game.score2
-                opponent_score = game.score1
-
-            # Rakip kullanıcı adını bul
-            opponent_username = "Bilinmeyen Rakip"
-            if opponent_id:
-                opponent_user = db.session.query(User).filter_by(id=opponent_id).first()
-                if opponent_user:
-                    opponent_username = opponent_user.username
-
+        for row in rows:
             # Sonucu belirle (önce winner alanına bak, sonra skorlara)
-            result = 'draw' # Varsayılan
-            if game.winner is not None: # Eğer kazanan belirlenmişse (örn: pes etme)
-                if game.winner == user_id:
-                    result = 'win'
-                else:
-                    result = 'lose'
-            else: # Kazanan belirlenmemişse skorları karşılaştır
-                if user_score > opponent_score:
-                    result = 'win'
-                elif user_score < opponent_score:
-                    result = 'lose'
-                # Eşitse 'draw' kalır
+            user_score, opponent_score = row.user_score or 0, row.opponent_score or 0
+            if row.winner is not None:  # Eğer kazanan belirlenmişse (örn: pes etme)
+                result = 'win' if row.winner == user_id else 'lose'
+            elif user_score != opponent_score:  # Kazanan belirlenmemişse skorları karşılaştır
+                result = 'win' if user_score > opponent_score else 'lose'
+            else:
+                result = 'draw'
 
             results.append({
-                "id": game.id, # Oyun ID'si
-                "opponentName": opponent_username,
+                "id": row.id,  # Oyun ID'si
+                "opponentName": row.username or "Bilinmeyen Rakip",
                 "userScore": user_score,
                 "opponentScore": opponent_score,
-                "result": result, # 'win', 'lose', veya 'draw'
-                "date": game.created_at.strftime('%Y-%m-%d %H:%M') if game.created_at else None # Opsiyonel: Tarih
+                "result": result,  # 'win', 'lose', veya 'draw'
+                "date": row.created_at.strftime('%Y-%m-%d %H:%M') if row.created_at else None
             })
 
-        logger.info(f"Kullanıcı {user_id} için {len(results)} biten oyun bulundu.")
-        return jsonify(results), 200
+        logger.info(f"Kullanıcı {user_id} için {len(results)} biten oyun döndürüldü.")
+        return jsonify({"games": results, "next_cursor": next_cursor}), 200
 
     except Exception as e:
         logger.error(f"Biten oyunlar alınırken hata: {e}", exc_info=True)
@@ -977,26 +1175,74 @@ def get_completed_games(user_id):
 
 @app.route('/resume-game/<int:game_id>', methods=['GET'])
 def resume_game(game_id):
+    """
+    Aktif oyunun güncel durumu; game_store'dan okunur (veritabanı bir flush aralığı geride olabilir).
+    El sadece isteyen oyuncunun (?user_id=) kendisininkidir, rakibin sadece harf sayısı gönderilir.
+    """
+    user_id = request.args.get('user_id', type=int)
+    ensure_game_store()
+    game = None
     try:
-        game = Game.query.filter_by(id=game_id, status='active').first()
-        if not game:
+        game = game_store.acquire(game_id)
+        if not game or game.status != 'active':
             return jsonify({"error": "Oyun bulunamadı veya aktif değil."}), 404
 
         # Oyunun mevcut durumunu döndür
-        return jsonify({
-            "id": game.id,
-            "user1": game.user1,
-            "user2": game.user2,
-            "user1_letters": game.user1_letters,
-            "user2_letters": game.user2_letters,
-            "game_board": game.game_board,
-            "turn_order": game.turn_order,
-            "created_at": game.created_at.isoformat(),
-            "updated_at": game.updated_at.isoformat() if game.updated_at else None,
-        }), 200
+        return jsonify(player_game_state(serialize_game_state(game), game, user_id)), 200
+    except GameResyncRequired:
+        raise  # 409 (game_resync_required)
     except Exception as e:
         logger.error(f"Oyuna devam etme sırasında hata: {e}", exc_info=True)
         return jsonify({"error": "Oyuna devam etme sırasında bir hata oluştu."}), 500
+    finally:
+        if game is not None:
+            game_store.release(game)
+
+
+def finished_game_history(game_id):
+    """
+    Oyunu game_store'dan okur: (oyun bulunamadı / devam ediyor hata yanıtı, None) veya (None, (oyun bilgisi,
+    veritabanına henüz yazılmamış hamleler)). Bitiş hamlesi önbellekte bekliyor olabilir, bu yüzden durum
+    veritabanından değil store'dan okunur.
+    """
+    ensure_game_store()
+    game = game_store.acquire(game_id)
+    if not game:
+        return (jsonify({"error": "Oyun bulunamadı."}), 404), None
+    try:
+        if game.status == 'active':
+            return (jsonify({"error": "Oyun devam ediyor."}), 403), None
+        info = {"id": game.id, "user1": game.user1, "user2": game.user2, "board_layout_id": game.board_layout_id,
+                "gamemode": game.gamemode.name if game.gamemode else None}
+        return None, (info, game_store.pending_moves(game))
+    finally:
+        game_store.release(game)
+
+
+@app.route('/game/<int:game_id>/moves', methods=['GET'])
+def get_game_moves(game_id):
+    """Biten bir oyunun hamle geçmişi (tekrar izleme için). Oyun sürerken eller gizli kalsın diye verilmez."""
+    error, history = finished_game_history(game_id)
+    if error:
+        return error
+    _, pending = history
+    moves = [move_to_dict(move) for move in Move.query.filter_by(game_id=game_id).order_by(Move.seq)]
+    last_seq = moves[-1]['seq'] if moves else 0
+    moves += [move for move in pending if move['seq'] > last_seq]  # Arada flush olduysa tekrar eklenmez
+    return jsonify({"game_id": game_id, "moves": moves}), 200
+
+
+@app.route('/game/<int:game_id>/replay/<int:seq>', methods=['GET'])
+def replay_game(game_id, seq):
+    """Biten bir oyunun seq versiyonundaki durumu (en yakın snapshot'a hamleler uygulanarak oluşturulur)."""
+    error, history = finished_game_history(game_id)
+    if error:
+        return error
+    info, pending = history
+    record = reconstruct_game_record(game_id, seq, pending)
+    if record is None:
+        return jsonify({"error": "Bu versiyon için hamle geçmişi bulunamadı."}), 404
+    return jsonify({**record, **info}), 200
 
 
 def parse_db_json(data, default=None):
@@ -1011,30 +1257,13 @@ def parse_db_json(data, default=None):
     return default
 
 
-def check_hand_balance(hand, min_vowels=2, min_consonants=2):
-    vowels = 0
-    consonants = 0
-    for letter in hand:
-        if letter == '*':
-            continue
-        if letter.upper() in TURKISH_VOWELS:
-            vowels += 1
-        else:
-            consonants += 1
-    return vowels >= min_vowels and consonants >= min_consonants
-
-
-def distribute_letters_from_json(initial_letter_pool_dict, max_redraw_attempts=5):
+def distribute_letters_from_json(initial_letter_pool_dict, rng=None):
     if not isinstance(initial_letter_pool_dict, dict):
         logger.error("distribute_letters_from_json: initial_pool_dict sözlük değil!")
         return {"user1_letters": "[]", "user2_letters": "[]", "remaining_letters": "{}"}
 
-    # 1. Harf torbasını oluştur
-    letter_bag = []
-    for letter, data in initial_letter_pool_dict.items():
-        count = data.get('count', 0)
-        if isinstance(count, int) and count > 0:
-            letter_bag.extend([letter] * count)
+    # 1. Harf torbası (harf başına adet)
+    letter_bag = LetterBag.from_pool(initial_letter_pool_dict, rng=rng)
 
     if len(letter_bag) < 14:  # İki oyuncuya yetecek kadar harf yoksa dağıtma
         logger.warning(f"Yeterli harf yok! Torbada {len(letter_bag)} harf kaldı.")
@@ -1042,266 +1271,113 @@ def distribute_letters_from_json(initial_letter_pool_dict, max_redraw_attempts=5
         pool_json = json.dumps(initial_letter_pool_dict)
         return {"user1_letters": "[]", "user2_letters": "[]", "remaining_letters": pool_json}
 
-    # 2. User 1 için Dengeli El Çekmeye Çalışma
-    user1_letters = []
-    hand_size = 7
-    attempts = 0
-    while attempts < max_redraw_attempts:
-        attempts += 1
-        logger.debug(f"User 1 için harf çekme denemesi: {attempts}")
-        if len(letter_bag) < hand_size: break  # Torbada yeterli harf kalmadıysa döngüden çık
-
-        random.shuffle(letter_bag)  # Her denemede torbayı tekrar karıştır
-        temp_hand1 = letter_bag[:hand_size]  # İlk 7 harfi al (henüz torbadan çıkarma)
-
-        # Dengeli mi diye kontrol et (örn: en az 2 sesli, 2 sessiz)
-        if check_hand_balance(temp_hand1, min_vowels=2, min_consonants=2):
-            user1_letters = temp_hand1  # Dengeli ise bu eli kullan
-            logger.info(f"User 1 için dengeli el bulundu ({attempts}. denemede): {user1_letters}")
-            break  # Dengeli el bulundu, döngüden çık
-        else:
-            logger.debug(f"User 1 için {attempts}. deneme dengesiz: {temp_hand1}")
-
-        # Eğer son deneme ise ve hala dengesizse, son çekileni kullan
-        if attempts == max_redraw_attempts:
-            logger.warning(
-                f"User 1 için {max_redraw_attempts} denemede dengeli el bulunamadı. Son çekilen kullanılıyor: {temp_hand1}")
-            user1_letters = temp_hand1
-
-    # Seçilen harfleri torbadan gerçekten çıkar
-    final_letter_bag = list(letter_bag)  # Kopya üzerinde çalışalım
-    for letter in user1_letters:
-        try:
-            final_letter_bag.remove(letter)
-        except ValueError:
-            # Bu durum normalde olmamalı ama olursa logla
-            logger.error(
-                f"Torbadan harf çıkarılırken hata! Harf: {letter}, User1 Eli: {user1_letters}, Torba Başlangıç: {letter_bag}")
-            # Hata durumunda belki işlemi durdurmak gerekir? Şimdilik devam edelim.
-
-    # 3. User 2 için Harf Çek (Kalan torbadan)
-    user2_letters = []
-    random.shuffle(final_letter_bag)  # Kalan torbayı karıştır
-    for _ in range(hand_size):
-        if final_letter_bag:
-            drawn_letter = final_letter_bag.pop()
-            user2_letters.append(drawn_letter)
-        else:
-            break  # Torba bitti
-
-    # 4. Kalan Harf Sayılarını Güncelle
-    updated_letter_pool = json.loads(json.dumps(initial_letter_pool_dict))  # Derin kopya
-    # User 1'in çektiği harfleri azalt
-    for letter in user1_letters:
-        if letter in updated_letter_pool:
-            updated_letter_pool[letter]['count'] = max(0, updated_letter_pool[letter]['count'] - 1)
-        else:
-            logger.warning(f"Update Pool (User1): Harf '{letter}' havuzda yok?")
-    # User 2'nin çektiği harfleri azalt
-    for letter in user2_letters:
-        if letter in updated_letter_pool:
-            updated_letter_pool[letter]['count'] = max(0, updated_letter_pool[letter]['count'] - 1)
-        else:
-            logger.warning(f"Update Pool (User2): Harf '{letter}' havuzda yok?")
+    # 2. İki oyuncuya da dengeli el (en az 2 sesli, 2 sessiz; tek geçişte)
+    user1_letters = draw_balanced_rack(letter_bag)
+    user2_letters = draw_balanced_rack(letter_bag)
 
-    # 5. Sonucu JSON string olarak hazırla
+    # 3. Sonuç (kalan harf sayıları torbadan)
     result = {
         "user1_letters": user1_letters,
         "user2_letters": user2_letters,
-        "remaining_letters": updated_letter_pool
+        "remaining_letters": letter_bag.to_pool()
     }
-    logger.info(f"Harf dağıtımı tamamlandı. User1: {len(user1_letters)}, User2: {len(user2_letters)}")
+    logger.info(f"Harf dağıtımı tamamlandı. User1: {user1_letters}, User2: {user2_letters}")
     return result
 
 
-def draw_new_letters(remaining_letters_dict, player_hand_list, count_to_draw):
+def draw_new_letters(letter_bag, player_hand_list, count_to_draw):
+    """Torbadan count_to_draw harf çekip ele ekler (el listesi yerinde genişletilir ve döndürülür)."""
     if count_to_draw <= 0:
-        return player_hand_list, remaining_letters_dict
-
-    try:
-        if not isinstance(remaining_letters_dict, dict):
-            logger.error("draw_new_letters: remaining_letters_dict sözlük değil!")
-            return player_hand_list, remaining_letters_dict
+        return player_hand_list
+    if not len(letter_bag):  # Çekilecek harf yoksa
+        logger.info("Torbada çekilecek harf kalmadı (draw_new_letters).")
+        return player_hand_list
 
-        letter_bag = []
-        for letter, data in remaining_letters_dict.items():
-            count = data.get('count', 0)
-            if isinstance(count, int) and count > 0:
-                letter_bag.extend([letter] * count)
+    drawn_letters = letter_bag.draw_many(count_to_draw)
+    logger.info(f"Yeni harfler çekildi ({len(drawn_letters)} adet): {drawn_letters}")
+    player_hand_list.extend(drawn_letters)
+    return player_hand_list
 
-        if not letter_bag:  # Çekilecek harf yoksa
-            return player_hand_list, remaining_letters_dict  # Güncel dict'i döndür
-
-        random.shuffle(letter_bag)
-        actual_draw_count = min(count_to_draw, len(letter_bag))
-        drawn_letters = []
-
-        if actual_draw_count > 0:
-            drawn_letters = letter_bag[:actual_draw_count]
-            logger.info(f"Yeni harfler çekildi ({actual_draw_count} adet): {drawn_letters}")
-        else:  # Çekilecek harf kalmadıysa (min ile yakalandı)
-            logger.info("Torbada çekilecek harf kalmadı (draw_new_letters).")
-
-        # Kalan harf sayılarını güncellemek için kopya al
-        final_remaining_dict = json.loads(json.dumps(remaining_letters_dict))  # Hızlı derin kopya
-
-        for letter in drawn_letters:
-            if letter in final_remaining_dict:
-                final_remaining_dict[letter]['count'] = max(0, final_remaining_dict[letter]['count'] - 1)
-
-            else:
-                logger.warning(f"Draw New: Çekilen harf '{letter}' havuzda yok?")
 
-        new_hand = player_hand_list + drawn_letters
-
-        return new_hand, final_remaining_dict
-
-    except Exception as e:
-        logger.error(f"draw_new_letters hata: {e}", exc_info=True)
-        return player_hand_list, remaining_letters_dict
-
-
-class PlacementValidationResult:  # Geçici Tanım
-    def __init__(self, status, message, validWords=None, invalidWord=None):
-        self.status = status;
-        self.message = message;
-        self.validWords = validWords;
-        self.invalidWord = invalidWord
-
-
-class ValidationStatus:  # Geçici Tanım
-    Ok = 'Ok';
-    InvalidWord = 'InvalidWord';
-    InvalidPlacement = 'InvalidPlacement';
-    InvalidAxis = 'InvalidAxis';
-    NoTilesPlaced = 'NoTilesPlaced'
-
-
-class FoundWord:  # Geçici Tanım
-    pass  # Gerçek tip tanımı word-checker'dan gelmeli
-
-
-def checkWordPlacement_server(placed_tiles, committed_board, dictionary_set) -> PlacementValidationResult:
-    logger.warning("Uyarı: Gerçek checkWordPlacement_server fonksiyonu implemente edilmedi!")
-    # TODO: Gerçek Scrabble doğrulama mantığını (eksen, bağlantı, merkez, cross-words, sözlük) burada implemente et.
-    # Şimdilik basitçe geçerli varsayalım (test için):
-    words = [{"word": "".join(t['letter'] for t in placed_tiles) or "TEST",
-              "path": [{'row': t['row'], 'col': t['col']} for t in placed_tiles]}]
-    return PlacementValidationResult(status=ValidationStatus.Ok, message="OK (Placeholder)", validWords=words)
-
-
-def _pos_to_a1(row, col):
-    if row < 0 or row >= 15 or col < 0 or col >= 15: return None
-    return f"{chr(ord('A') + col)}{row + 1}"
-
-
-# --- Ana Skor Hesaplama Fonksiyonu ---
-def calculate_score_server_side(
-        valid_words: list,  # [{'word': 'ELMA', 'path': [{'row': 7, 'col': 7}, ...]}, ...]
-        placed_tiles: list,  # [{'letter': 'E', 'row': 7, 'col': 8, 'is_blank': False}, ...]
-        reward_board: dict,  # {"A1": "TW", ...}
-        letter_scores: dict,  # {"A": 1, "B": 3, ...}
-        block_bonuses_flag: bool  # True ise bonuslar uygulanmaz
-) -> int:
-    total_score = 0
-    if not valid_words: return 0
-
-    placed_coords_set = {f"{tile['row']}_{tile['col']}" for tile in placed_tiles}
-    placed_tiles_map = {f"{t['row']}_{t['col']}": t for t in placed_tiles}  # Hızlı erişim için
-
-    all_word_scores_debug = []  # Detaylı loglama için
-
-    for word_info in valid_words:
-        word_score = 0
-        word_multiplier = 1
-        path = word_info.get('path', [])
-        word_str = word_info.get('word', '')
-        logger.debug(f"Scoring Word: '{word_str}'")
-
-        current_word_calculation = []  # Harf bazında hesaplama detayı
-
-        for pos in path:
-            row, col = pos['row'], pos['col']
-            coord_key_rc = f"{row}_{col}"
-            coord_key_a1 = _pos_to_a1(row, col)
-
-            # Harfi bul - Önce bu tur konulanlara bak, sonra tahtaya (valid_words yolu doğruysa sorun olmaz)
-            letter = '?'  # Varsayılan
-            placed_tile_info = placed_tiles_map.get(coord_key_rc)
-            is_newly_placed = bool(placed_tile_info)
-            if placed_tile_info:
-                letter = placed_tile_info['letter'].upper()
-            else:
-                # Eğer valid_words path'inde bu tur konulmayan taş varsa,
-                # bu taşın harfini committed_board'dan almak gerekir.
-                # Ancak valid_words sadece yeni oluşan kelimeleri içermeli.
-                # Şimdilik kelime string'inden alalım (checkWordPlacement'ın doğruluğuna güvenir)
-                try:
-                    path_index = path.index(pos)  # Pozisyonun index'ini bul
-                    letter = word_str[path_index].upper()
-                except (ValueError, IndexError):
-                    logger.error(f"Skorlama: Path/Word uyumsuzluğu! Word:'{word_str}', Pos:{pos}")
-                    continue  # Bu harfi atla
-
-            is_blank = placed_tile_info.get('is_blank', False) if placed_tile_info else False
-            base_letter_score = 0 if is_blank else letter_scores.get(letter, 0)  # Joker 0 puan
-
-            letter_multiplier = 1
-            current_word_multiplier_bonus = 1  # Bu harfin bastığı kare kelime bonusu veriyor mu?
-
-            # Bonusları SADECE bu turda yerleştirilen taşlar için uygula (ve eğer bloklanmadıysa)
-            if not block_bonuses_flag and is_newly_placed and coord_key_a1 and coord_key_a1 in reward_board:
-                bonus = reward_board[coord_key_a1]
-                if bonus == 'DL':
-                    letter_multiplier = 2
-                elif bonus == 'TL':
-                    letter_multiplier = 3
-                elif bonus == 'DW':
-                    current_word_multiplier_bonus = 2
-                elif bonus == 'TW':
-                    current_word_multiplier_bonus = 3
-                elif bonus == '★':
-                    current_word_multiplier_bonus = 2  # Merkez = DW
-                logger.debug(
-                    f"  Bonus Applied: {coord_key_a1} ({letter}) New:{is_newly_placed} Bonus:{bonus} LM:{letter_multiplier} WM:{current_word_multiplier_bonus}")
-
-            word_multiplier *= current_word_multiplier_bonus  # Kelime çarpanlarını biriktir
-            current_tile_score = base_letter_score * letter_multiplier
-            word_score += current_tile_score
-            current_word_calculation.append(f"{letter}({base_letter_score}x{letter_multiplier})")
-
-        final_word_score = word_score * word_multiplier
-        debug_str = f"'{word_str}': ({'+'.join(current_word_calculation)}) x {word_multiplier} = {final_word_score}"
-        logger.debug(debug_str)
-        all_word_scores_debug.append(debug_str)
-        total_score += final_word_score
-
-    # Bingo bonusu
-    if len(placed_tiles) == 7:
-        logger.info("Bingo bonusu (+50) eklendi.")
-        total_score += 50
-
-    logger.info(f"Hesaplanan Toplam Skor: {total_score}. Detay: {'; '.join(all_word_scores_debug)}")
-    return max(0, total_score)
+def checkWordPlacement_server(placed_tiles, committed_board, dictionary=None) -> PlacementValidationResult:
+    if dictionary is None:
+        dictionary = get_dictionary()
+    return check_word_placement(placed_tiles, committed_board, dictionary)
 
 
 @socketio.on('connect')
-def handle_connect():
-    logger.info(f"Client bağlandı: {request.sid}")
+def handle_connect(auth=None):
+    # İstemci /login'in verdiği anahtarı gönderir (io(url, {auth: {token}})); anahtarsız bağlantı oyuncu
+    # odalarına katılamaz, sadece ortak odaları dinler
+    token = auth.get('token') if isinstance(auth, dict) else None
+    if token:
+        try:
+            socket_users[request.sid] = int(session_tokens.loads(token, max_age=SESSION_TOKEN_MAX_AGE))
+        except (BadSignature, TypeError, ValueError):
+            logger.warning(f"Client {request.sid} geçersiz oturum anahtarı gönderdi.")
+    logger.info(f"Client bağlandı: {request.sid} (kullanıcı: {socket_users.get(request.sid)})")
     emit('connection_success', {'message': 'Sunucuya başarıyla bağlandınız!'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     logger.info(f"Client bağlantısı kesildi: {request.sid}")
+    socket_users.pop(request.sid, None)
+    matchmaker.cancel_sid(request.sid)  # Kuyrukta bekliyorsa aramayı iptal et
     # TODO: Odalardan otomatik çıkarma veya oyuncu durumu güncelleme eklenebilir.
 
 
+@socketio.on('queue_join')
+def handle_queue_join(data):
+    try:
+        user_id = int(data.get('user_id'))
+        game_duration = data.get('game_duration')
+    except (TypeError, ValueError, AttributeError) as e:
+        logger.warning(f"Client {request.sid} geçersiz 'queue_join' isteği: {e}")
+        emit('match_error', {"message": "Geçersiz veya eksik parametre."}, to=request.sid)
+        return
+
+    if not matchmaker.is_valid_mode(game_duration):
+        logger.warning(f"Desteklenmeyen game_duration alındı: {game_duration}")
+        emit('match_error', {"message": f"Geçersiz oyun süresi belirtildi: {game_duration}"}, to=request.sid)
+        return
+
+    # Bekleyen HTTP isteği yok; sonuç 'match_found' ile iki oyuncunun sid'ine gönderilir
+    ensure_matchmaking_sweeper()
+    ensure_game_template_refiller()
+    ticket, opponent_ticket = matchmaker.join(user_id, game_duration, sid=request.sid,
+                                              excluded_opponents=get_active_opponents(user_id),
+                                              rating=get_user_rating(user_id))
+    if opponent_ticket is not None:
+        finalize_match(ticket, opponent_ticket)
+    else:
+        emit('queue_joined', {"game_duration": game_duration}, to=request.sid)
+
+
+@socketio.on('queue_cancel')
+def handle_queue_cancel(data=None):
+    cancelled = matchmaker.cancel_sid(request.sid)
+    emit('queue_cancelled', {"cancelled": cancelled}, to=request.sid)
+
+
 @socketio.on('join_game')
 def handle_join_game(data):
     game_id = data.get('game_id')
     if game_id:
+        # Oyuncular kendi odalarına katılır (sadece kendi elini görür), diğerleri ortak odaya. Oyuncu odası
+        # için user_id, bu bağlantının oturum anahtarıyla doğrulanan kullanıcı olmalıdır.
         room = str(game_id)
+        try:
+            user_id = int(data.get('user_id'))
+            game = db.session.get(Game, int(game_id))
+            if game and user_id in (game.user1, game.user2):
+                if socket_users.get(request.sid) == user_id:
+                    room = player_room(game.id, user_id)
+                else:
+                    logger.warning(f"Client {request.sid}, doğrulanmamış kullanıcı {user_id} olarak oyun "
+                                   f"{game_id} oyuncu odasına katılmak istedi.")
+        except (TypeError, ValueError):
+            pass
         join_room(room)
         logger.info(f"Client {request.sid}, '{room}' odasına katıldı.")
         emit('joined_room', {'room': room, 'message': f"'{room}' odasına katıldınız."},
@@ -1310,12 +1386,42 @@ def handle_join_game(data):
         logger.warning(f"Client {request.sid} geçersiz 'join_game' isteği.")
 
 
+@socketio.on('request_resync')
+def handle_request_resync(data):
+    """İstemci delta versiyonlarında boşluk fark ederse oyunun tam durumunu sadece ona gönderir."""
+    try:
+        game_id = int(data.get('game_id'))
+    except (TypeError, ValueError, AttributeError):
+        logger.warning(f"Client {request.sid} geçersiz 'request_resync' isteği.")
+        return
+    ensure_game_store()
+    try:
+        game = game_store.acquire(game_id)
+    except GameResyncRequired:
+        emit('game_error', {"message": "Oyun durumu eşitleniyor, lütfen daha sonra tekrar deneyin."}, to=request.sid)
+        return
+    if not game:
+        emit('game_error', {"message": "Oyun bulunamadı."}, to=request.sid)
+        return
+    try:
+        logger.info(f"Client {request.sid}, oyun {game_id} için tam durum istedi (v{game.state_version}).")
+        # El sadece bu bağlantı o oyuncunun odasına katıldıysa eklenir
+        user_id = next((player_id for player_id in (game.user1, game.user2)
+                        if player_room(game.id, player_id) in rooms()), None)
+        state = player_game_state(serialize_game_state(game), game, user_id)
+    finally:
+        game_store.release(game)
+    emit('game_updated', state, to=request.sid)
+
+
 @socketio.on('leave_game')
 def handle_leave_game(data):
     game_id = data.get('game_id')
     if game_id:
         room = str(game_id)
         leave_room(room)
+        if data.get('user_id') is not None:
+            leave_room(player_room(game_id, data.get('user_id')))
         logger.info(f"Client {request.sid}, '{room}' odasından ayrıldı.")
     else:
         logger.warning(f"Client {request.sid} geçersiz 'leave_game' isteği.")
@@ -1324,10 +1430,22 @@ def handle_leave_game(data):
 if __name__ == '__main__':
     with app.app_context():
         try:
-            db.create_all()
-            logger.info("Veritabanı tabloları kontrol edildi/oluşturuldu.")
+            # Eksik tablolar, sütunlar ve indeksler numaralı geçişlerle oluşturulur (bkz. migrations.py)
+            upgrade_database()
+            logger.info("Veritabanı şeması kontrol edildi/güncellendi.")
         except Exception as create_err:
-            logger.error(f"Veritabanı tabloları oluşturulurken hata: {create_err}")
+            logger.error(f"Veritabanı şeması güncellenirken hata: {create_err}")
+
+    # Sözlüğü ilk hamleyi beklemeden yükle
+    get_dictionary()
+
+    # Önceki çalışmadan günlükte kalan hamleleri veritabanına uygula
+    with app.app_context():
+        ensure_game_store()
+        default_layout_id()  # Standart ödül tahtası düzeni tabloda yoksa eklenir
+
+    # Oyun şablonu havuzunu ilk eşleşmeleri beklemeden doldurmaya başla
+    ensure_game_template_refiller()
 
     logger.info("SocketIO Sunucusu başlatılıyor...")
     # Geliştirme için debug=True, use_reloader=True
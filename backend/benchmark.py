@@ -0,0 +1,829 @@
+# Performans Ölçümleri
+# python benchmark.py matchmaking
+# python benchmark.py fanout
+# python benchmark.py scoring
+# python benchmark.py move-alloc
+# python benchmark.py racks
+# python benchmark.py match-flow
+# python benchmark.py explain
+# python benchmark.py completed-games
+# python benchmark.py active-games
+# python benchmark.py users
+import argparse
+import logging
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _bench_store(spec):
+    """Boş bir TWO_MIN kuyruğu: memory, fakeredis, redislite (geçici redis-server) veya redis://..."""
+    from matchmaking_store import InProcessMatchmakingStore, RedisMatchmakingStore, FakeRedis
+
+    if spec == 'memory':
+        return InProcessMatchmakingStore(modes=("TWO_MIN",))
+    if spec == 'fakeredis':
+        return RedisMatchmakingStore(FakeRedis(), modes=("TWO_MIN",))
+    if spec == 'redislite':
+        import redislite
+        return RedisMatchmakingStore(redislite.Redis(), modes=("TWO_MIN",))
+    import redis
+    client = redis.Redis.from_url(spec)
+    client.delete(*client.keys('matchmaking:TWO_MIN:*') or ['-'])
+    return RedisMatchmakingStore(client, modes=("TWO_MIN",))
+
+
+def bench_matchmaking(args):
+    """
+    10k oyuncunun kuyruğa girdiği simülasyon: eşleşme süresi (simüle saniye), puan farkı (kalite)
+    ve 10k kişilik kuyrukta tek rakip aramanın gerçek süresi ölçülür. --store ile kuyruk Redis'te tutulur
+    (fakeredis, redis://... veya redislite paketiyle geçici bir redis-server).
+    """
+    from matchmaking import Matchmaker, RatingQueue, Ticket
+
+    store = _bench_store(args.store)
+
+    rng = random.Random(args.seed)
+    ratings = [max(0, int(rng.gauss(1000, 300))) for _ in range(args.users)]
+
+    # 1. Simülasyon (sanal saat ile)
+    clock = [0.0]
+    matchmaker = Matchmaker(modes=("TWO_MIN",), clock=lambda: clock[0], store=store)
+    joined_at = {}
+    wait_times = []
+    rating_gaps = []
+    join_latencies = []
+    sweep_latencies = []
+    next_sweep = 1.0
+
+    def sweep():
+        start = time.perf_counter()
+        pairs = matchmaker.sweep("TWO_MIN")
+        sweep_latencies.append(time.perf_counter() - start)
+        return pairs
+
+    def record(pairs):
+        for ticket, opponent_ticket in pairs:
+            for own in (ticket, opponent_ticket):
+                wait_times.append(clock[0] - joined_at[own.user_id])
+            rating_gaps.append(abs(ticket.rating - opponent_ticket.rating))
+            matchmaker.complete(ticket, opponent_ticket, game_id=0)
+
+    for user_id, rating in enumerate(ratings):
+        clock[0] += rng.expovariate(args.arrival_rate)
+        while next_sweep <= clock[0]:
+            saved = clock[0]
+            clock[0] = next_sweep
+            record(sweep())
+            clock[0] = saved
+            next_sweep += 1.0
+        joined_at[user_id] = clock[0]
+        start = time.perf_counter()
+        ticket, opponent_ticket = matchmaker.join(user_id, "TWO_MIN", rating=rating)
+        join_latencies.append(time.perf_counter() - start)
+        if opponent_ticket is not None:
+            record([(ticket, opponent_ticket)])
+
+    while matchmaker.store.stats()["queues"]["TWO_MIN"] > 1:
+        clock[0] = next_sweep
+        record(sweep())
+        next_sweep += 1.0
+
+    print(f"Eşleştirme simülasyonu: {args.users} oyuncu, saniyede {args.arrival_rate} katılım ({args.store})")
+    print(f"  eşleşen oyuncu          : {len(wait_times)}")
+    print(f"  eşleşme süresi (medyan) : {statistics.median(wait_times):.2f} sn")
+    print(f"  eşleşme süresi (p95)    : {_percentile(wait_times, 95):.2f} sn")
+    print(f"  puan farkı (medyan)     : {statistics.median(rating_gaps):.0f}")
+    print(f"  puan farkı (p95)        : {_percentile(rating_gaps, 95):.0f}")
+    print(f"  join süresi (medyan)    : {statistics.median(join_latencies) * 1e6:.1f} µs")
+    print(f"  sweep süresi (medyan)   : {statistics.median(sweep_latencies) * 1e3:.2f} ms")
+    print(f"  sweep süresi (en fazla) : {max(sweep_latencies) * 1e3:.2f} ms")
+
+    # 2. 10k kişilik dolu kuyrukta rakip arama süresi (kuyruk değiştirilmez, sadece arama ölçülür)
+    queue = RatingQueue()
+    for user_id, rating in enumerate(ratings):
+        queue.add(Ticket(user_id, "TWO_MIN", rating=rating, joined_at=0.0))
+    lookups = []
+    for i in range(args.users):
+        probe = Ticket(-1 - i, "TWO_MIN", rating=ratings[rng.randrange(len(ratings))], joined_at=0.0)
+        start = time.perf_counter()
+        queue.find_partner(probe, now=0.0)
+        lookups.append(time.perf_counter() - start)
+    print(f"Dolu kuyrukta arama ({len(queue)} bekleyen)")
+    print(f"  find_partner (medyan)   : {statistics.median(lookups) * 1e6:.1f} µs")
+    print(f"  find_partner (p99)      : {_percentile(lookups, 99) * 1e6:.1f} µs")
+
+    if args.store == 'memory':
+        return
+    # 3. Redis deposunda arama. En eski bekleyenin penceresi sınırsız (kimse onunla eşleşemiyor), bu yüzden arama
+    # aralığı bütün puanları kapsar; script yine de sadece en yakın adayları incelemeli.
+    store = _bench_store(args.store)
+    store.pair_or_enqueue("TWO_MIN", Ticket(-1, "TWO_MIN", rating=-10 ** 6, joined_at=-60.0), -60.0)
+    for user_id in range(args.users):
+        store.pair_or_enqueue("TWO_MIN", Ticket(user_id, "TWO_MIN", rating=user_id * 1000, excluded=frozenset({-1}),
+                                                joined_at=0.0), 0.0)
+    lookups = []
+    for i in range(200):
+        probe = Ticket(args.users + i, "TWO_MIN", rating=rng.randrange(args.users) * 1000 + 500,
+                       excluded=frozenset({-1}), joined_at=0.0)
+        start = time.perf_counter()
+        store.pair_or_enqueue("TWO_MIN", probe, 0.0)  # Eşleşme yok: kuyruğa eklenir
+        lookups.append(time.perf_counter() - start)
+        store.remove("TWO_MIN", probe.user_id)
+    print(f"Depoda arama ({args.store}, {args.users + 1} bekleyen, en eskisi sınırsız pencereli)")
+    print(f"  pair_or_enqueue (medyan): {statistics.median(lookups) * 1e6:.1f} µs")
+
+
+def _fanout_receiver(url, expected, ready, results):
+    """Alıcı worker: kuyruktan gelen her emit'in gönderilmesinden bu process'e ulaşmasına kadar geçen süreyi
+    kaydeder."""
+    import socketio
+
+    latencies = []
+    done = threading.Event()
+
+    class RecordingManager(socketio.RedisManager):
+        def _handle_emit(self, message):
+            latencies.append(time.time() - message['data'][0]['sent_at'])
+            super()._handle_emit(message)  # Odadaki yerel istemcilere iletim (gerçek worker'daki gibi)
+            if len(latencies) >= expected:
+                done.set()
+
+    manager = RecordingManager(url)
+    socketio.Server(async_mode='threading', client_manager=manager)
+    manager.initialize()
+    ready.put(True)
+    done.wait(60)
+    results.put(latencies)
+
+
+def bench_fanout(args):
+    """
+    Bir worker'ın yaptığı emit'in Redis mesaj kuyruğu (SOCKETIO_MESSAGE_QUEUE) üzerinden diğer worker
+    process'lerine ulaşma süresi. N worker = 1 gönderen (bu process) + N-1 alıcı process.
+    --queue redislite ile geçici bir redis-server başlatılır.
+    """
+    import socketio
+
+    url = args.queue
+    if url == 'redislite':
+        import redislite
+        server = redislite.Redis()
+        url = f"unix://{server.socket_file}"
+    context = multiprocessing.get_context('spawn')
+
+    for workers in args.workers:
+        ready, results = context.Queue(), context.Queue()
+        receivers = [context.Process(target=_fanout_receiver, args=(url, args.messages, ready, results))
+                     for _ in range(workers - 1)]
+        for process in receivers:
+            process.start()
+        for _ in receivers:
+            ready.get(timeout=30)
+        time.sleep(0.5)  # Abonelerin kanala kaydolması için
+
+        manager = socketio.RedisManager(url, write_only=True)
+        socketio.Server(async_mode='threading', client_manager=manager)
+        for i in range(args.messages):
+            manager.emit('game_updated', {"sent_at": time.time(), "seq": i}, room='game_1')
+            time.sleep(args.interval / 1000)
+
+        latencies = []
+        for _ in receivers:
+            latencies.extend(results.get(timeout=90))
+        for process in receivers:
+            process.join()
+
+        expected = args.messages * (workers - 1)
+        print(f"Emit yayını: {workers} worker ({workers - 1} alıcı), {args.messages} mesaj")
+        print(f"  ulaşan / beklenen       : {len(latencies)} / {expected}")
+        print(f"  gecikme (medyan)        : {statistics.median(latencies) * 1000:.3f} ms")
+        print(f"  gecikme (p95)           : {_percentile(latencies, 95) * 1000:.3f} ms")
+        print(f"  gecikme (p99)           : {_percentile(latencies, 99) * 1000:.3f} ms")
+
+
+def _synthetic_moves(rng, count):
+    """Rastgele eksende 2-8 harflik 1-3 kelime ve bu kelimelerin yollarına konmuş 1-7 taştan oluşan hamleler."""
+    import game_data
+
+    letters = [letter for letter in game_data.LETTER_SCORES if letter != '*']
+    axes = ((0, 1), (1, 0), (1, 1))
+    moves = []
+    for _ in range(count):
+        words = []
+        placed = {}
+        for _ in range(rng.randint(1, 3)):
+            length = rng.randint(2, 8)
+            dr, dc = rng.choice(axes)
+            row = rng.randrange(game_data.BOARD_SIZE - dr * (length - 1))
+            col = rng.randrange(game_data.BOARD_SIZE - dc * (length - 1))
+            path = [{'row': row + dr * i, 'col': col + dc * i} for i in range(length)]
+            word = "".join(rng.choice(letters) for _ in range(length))
+            words.append({'word': word, 'path': path})
+            for i, pos in enumerate(path):
+                if rng.random() < 0.5:
+                    placed[(pos['row'], pos['col'])] = {**pos, 'letter': word[i], 'is_blank': rng.random() < 0.05}
+        tiles = list(placed.values())[:7] or [{**words[0]['path'][0], 'letter': words[0]['word'][0]}]
+        moves.append((words, tiles, rng.random() < 0.1))
+    return moves
+
+
+def bench_scoring(args):
+    """
+    Sentetik hamlelerin skor motoruyla puanlanma süresi (hamle başına µs ve saniyedeki hamle). Çarpan dizileri
+    /submit-move'daki gibi get_layout ile (geçici sqlite veritabanındaki standart düzenden) alınır.
+    """
+    import os
+    import tempfile
+
+    workdir = tempfile.mkdtemp(prefix='scoring-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    import game_data
+    from board_layouts import default_layout_id, get_layout
+    from migrations import upgrade
+    from scoring import score_words
+
+    moves = _synthetic_moves(random.Random(args.seed), args.moves)
+    with server.app.app_context():
+        upgrade()
+        layout = get_layout(default_layout_id())
+    letter_multipliers, word_multipliers = layout.letter_multipliers, layout.word_multipliers
+    letter_scores = game_data.LETTER_SCORES
+
+    start = time.perf_counter()
+    total = 0
+    for words, tiles, block_bonuses in moves:
+        total += score_words(words, tiles, letter_scores, block_bonuses, letter_multipliers, word_multipliers)
+    elapsed = time.perf_counter() - start
+
+    word_count = sum(len(words) for words, _, _ in moves)
+    print(f"Skorlama: {len(moves)} sentetik hamle, {word_count} kelime")
+    print(f"  toplam süre             : {elapsed * 1000:.1f} ms")
+    print(f"  hamle başına            : {elapsed / len(moves) * 1e6:.2f} µs")
+    print(f"  saniyede hamle          : {len(moves) / elapsed:,.0f}")
+    print(f"  ortalama puan           : {total / len(moves):.1f}")
+
+
+def bench_move_alloc(args):
+    """
+    Hamle hattının bellek ayırma bütçesi (tracemalloc): geçici bir sqlite veritabanında /submit-move görünümü
+    doğrudan çağrılır ve hamle başına geçici bellek tepe noktası ölçülür. Medyan bütçeyi aşarsa çıkış kodu 1 olur.
+    """
+    import os
+    import sys
+    import tempfile
+    import tracemalloc
+
+    workdir = tempfile.mkdtemp(prefix='move-alloc-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    os.environ['GAME_JOURNAL_FSYNC'] = '0'
+    import app as server
+    from models import db, User
+    from game_state import bump_state_version
+
+    with server.app.app_context():
+        db.create_all()
+        for user_id in (1, 2):
+            db.session.add(User(id=user_id, username=f"bench{user_id}", email=f"bench{user_id}@example.com",
+                                password="-", total_points=0))
+        db.session.commit()
+        game_ids = [server.create_matched_game(1, 2, "FIVE_MIN") for _ in range(args.moves + 1)]
+        server.ensure_game_store()
+        for game_id in game_ids:
+            # Her oyunda aynı el ve tuzaksız tahta: her hamle aynı işi yapar
+            game = server.game_store.acquire(game_id)
+            game.user1_letters = list("ELMAKTR")
+            game.hidden_board = {}
+            bump_state_version(game)
+            server.game_store.commit(game)
+            server.game_store.release(game)
+
+    def submit(game_id):
+        payload = {'game_id': game_id, 'user_id': 1,
+                   'placed_tiles': [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]}
+        with server.app.test_request_context('/submit-move', method='POST', json=payload):
+            server.request.get_json()  # Gövde okuma tamponu (werkzeug) ölçüme girmesin
+            request_base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _, status = server.submit_move_secure()
+            return status, tracemalloc.get_traced_memory()[1] - request_base
+
+    tracemalloc.start()
+    submit(game_ids[0])  # Isınma (sözlük, lazy import'lar)
+    peaks = []
+    for game_id in game_ids[1:]:
+        status, peak = submit(game_id)
+        if status != 200:
+            print(f"Hamle başarısız (HTTP {status}), oyun {game_id}")
+            sys.exit(1)
+        peaks.append(peak)
+    tracemalloc.stop()
+
+    median_kb = statistics.median(peaks) / 1024
+    print(f"Hamle bellek ayırma: {len(peaks)} hamle")
+    print(f"  tepe (medyan)           : {median_kb:.1f} KB")
+    print(f"  tepe (maks)             : {max(peaks) / 1024:.1f} KB")
+    print(f"  bütçe                   : {args.budget_kb:.1f} KB")
+    if median_kb > args.budget_kb:
+        print("  BÜTÇE AŞILDI")
+        sys.exit(1)
+
+
+def bench_racks(args):
+    """
+    Oyun başı el dağıtımı: dengeli el örnekleyicisi (draw_balanced_rack) ile torbadan düz rastgele 7 harf
+    çekmenin karşılaştırması. Hız ve el kalitesi (denge oranı, sesli dağılımı, farklı harf sayısı) raporlanır.
+    """
+    import collections
+    import game_data
+    from letter_bag import LetterBag, RACK_SIZE, draw_balanced_rack, rack_balance
+
+    samplers = {
+        "dengeli örnekleyici": draw_balanced_rack,
+        "düz rastgele çekiliş": lambda bag: bag.draw_many(RACK_SIZE),
+    }
+    for name, sampler in samplers.items():
+        rng = random.Random(args.seed)
+        racks = []
+        start = time.perf_counter()
+        for _ in range(args.games):
+            bag = LetterBag.from_pool(game_data.remaining_letters, rng=rng)
+            racks.append(sampler(bag))
+            racks.append(sampler(bag))
+        elapsed = time.perf_counter() - start
+
+        balances = [rack_balance(rack) for rack in racks]
+        balanced = sum(1 for vowels, consonants in balances if vowels >= 2 and consonants >= 2)
+        vowel_histogram = collections.Counter(vowels for vowels, _ in balances)
+        print(f"El dağıtımı ({name}): {args.games} oyun, {len(racks)} el")
+        print(f"  oyun başına             : {elapsed / args.games * 1e6:.1f} µs")
+        print(f"  dengeli el oranı        : {balanced / len(racks) * 100:.2f} %")
+        print(f"  sesli sayısı dağılımı   : " + ", ".join(
+            f"{vowels}:{vowel_histogram[vowels] / len(racks) * 100:.1f}%" for vowels in range(RACK_SIZE + 1)))
+        print(f"  farklı harf (ortalama)  : {statistics.mean(len(set(rack)) for rack in racks):.2f}")
+        print(f"  jokerli el oranı        : "
+              f"{sum(1 for rack in racks if 'Blank' in rack) / len(racks) * 100:.2f} %")
+
+
+def bench_match_flow(args):
+    """
+    Eşleşme yük testi: searchers oyuncu aynı anda /find-opponent çağırır (eventlet green thread'leri, geçici sqlite
+    veritabanı). İki akış karşılaştırılır: çiftin kuyruğa verilip oyunların match_persister ile toplu commit'lerle
+    oluşturulması ve eşleşmeyi bulan istekte oyunun tek tek oluşturulması (eski akış). Her commit'e
+    --commit-latency-ms kadar gecikme eklenir (MySQL'e gidiş-dönüş).
+    """
+    import os
+    import collections
+    import tempfile
+
+    workdir = tempfile.mkdtemp(prefix='match-flow-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    import eventlet
+    from sqlalchemy import event
+    from models import db, User
+
+    rng = random.Random(args.seed)
+    commits = [0]
+
+    def on_commit(session):
+        commits[0] += 1
+        if args.commit_latency_ms:
+            eventlet.sleep(args.commit_latency_ms / 1000)
+
+    def finalize_inline(ticket, opponent_ticket):
+        # Eski akış: oyun, eşleşmeyi bulan istekte (veya taramada) hemen oluşturulur
+        with server.app.app_context():
+            try:
+                game_id = server.create_matched_game(ticket.user_id, opponent_ticket.user_id, ticket.mode)
+            except Exception:
+                db.session.rollback()
+                server.matchmaker.fail(ticket, opponent_ticket)
+            else:
+                server.matchmaker.complete(ticket, opponent_ticket, game_id)
+
+    flows = {"kuyruk + toplu commit": server.finalize_match, "istek içinde (eski akış)": finalize_inline}
+    with server.app.app_context():
+        db.create_all()
+        db.session.add_all([User(id=user_id, username=f"bench{user_id}", email=f"bench{user_id}@example.com",
+                                 password="-", total_points=max(0, int(rng.gauss(1000, args.rating_spread))))
+                            for user_id in range(1, args.searchers * len(flows) + 1)])
+        db.session.commit()
+    event.listen(db.session, 'after_commit', on_commit)
+    server.game_template_pool.refill()
+
+    client = server.app.test_client()
+    for index, (name, finalize) in enumerate(flows.items()):
+        server.finalize_match = finalize
+        user_ids = range(index * args.searchers + 1, (index + 1) * args.searchers + 1)
+        latencies = []
+        outcomes = collections.Counter()
+
+        def search(user_id):
+            start = time.perf_counter()
+            response = client.post('/find-opponent', json={'user_id': user_id, 'game_duration': 'FIVE_MIN'})
+            latencies.append(time.perf_counter() - start)
+            body = response.get_json() or {}
+            outcomes['eşleşti' if body.get('opponentFound') else body.get('message') or 'eşleşmedi'] += 1
+
+        commits[0] = 0
+        pool = eventlet.GreenPool(args.searchers)
+        start = time.perf_counter()
+        for user_id in user_ids:
+            pool.spawn(search, user_id)
+        pool.waitall()
+        elapsed = time.perf_counter() - start
+
+        print(f"Eşleşme akışı ({name}): {args.searchers} eşzamanlı arayan, commit gecikmesi "
+              f"{args.commit_latency_ms:.0f} ms")
+        print(f"  sonuçlar                : " + ", ".join(f"{k}: {v}" for k, v in outcomes.items()))
+        print(f"  toplam süre             : {elapsed:.2f} sn")
+        print(f"  saniyede eşleşme        : {outcomes['eşleşti'] / 2 / elapsed:,.0f}")
+        print(f"  yanıt süresi (medyan)   : {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"  yanıt süresi (p95)      : {_percentile(latencies, 95) * 1000:.1f} ms")
+        print(f"  veritabanı commit'i     : {commits[0]}")
+    print(f"  kilit istatistikleri    : {server.matchmaker.stats()['locks']['FIVE_MIN']}")
+    print(f"  oyun oluşturma kuyruğu  : {server.match_queue.stats()}")
+
+
+def _in_app_context(server, run):
+    """run'ı kendi app context'inde çalıştıran fonksiyon (istekler gibi oturumu kendisi açıp kapatır)."""
+    def call():
+        with server.app.app_context():
+            return run()
+    return call
+
+
+def bench_explain(args):
+    """
+    Sık çalışan sorguların planları (EXPLAIN). Uç noktalar gerçekten çağrılır ve çalıştırdıkları SELECT'ler
+    yakalanır; herhangi biri tablo taramasına (full scan) dönerse çıkış kodu 1 olur. Varsayılan olarak geçici bir
+    sqlite veritabanı geçişlerle (migrations.py) sıfırdan kurulup sentetik oyunlarla doldurulur;
+    --database-url verilirse mevcut veritabanında (örn. MySQL) sadece okuma yapan sorgular çalıştırılır.
+    """
+    import os
+    import sys
+    import tempfile
+    from datetime import datetime, timedelta
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix='explain-')
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    from sqlalchemy import insert, text
+    from models import db, User, Game, GameMode
+    from migrations import upgrade
+    from board_layouts import default_layout_id
+    from query_plans import explain_request
+
+    with server.app.app_context():
+        if not args.database_url:
+            upgrade()
+            rng = random.Random(args.seed)
+            db.session.execute(insert(User), [
+                {"id": user_id, "username": f"bench{user_id}", "email": f"bench{user_id}@example.com",
+                 "password": "-", "total_points": rng.randrange(2000)} for user_id in range(1, args.users + 1)])
+            layout_id = default_layout_id()
+            start = datetime(2025, 1, 1)
+            db.session.execute(insert(Game), [
+                {"user1": user1, "user2": user2, "board_layout_id": layout_id, "game_board": {},
+                 "remaining_letters": {}, "gamemode": GameMode.FIVE_MIN, "created_at": start + timedelta(minutes=i),
+                 "remaining_time": start + timedelta(minutes=i + 5), "user1_letters": [], "user2_letters": [],
+                 "hidden_board": {}, "status": 'active' if rng.random() < 0.1 else 'finished', "winner": user1,
+                 "user1_pass": 0, "user2_pass": 0, "state_version": 0}
+                for i, (user1, user2) in enumerate(rng.sample(range(1, args.users + 1), 2)
+                                                   for _ in range(args.games))])
+            db.session.commit()
+            db.session.execute(text("ANALYZE"))
+        user_id = db.session.query(db.func.min(User.id)).scalar()
+        start = db.session.query(db.func.max(Game.created_at)).scalar() or datetime(2025, 1, 1)
+        username, email = db.session.query(User.username, User.email).filter(User.id == user_id).one()
+
+    # Sık çalışan istekler: giriş, kayıt (mevcut kullanıcı adı / e-posta ve yeni kullanıcı), eşleştirme ön
+    # kontrolleri, oyun listeleri. Yeni kayıt veritabanına yazdığı için --database-url ile çalıştırılmaz.
+    client = server.app.test_client()
+    requests = {
+        "login": lambda: client.post('/login', json={'username': username, 'password': '-'}),
+        "register (kullanıcı adı)": lambda: client.post('/register', json={'username': username,
+                                                                            'email': 'x', 'password': '-'}),
+        "register (e-posta)": lambda: client.post('/register', json={'username': f"{username}-yeni",
+                                                                      'email': email, 'password': '-'}),
+        "find_opponent ön kontrol": lambda: (server.get_active_opponents(user_id), server.get_user_rating(user_id)),
+        "active-games": lambda: client.get(f'/active-games/{user_id}'),
+        "users (toplu)": lambda: client.get('/users', query_string={'ids': f"{user_id},{user_id + 1}"}),
+        "completed-games": lambda: client.get(f'/completed-games/{user_id}'),
+        "completed-games (imleç)": lambda: client.get(f'/completed-games/{user_id}',
+                                                      query_string={'cursor': server.encode_game_cursor(start, 1)}),
+    }
+    if not args.database_url:
+        requests["register (yeni)"] = lambda: client.post('/register', json={
+            'username': 'bench-yeni', 'email': 'bench-yeni@example.com', 'password': '-'})
+
+    failures = 0
+    with server.app.app_context():
+        engine = db.engine
+        for name, run in requests.items():
+            for statement, plan, scans in explain_request(engine, db.metadata.tables, _in_app_context(server, run)):
+                failures += bool(scans)
+                summary = "; ".join(str(row.get('detail') or f"{row.get('table')}: {row.get('type')} "
+                                                              f"{row.get('key')}") for row in plan)
+                print(f"{'TAM TARAMA' if scans else 'indeks':10} {name:26} {' '.join(statement.split())[:90]}")
+                print(f"{'':10} {'':26} {summary}")
+    if failures:
+        print(f"{failures} sorgu tablo taraması yapıyor.")
+        sys.exit(1)
+
+
+def bench_completed_games(args):
+    """
+    /completed-games sayfa süresi, biten oyun sayısı farklı oyuncular için (geçici sqlite, geçişlerle kurulur).
+    İlk sayfa ve imleçle ulaşılan derin sayfa ölçülür; süre oyun sayısıyla büyümemelidir.
+    """
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+
+    workdir = tempfile.mkdtemp(prefix='completed-games-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    from sqlalchemy import insert, text
+    from models import db, User, Game, GameMode
+    from migrations import upgrade
+    from board_layouts import default_layout_id
+
+    rng = random.Random(args.seed)
+    opponents = 200
+    players = list(range(opponents + 1, opponents + 1 + len(args.games)))
+    with server.app.app_context():
+        upgrade()
+        db.session.execute(insert(User), [
+            {"id": user_id, "username": f"bench{user_id}", "email": f"bench{user_id}@example.com",
+             "password": "-", "total_points": 0} for user_id in range(1, players[-1] + 1)])
+        layout_id = default_layout_id()
+        start = datetime(2025, 1, 1)
+        rows = []
+        for player, count in zip(players, args.games):
+            for i in range(count):
+                opponent = rng.randrange(1, opponents + 1)
+                user1, user2 = (player, opponent) if rng.random() < 0.5 else (opponent, player)
+                rows.append({"user1": user1, "user2": user2, "board_layout_id": layout_id, "game_board": {},
+                             "remaining_letters": {}, "gamemode": GameMode.FIVE_MIN,
+                             "created_at": start + timedelta(minutes=i), "remaining_time": start,
+                             "user1_letters": [], "user2_letters": [], "hidden_board": {}, "status": 'finished',
+                             "score1": rng.randrange(400), "score2": rng.randrange(400), "winner": None,
+                             "user1_pass": 0, "user2_pass": 0, "state_version": 0})
+        db.session.execute(insert(Game), rows)
+        db.session.commit()
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    client = server.app.test_client()
+
+    def timed(url, **query):
+        started = time.perf_counter()
+        response = client.get(url, query_string=query)
+        return (time.perf_counter() - started) * 1000, response.get_json()
+
+    print(f"{'oyun':>8} {'ilk sayfa p50 (ms)':>20} {'derin sayfa p50 (ms)':>22}")
+    for player, count in zip(players, args.games):
+        url = f'/completed-games/{player}'
+        first = [timed(url, limit=args.page_size)[0] for _ in range(args.repeat)]
+        # Listenin ortasındaki bir sayfanın imleci (sayfalar imleçle gezilerek değil, doğrudan kurulur)
+        middle = start + timedelta(minutes=count // 2)
+        cursor = server.encode_game_cursor(middle, 2 ** 31)
+        deep = [timed(url, limit=args.page_size, cursor=cursor)[0] for _ in range(args.repeat)]
+        _, page = timed(url, limit=args.page_size)
+        assert len(page["games"]) == min(count, args.page_size)
+        print(f"{count:>8} {statistics.median(first):>20.2f} {statistics.median(deep):>22.2f}")
+
+
+
+def bench_active_games(args):
+    """
+    /active-games istek süresi ve istek başına SQL sayısı: önbellekten (kullanıcı başına liste) ve önbelleksiz
+    (her istekten önce invalidate). Geçici sqlite veritabanı geçişlerle kurulur.
+    """
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+
+    workdir = tempfile.mkdtemp(prefix='active-games-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    from sqlalchemy import event, insert, text
+    from models import db, User, Game, GameMode
+    from migrations import upgrade
+    from board_layouts import default_layout_id
+
+    rng = random.Random(args.seed)
+    with server.app.app_context():
+        upgrade()
+        db.session.execute(insert(User), [
+            {"id": user_id, "username": f"bench{user_id}", "email": f"bench{user_id}@example.com",
+             "password": "-", "total_points": 0} for user_id in range(1, args.users + 1)])
+        layout_id = default_layout_id()
+        start = datetime(2025, 1, 1)
+        board = {f"{row}-{col}": None for row in range(15) for col in range(15)}  # Okunmaması gereken JSON yükü
+        db.session.execute(insert(Game), [
+            {"user1": user1, "user2": user2, "board_layout_id": layout_id, "game_board": board,
+             "remaining_letters": {}, "gamemode": GameMode.FIVE_MIN, "created_at": start + timedelta(minutes=i),
+             "remaining_time": start, "user1_letters": [], "user2_letters": [], "hidden_board": board,
+             "status": 'active' if rng.random() < 0.3 else 'finished', "user1_pass": 0, "user2_pass": 0,
+             "state_version": 0}
+            for i, (user1, user2) in enumerate(rng.sample(range(1, args.users + 1), 2)
+                                               for _ in range(args.games))])
+        db.session.commit()
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    client = server.app.test_client()
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    with server.app.app_context():
+        engine = db.engine
+    user_ids = [rng.randrange(1, args.users + 1) for _ in range(args.requests)]
+    print(f"{'':12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'SQL / istek':>12}")
+    for name, cached in (("önbelleksiz", False), ("önbellekli", True)):
+        server.active_games_cache.clear()
+        if cached:
+            for user_id in set(user_ids):
+                client.get(f'/active-games/{user_id}')
+        latencies = []
+        statements[0] = 0
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            for user_id in user_ids:
+                if not cached:
+                    server.active_games_cache.invalidate(user_id)
+                started = time.perf_counter()
+                client.get(f'/active-games/{user_id}')
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        print(f"{name:12} {statistics.median(latencies):>10.3f} {_percentile(latencies, 99):>10.3f} "
+              f"{statements[0] / len(user_ids):>12.2f}")
+    print(f"önbellek: {server.active_games_cache.stats()}")
+
+
+
+def bench_users(args):
+    """
+    Ekran başına kullanıcı adı çözümleme: rakip başına /user/<id> istekleri ile tek /users?ids=... isteği
+    karşılaştırılır (istek süresi ve SQL sayısı); profil önbelleği boş ve dolu iken. Geçici sqlite veritabanı.
+    """
+    import os
+    import tempfile
+
+    workdir = tempfile.mkdtemp(prefix='users-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['GAME_JOURNAL_PATH'] = os.path.join(workdir, 'journal.log')
+    import app as server
+    from sqlalchemy import event, insert
+    from models import db, User
+    from migrations import upgrade
+
+    rng = random.Random(args.seed)
+    with server.app.app_context():
+        upgrade()
+        db.session.execute(insert(User), [
+            {"id": user_id, "username": f"bench{user_id}", "email": f"bench{user_id}@example.com",
+             "password": "-", "total_points": rng.randrange(2000)} for user_id in range(1, args.users + 1)])
+        db.session.commit()
+        engine = db.engine
+
+    client = server.app.test_client()
+    screens = [rng.sample(range(1, args.users + 1), args.per_screen) for _ in range(args.screens)]
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    def per_user(ids):
+        for user_id in ids:
+            client.get(f'/user/{user_id}')
+
+    def bulk(ids):
+        client.get('/users', query_string={'ids': ",".join(map(str, ids))})
+
+    print(f"{'':32} {'ekran p50 (ms)':>15} {'istek / ekran':>14} {'SQL / ekran':>12}")
+    for name, fetch, requests_per_screen in (("kullanıcı başına", per_user, args.per_screen), ("toplu", bulk, 1)):
+        for cached in (False, True):
+            server.user_profile_cache.clear()
+            if cached:
+                for ids in screens:
+                    bulk(ids)
+            latencies = []
+            statements[0] = 0
+            event.listen(engine, 'before_cursor_execute', count)
+            try:
+                for ids in screens:
+                    if not cached:
+                        server.user_profile_cache.clear()
+                    started = time.perf_counter()
+                    fetch(ids)
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                event.remove(engine, 'before_cursor_execute', count)
+            label = f"{name} ({'önbellekli' if cached else 'önbelleksiz'})"
+            print(f"{label:32} {statistics.median(latencies):>15.3f} {requests_per_screen:>14} "
+                  f"{statements[0] / len(screens):>12.2f}")
+    print(f"önbellek: {server.user_profile_cache.stats()}")
+
+
+parser = argparse.ArgumentParser(description="Sunucu bileşenleri için performans ölçümleri.")
+subparsers = parser.add_subparsers(dest='command', required=True)
+
+matchmaking_parser = subparsers.add_parser('matchmaking', help="Puan tabanlı eşleştirme simülasyonu")
+matchmaking_parser.add_argument('--users', type=int, default=10000)
+matchmaking_parser.add_argument('--arrival-rate', type=float, default=20.0, help="Saniyedeki katılım sayısı")
+matchmaking_parser.add_argument('--seed', type=int, default=42)
+matchmaking_parser.add_argument('--store', default='memory',
+                                help="memory, fakeredis, redislite veya redis://... (kuyruk deposu)")
+matchmaking_parser.set_defaults(func=bench_matchmaking)
+
+fanout_parser = subparsers.add_parser('fanout', help="Worker process'leri arası Socket.IO emit gecikmesi")
+fanout_parser.add_argument('--workers', type=int, nargs='+', default=[2, 3, 4], help="Worker sayıları (2-4)")
+fanout_parser.add_argument('--messages', type=int, default=2000)
+fanout_parser.add_argument('--interval', type=float, default=1.0, help="Emit'ler arası bekleme (ms)")
+fanout_parser.add_argument('--queue', default='redislite',
+                           help="redis://... veya redislite (geçici redis-server) mesaj kuyruğu")
+fanout_parser.set_defaults(func=bench_fanout)
+
+scoring_parser = subparsers.add_parser('scoring', help="Skor motorunun sentetik hamlelerle hızı")
+scoring_parser.add_argument('--moves', type=int, default=100000)
+scoring_parser.add_argument('--seed', type=int, default=42)
+scoring_parser.set_defaults(func=bench_scoring)
+
+move_alloc_parser = subparsers.add_parser('move-alloc', help="Hamle başına bellek ayırma (tracemalloc) bütçe kontrolü")
+move_alloc_parser.add_argument('--moves', type=int, default=200)
+move_alloc_parser.add_argument('--budget-kb', type=float, default=24.0,
+                               help="Hamle başına medyan tepe bellek sınırı (KB)")
+move_alloc_parser.set_defaults(func=bench_move_alloc)
+
+racks_parser = subparsers.add_parser('racks', help="Oyun başı dengeli el dağıtımının hızı ve el kalitesi")
+racks_parser.add_argument('--games', type=int, default=50000)
+racks_parser.add_argument('--seed', type=int, default=42)
+racks_parser.set_defaults(func=bench_racks)
+
+match_flow_parser = subparsers.add_parser('match-flow', help="Eşzamanlı arayanlarla eşleşme yük testi")
+match_flow_parser.add_argument('--searchers', type=int, default=1000)
+match_flow_parser.add_argument('--commit-latency-ms', type=float, default=5.0, help="Commit başına eklenen gecikme")
+match_flow_parser.add_argument('--rating-spread', type=float, default=100.0, help="Puanların standart sapması")
+match_flow_parser.add_argument('--seed', type=int, default=42)
+match_flow_parser.set_defaults(func=bench_match_flow)
+
+explain_parser = subparsers.add_parser('explain', help="Sık çalışan sorgular tablo taraması yapıyorsa hata verir")
+explain_parser.add_argument('--database-url', help="Mevcut veritabanı (verilmezse geçici sqlite)")
+explain_parser.add_argument('--users', type=int, default=2000)
+explain_parser.add_argument('--games', type=int, default=20000)
+explain_parser.add_argument('--seed', type=int, default=42)
+explain_parser.set_defaults(func=bench_explain)
+
+completed_games_parser = subparsers.add_parser('completed-games', help="Biten oyun listesinin sayfa süresi")
+completed_games_parser.add_argument('--games', type=int, nargs='+', default=[10, 100, 1000, 5000],
+                                    help="Oyuncuların biten oyun sayıları")
+completed_games_parser.add_argument('--page-size', type=int, default=20)
+completed_games_parser.add_argument('--repeat', type=int, default=50)
+completed_games_parser.add_argument('--seed', type=int, default=42)
+completed_games_parser.set_defaults(func=bench_completed_games)
+
+active_games_parser = subparsers.add_parser('active-games', help="Aktif oyun listesi: önbellekli / önbelleksiz")
+active_games_parser.add_argument('--users', type=int, default=500)
+active_games_parser.add_argument('--games', type=int, default=10000)
+active_games_parser.add_argument('--requests', type=int, default=2000)
+active_games_parser.add_argument('--seed', type=int, default=42)
+active_games_parser.set_defaults(func=bench_active_games)
+
+users_parser = subparsers.add_parser('users', help="Kullanıcı adı çözümleme: tek tek / toplu, önbellekli / önbelleksiz")
+users_parser.add_argument('--users', type=int, default=5000)
+users_parser.add_argument('--screens', type=int, default=500, help="Ölçülen ekran (liste) sayısı")
+users_parser.add_argument('--per-screen', type=int, default=20, help="Ekran başına kullanıcı sayısı")
+users_parser.add_argument('--seed', type=int, default=42)
+users_parser.set_defaults(func=bench_users)
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    args.func(args)
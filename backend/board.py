@@ -0,0 +1,129 @@
+# Oyun Tahtası (15x15 Düz Dizi)
+# Veritabanında ve API'de tahtalar "row_col" anahtarlı sözlüktür (ödül tahtası "A1" anahtarlı). Doğrulama ve
+# skorlama her hücre için string üretip sözlükte aramasın diye tahta 225 hücrelik düz bir listeye çevrilir:
+# hücre indeksi = row * 15 + col. Ödül kareleri de aynı indekslerle çarpan dizilerine bir kez çevrilir.
+# Depolama için ikili biçim: [versiyon][dolu hücre sayısı] + her dolu hücre için [indeks][değer kodu].
+import logging
+
+import game_data
+from dictionary import ALPHABET
+
+logger = logging.getLogger(__name__)
+
+BOARD_SIZE = game_data.BOARD_SIZE
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+BINARY_FORMAT_VERSION = 1
+
+# İkili biçimde hücre değerlerinin kodları (kod = sıra + 1, 0 boş hücre)
+LETTER_CODES = tuple(ALPHABET)
+HIDDEN_ITEM_CODES = tuple(game_data.HIDDEN_ITEM_COUNTS)
+
+# Ödül karesi -> (harf çarpanı, kelime çarpanı); merkez (★) kelime puanını ikiye katlar
+PREMIUM_MULTIPLIERS = {'DL': (2, 1), 'TL': (3, 1), 'DW': (1, 2), 'TW': (1, 3), '★': (1, 2)}
+
+
+def cell_index(row, col):
+    """Tahta dışındaki koordinatlar için None."""
+    if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+        return row * BOARD_SIZE + col
+    return None
+
+
+def cell_key(index):
+    """Hücre indeksinin "row_col" anahtarı."""
+    return f"{index // BOARD_SIZE}_{index % BOARD_SIZE}"
+
+
+def _key_to_index(key):
+    try:
+        row, col = key.split('_')
+        return cell_index(int(row), int(col))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _a1_to_index(a1):
+    """"H8" -> sütun H (7), satır 8 (7)."""
+    try:
+        return cell_index(int(a1[1:]) - 1, ord(a1[0]) - ord('A'))
+    except (ValueError, IndexError, TypeError):
+        return None
+
+
+def premium_arrays(reward_board):
+    """"A1" anahtarlı ödül tahtasını hücre indeksli (harf çarpanları, kelime çarpanları) dizilerine çevirir."""
+    letter_multipliers = [1] * CELL_COUNT
+    word_multipliers = [1] * CELL_COUNT
+    for a1, bonus in (reward_board or {}).items():
+        index = _a1_to_index(a1)
+        if index is None or bonus not in PREMIUM_MULTIPLIERS:
+            logger.warning(f"Ödül tahtasında geçersiz kare atlandı: {a1}={bonus}")
+            continue
+        letter_multipliers[index], word_multipliers[index] = PREMIUM_MULTIPLIERS[bonus]
+    return tuple(letter_multipliers), tuple(word_multipliers)
+
+
+# Varsayılan ödül tahtası (tüm oyunlar bunu kullanır) işlem başına bir kez çevrilir
+LETTER_MULTIPLIERS, WORD_MULTIPLIERS = premium_arrays(game_data.reward_punishment_board)
+
+
+class Board:
+    """225 hücrelik düz tahta. Hücre değeri harf (veya gizli öğe tipi), boş hücre None."""
+    __slots__ = ('cells',)
+
+    def __init__(self, cells=None):
+        self.cells = cells if cells is not None else [None] * CELL_COUNT
+
+    @classmethod
+    def from_dict(cls, board_dict):
+        """"row_col" anahtarlı sözlükten (game_board, hidden_board) tahta oluşturur."""
+        board = cls()
+        for key, value in (board_dict or {}).items():
+            index = _key_to_index(key)
+            if index is None:
+                logger.warning(f"Tahtada geçersiz anahtar atlandı: {key}")
+                continue
+            board.cells[index] = value
+        return board
+
+    def to_dict(self):
+        """API ve JSON sütunları için "row_col" anahtarlı sözlük."""
+        return {cell_key(index): value for index, value in enumerate(self.cells) if value is not None}
+
+    def copy(self):
+        return Board(list(self.cells))
+
+    def get(self, row, col):
+        index = cell_index(row, col)
+        return None if index is None else self.cells[index]
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, index, value):
+        self.cells[index] = value
+
+    def is_empty(self):
+        return not any(self.cells)
+
+    def place(self, tiles):
+        """[{'row', 'col', 'letter'}] taşlarını tahtaya yazar."""
+        for tile in tiles:
+            self.cells[tile['row'] * BOARD_SIZE + tile['col']] = tile['letter']
+
+    def to_bytes(self, codes=LETTER_CODES):
+        """Sıkıştırılmış ikili biçim (dolu hücre başına 2 byte). Kod tablosunda olmayan değer için ValueError."""
+        filled = [(index, codes.index(value) + 1) for index, value in enumerate(self.cells) if value is not None]
+        data = bytearray((BINARY_FORMAT_VERSION, len(filled)))
+        for index, code in filled:
+            data += bytes((index, code))
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, codes=LETTER_CODES):
+        if not data or data[0] != BINARY_FORMAT_VERSION:
+            raise ValueError("Desteklenmeyen tahta biçimi.")
+        board = cls()
+        for offset in range(2, 2 + 2 * data[1], 2):
+            board.cells[data[offset]] = codes[data[offset + 1] - 1]
+        return board
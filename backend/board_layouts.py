@@ -0,0 +1,78 @@
+# Ödül Tahtası Düzenleri
+# Ödül/ceza tahtası her oyun satırına kopyalanmaz: 'board_layout' tablosunda sürümlü, paylaşılan bir tanım olarak
+# bir kez saklanır ve oyunlar ona Game.board_layout_id ile başvurur. Düzenler değiştirilmez (yeni düzen = yeni
+# sürüm), bu yüzden her işlem bir düzeni ilk kullanımda bir kez yükler; JSON'u önceden kodlanmış bayt olarak ve
+# skor motorunun çarpan dizileriyle birlikte saklar. İstemciler düzeni /board-layouts/<id> ile bir kez çeker.
+import json
+import logging
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+import game_data
+from board import premium_arrays
+from models import db, BoardLayout
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAYOUT_NAME = 'standard'
+DEFAULT_LAYOUT_VERSION = 1  # game_data.reward_punishment_board değişirse artırılmalı
+
+
+class LoadedLayout:
+    """Bellekteki düzen: hücreler, önceden kodlanmış JSON ve çarpan dizileri."""
+    __slots__ = ('id', 'name', 'version', 'cells', 'encoded', 'letter_multipliers', 'word_multipliers')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.name = row.name
+        self.version = row.version
+        self.cells = row.cells
+        self.encoded = json.dumps({"id": row.id, "name": row.name, "version": row.version, "cells": row.cells},
+                                  ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.letter_multipliers, self.word_multipliers = premium_arrays(row.cells)
+
+
+_layouts = {}  # board_layout.id -> LoadedLayout
+_default_layout_id = None
+_lock = threading.Lock()
+
+
+def _remember(row):
+    layout = LoadedLayout(row)
+    with _lock:
+        return _layouts.setdefault(layout.id, layout)
+
+
+def default_layout_id():
+    """Standart düzenin ID'si. Tabloda yoksa game_data'daki tahtayla eklenir (app context içinde çağrılır)."""
+    global _default_layout_id
+    if _default_layout_id is not None:
+        return _default_layout_id
+    row = BoardLayout.query.filter_by(name=DEFAULT_LAYOUT_NAME, version=DEFAULT_LAYOUT_VERSION).first()
+    if row is None:
+        try:
+            row = BoardLayout(name=DEFAULT_LAYOUT_NAME, version=DEFAULT_LAYOUT_VERSION,
+                              cells=game_data.reward_punishment_board)
+            db.session.add(row)
+            db.session.commit()
+            logger.info(f"Ödül tahtası düzeni eklendi: {DEFAULT_LAYOUT_NAME} v{DEFAULT_LAYOUT_VERSION} (id={row.id})")
+        except IntegrityError:
+            # Başka bir worker aynı anda ekledi
+            db.session.rollback()
+            row = BoardLayout.query.filter_by(name=DEFAULT_LAYOUT_NAME, version=DEFAULT_LAYOUT_VERSION).one()
+    _default_layout_id = _remember(row).id
+    return _default_layout_id
+
+
+def get_layout(layout_id):
+    """Düzeni önbellekten (yoksa veritabanından bir kez yükleyerek) döndürür; bulunamazsa None."""
+    if layout_id is None:
+        layout_id = default_layout_id()
+    layout = _layouts.get(layout_id)
+    if layout is None:
+        row = db.session.get(BoardLayout, layout_id)
+        if row is None:
+            return None
+        layout = _remember(row)
+    return layout
@@ -0,0 +1,19 @@
+# Sözlüğü DAWG ikili dosyasına derler (sunucuyu başlatmadan önce bir kez çalıştırılır)
+# python build_dictionary.py
+# python build_dictionary.py --json ../frontend/assets/turkish_words.json -o turkish_words.dawg
+import argparse
+import logging
+
+from dictionary import build_dawg_file, DEFAULT_DAWG_PATH, DEFAULT_WORD_LIST_PATH
+
+logging.basicConfig(level=logging.INFO)
+
+parser = argparse.ArgumentParser(description="Türkçe kelime listesini DAWG formatına derler.")
+parser.add_argument('-i', '--input', default=DEFAULT_WORD_LIST_PATH, help="Kelime listesi (.txt)")
+parser.add_argument('--json', action='append', default=[],
+                    help="generate_vocabulary.py çıktısı gibi ek JSON kelime listeleri (birden fazla verilebilir)")
+parser.add_argument('-o', '--output', default=DEFAULT_DAWG_PATH, help="Çıktı DAWG dosyası")
+args = parser.parse_args()
+
+word_count, size = build_dawg_file(args.output, args.input, args.json)
+print(f"{word_count} kelime {args.output} dosyasına derlendi ({size} bayt).")
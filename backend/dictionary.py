@@ -0,0 +1,321 @@
+# Sunucu Tarafı Kelime Sözlüğü
+# Kelime listesi, minimize edilmiş bir DAWG (yönlü döngüsüz kelime grafiği) olarak ikili dosyaya derlenir
+# ve her worker process tarafından mmap ile açılır. Böylece sözlük sayfaları işlemler arasında paylaşılır.
+import os
+import json
+import mmap
+import struct
+import logging
+from array import array
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORD_LIST_PATH = os.path.join(BACKEND_DIR, 'turkce_kelime_listesi.txt')
+DEFAULT_DAWG_PATH = os.path.join(BACKEND_DIR, 'turkish_words.dawg')
+
+# Türkçe'ye özgü büyük harf dönüşümleri (Python'un str.upper() fonksiyonu i -> I yapar)
+_TURKISH_UPPER_MAP = str.maketrans({
+    'i': 'İ', 'ı': 'I',
+    'â': 'A', 'Â': 'A', 'î': 'İ', 'Î': 'İ', 'û': 'U', 'Û': 'U',
+})
+
+ALPHABET = "ABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZ"
+TURKISH_ALPHABET = frozenset(ALPHABET)
+_LETTER_INDEX = {letter: i for i, letter in enumerate(ALPHABET)}
+
+# --- İkili Dosya Formatı ---
+# Başlık: magic (4 bayt), versiyon (u32), kenar sayısı (u32), kök düğümün ilk kenar index'i (u32)
+# Gövde: u32 kenar dizisi. Her kenar:
+#   bit 0-4  : harf index'i (ALPHABET içinde)
+#   bit 5    : düğümün son kenarı
+#   bit 6    : hedef düğüm kelime sonu (final)
+#   bit 7-31 : hedef düğümün ilk kenar index'i (0 = çocuğu yok)
+# Index 0 kullanılmaz, böylece 0 "çocuk yok" anlamına gelir.
+DAWG_MAGIC = b'DAWG'
+DAWG_VERSION = 1
+_HEADER = struct.Struct('<4sIII')
+_LETTER_MASK = 0x1F
+_LAST_EDGE = 1 << 5
+_FINAL = 1 << 6
+_TARGET_SHIFT = 7
+
+
+def turkish_upper(text):
+    """Metni Türkçe kurallarına göre büyük harfe çevirir (i -> İ, ı -> I, şapkalar kaldırılır)."""
+    return text.translate(_TURKISH_UPPER_MAP).upper()
+
+
+def normalize_entry(line):
+    """
+    Kelime listesindeki tek bir satırı tahtada oynanabilir kelime(ler)e çevirir.
+    "a / e" gibi varyant satırları ayrı kelimeler olarak döner; boşluk, tire vb.
+    içeren girdiler tahtaya yazılamayacağı için atlanır.
+    """
+    words = []
+    for variant in line.split('/'):
+        word = turkish_upper(variant.strip())
+        if len(word) >= 1 and all(ch in TURKISH_ALPHABET for ch in word):
+            words.append(word)
+    return words
+
+
+def iter_word_list(path=DEFAULT_WORD_LIST_PATH):
+    """Kelime listesi dosyasındaki tüm geçerli (normalize edilmiş) kelimeleri üretir."""
+    with open(path, 'r', encoding='utf-8') as f:
+        # splitlines() \x85 ve \x0b karakterlerini de satır sonu sayar, bu yüzden sadece \n ile bölüyoruz
+        for line in f.read().split('\n'):
+            yield from normalize_entry(line)
+
+
+def iter_json_word_list(path):
+    """generate_vocabulary.py'nin ürettiği turkish_words.json dosyasındaki kelimeleri üretir."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in json.load(f):
+            if isinstance(line, str):
+                yield from normalize_entry(line)
+
+
+# --- DAWG Derleme ---
+
+class _BuildNode:
+    __slots__ = ('children', 'final')
+
+    def __init__(self):
+        self.children = {}  # harf index'i -> _BuildNode
+        self.final = False
+
+    def signature(self):
+        return self.final, tuple((letter, id(child)) for letter, child in sorted(self.children.items()))
+
+
+def compile_dawg(words):
+    """
+    Kelimelerden minimize edilmiş DAWG oluşturur ve ikili formatta (bytes) döndürür.
+    Daciuk'un sıralı girdi için artımlı algoritması kullanılır.
+    """
+    keys = sorted({tuple(_LETTER_INDEX[ch] for ch in word) for word in words if word})
+
+    root = _BuildNode()
+    register = {}
+    unchecked = []  # (ebeveyn, harf, çocuk)
+    previous = ()
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            sig = child.signature()
+            existing = register.get(sig)
+            if existing is not None:
+                parent.children[letter] = existing
+            else:
+                register[sig] = child
+
+    for key in keys:
+        common = 0
+        for a, b in zip(key, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for letter in key[common:]:
+            child = _BuildNode()
+            node.children[letter] = child
+            unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        previous = key
+    minimize(0)
+
+    # Düğümleri kenar dizisine yerleştir (her benzersiz düğüm bir kez)
+    offsets = {}
+    order = []
+    next_offset = 1
+
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in offsets or not node.children:
+            continue
+        offsets[id(node)] = next_offset
+        next_offset += len(node.children)
+        order.append(node)
+        stack.extend(node.children.values())
+
+    if next_offset >= (1 << (32 - _TARGET_SHIFT)):
+        raise ValueError("Sözlük DAWG formatı için çok büyük.")
+
+    edges = array('I', [0]) * next_offset
+    for node in order:
+        position = offsets[id(node)]
+        items = sorted(node.children.items())
+        for i, (letter, child) in enumerate(items):
+            value = letter | (offsets.get(id(child), 0) << _TARGET_SHIFT)
+            if child.final:
+                value |= _FINAL
+            if i == len(items) - 1:
+                value |= _LAST_EDGE
+            edges[position + i] = value
+
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        edges.byteswap()
+    header = _HEADER.pack(DAWG_MAGIC, DAWG_VERSION, len(edges), offsets.get(id(root), 0))
+    return header + edges.tobytes()
+
+
+def build_dawg_file(output_path=DEFAULT_DAWG_PATH, word_list_path=DEFAULT_WORD_LIST_PATH, json_paths=()):
+    """Kelime listesini (ve varsa JSON listelerini) derleyip DAWG dosyasını atomik olarak yazar."""
+    words = set(iter_word_list(word_list_path))
+    for json_path in json_paths:
+        words.update(iter_json_word_list(json_path))
+
+    data = compile_dawg(words)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+    logger.info(f"DAWG oluşturuldu: {output_path} ({len(words)} kelime, {len(data)} bayt)")
+    return len(words), len(data)
+
+
+# --- DAWG Okuma ---
+
+class DawgDictionary:
+    """
+    Derlenmiş DAWG üzerinde sözlük. contains / has_prefix aramaları O(kelime uzunluğu) maliyetlidir.
+    Tampon bir mmap ise bellek sayfaları aynı dosyayı açan tüm işlemler arasında paylaşılır.
+    """
+
+    def __init__(self, buffer, mapped_file=None):
+        magic, version, edge_count, root = _HEADER.unpack_from(buffer, 0)
+        if magic != DAWG_MAGIC or version != DAWG_VERSION:
+            raise ValueError("Geçersiz veya desteklenmeyen DAWG dosyası.")
+        if struct.pack('=I', 1) != struct.pack('<I', 1):
+            raise ValueError("DAWG dosyası sadece little-endian sistemlerde mmap ile açılabilir.")
+        self._buffer = buffer
+        self._file = mapped_file
+        self._edges = memoryview(buffer)[_HEADER.size:_HEADER.size + edge_count * 4].cast('I')
+        self._root = root
+
+    @classmethod
+    def open(cls, path=DEFAULT_DAWG_PATH):
+        f = open(path, 'rb')
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        return cls(mm, mapped_file=f)
+
+    @classmethod
+    def from_words(cls, words):
+        return cls(compile_dawg(words))
+
+    def close(self):
+        self._edges.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def _find_edge(self, node, letter):
+        """Düğümün kenarları arasında harfi arar (en fazla alfabe boyu kadar adım)."""
+        if not node:
+            return None
+        edges = self._edges
+        while True:
+            value = edges[node]
+            if value & _LETTER_MASK == letter:
+                return value
+            if value & _LAST_EDGE:
+                return None
+            node += 1
+
+    def _walk(self, word):
+        """Kelime boyunca ilerler; son kenarı döndürür (yol yoksa None)."""
+        node = self._root
+        value = None
+        for ch in word:
+            letter = _LETTER_INDEX.get(ch)
+            if letter is None:
+                return None
+            value = self._find_edge(node, letter)
+            if value is None:
+                return None
+            node = value >> _TARGET_SHIFT
+        return value
+
+    def __contains__(self, word):
+        return self.contains(word)
+
+    def contains(self, word):
+        if not word:
+            return False
+        value = self._walk(turkish_upper(word))
+        return value is not None and bool(value & _FINAL)
+
+    def has_prefix(self, prefix):
+        if not prefix:
+            return self._root != 0
+        return self._walk(turkish_upper(prefix)) is not None
+
+    def iter_with_prefix(self, prefix=""):
+        """Verilen önek ile başlayan tüm kelimeleri alfabetik sırada üretir."""
+        prefix = turkish_upper(prefix)
+        if prefix:
+            value = self._walk(prefix)
+            if value is None:
+                return
+            if value & _FINAL:
+                yield prefix
+            node = value >> _TARGET_SHIFT
+        else:
+            node = self._root
+
+        edges = self._edges
+        stack = [(node, None, prefix)]  # (düğüm, tamamlanmış kelime, önek)
+        while stack:
+            node, finished_word, word = stack.pop()
+            if finished_word is not None:
+                yield finished_word
+                continue
+            children = []
+            while node:
+                value = edges[node]
+                children.append(value)
+                if value & _LAST_EDGE:
+                    break
+                node += 1
+            # Alfabetik sıra için ters sırayla yığına ekle (kelimenin kendisi alt dalından önce çıkar)
+            for value in reversed(children):
+                child_word = word + ALPHABET[value & _LETTER_MASK]
+                stack.append((value >> _TARGET_SHIFT, None, child_word))
+                if value & _FINAL:
+                    stack.append((0, child_word, child_word))
+
+    def __iter__(self):
+        return self.iter_with_prefix("")
+
+    def __len__(self):
+        if not hasattr(self, '_size'):
+            self._size = sum(1 for _ in self)
+        return self._size
+
+
+_dictionary = None
+
+
+def get_dictionary(path=DEFAULT_DAWG_PATH):
+    """
+    İşlem başına bir kez açılan sözlüğü döndürür. DAWG dosyası yoksa kelime listesinden
+    derlenip diske yazılır (sonraki worker'lar aynı dosyayı mmap ile paylaşır).
+    """
+    global _dictionary
+    if _dictionary is None:
+        if not os.path.exists(path):
+            logger.warning(f"DAWG dosyası bulunamadı, kelime listesinden derleniyor: {path}")
+            build_dawg_file(path)
+        _dictionary = DawgDictionary.open(path)
+        logger.info(f"Sözlük yüklendi (mmap): {path}")
+    return _dictionary
@@ -0,0 +1,581 @@
+# Canlı Oyun Önbelleği (Write-Behind)
+# Aktif oyunlar bellekte native Python yapıları olarak tutulur; her oyun için hamleler bir kilitle sıralanır.
+# Hamle kabul edildiğinde hamle satırı (bkz. game_history.py) önce sürecin kendi yerel günlüğüne (append-only
+# journal, fsync) yazılır; oyun satırı ve hamle satırları veritabanına arka planda periyodik olarak toplu yazılır.
+# Böylece hamle süresi MySQL'e gidiş-dönüşle sınırlı kalmaz. Süreç çökerse günlüğünde kalan hamleler, bir sonraki
+# açılan sürecin recover() çağrısında sahipsiz (orphan) günlük olarak devralınıp veritabanındaki oyunlara uygulanır.
+# Veritabanına yazarken state_version ile iyimser kontrol yapılır: başka bir worker aynı oyunu değiştirdiyse
+# reddedilen hamleler atılmaz; günlük satırları çakışma dosyasına yazılır ve oyun "eşitleme gerekli" olarak
+# işaretlenir (acquire GameResyncRequired fırlatır). Birden fazla worker çalışırken oyunlar tek bir worker'a
+# yönlendirilmeli ya da GAME_CACHE=0 ile doğrudan veritabanı kullanılmalıdır (DirectGameStore).
+# Oyun alanları yerinde değiştirilmez (copy-on-write): hamle kodu değişen alana yeni bir nesne atar. Bu sayede son
+# kabul edilen kayıt kopyalanmadan referanslarla saklanır; hamle farkı ve geri alma nesne kimliğiyle yapılır.
+import os
+import re
+import copy
+import glob
+import json
+import time
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası dosya kilidi yok, başka worker'ların günlükleri devralınmaz
+    fcntl = None
+
+from board import Board
+from models import db, Game
+from game_history import MUTABLE_FIELDS, MOVE_PLACE, game_record, build_move, apply_move, history_rows
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JOURNAL_PATH = os.path.join(BACKEND_DIR, 'game_journal.log')
+FLUSH_INTERVAL_SECONDS = 1
+IDLE_EVICT_SECONDS = 600  # Bu kadar süre dokunulmayan (ve kaydedilmiş) oyunlar önbellekten çıkarılır
+JOURNAL_LOCK_WAIT_SECONDS = 5  # Günlüğü devralınmakta olan worker kimliği için kilidin beklenme süresi
+
+_STATIC_FIELDS = ('id', 'user1', 'user2', 'board_layout_id', 'gamemode', 'created_at', 'remaining_time')
+
+
+class GameResyncRequired(Exception):
+    """Oyunun önbellekteki kopyası veritabanıyla çakıştı; kabul edilmiş ama yazılamamış hamleleri var."""
+
+    def __init__(self, game_id):
+        super().__init__(f"Oyun {game_id} veritabanıyla eşitlenmeyi bekliyor.")
+        self.game_id = game_id
+
+
+class CachedGame:
+    """Game satırının bellek içi kopyası. Alan adları Game ile aynıdır, hamle kodu ikisiyle de çalışır."""
+    __slots__ = _STATIC_FIELDS + MUTABLE_FIELDS + ('cache_entry', '_boards')
+
+    @classmethod
+    def from_model(cls, game):
+        cached = cls()
+        for field in _STATIC_FIELDS + MUTABLE_FIELDS:
+            setattr(cached, field, getattr(game, field))
+        cached.state_version = cached.state_version or 0
+        cached._boards = None
+        return cached
+
+    def boards(self):
+        """
+        (tahta, gizli tahta) Board'ları. Hangi sözlük nesnelerinden oluşturulduklarıyla birlikte saklanır: alan yeni
+        bir sözlükle değiştirilmedikçe (veya geri alınmadıkça) tekrar kullanılır. Board'lar yerinde değiştirilmez.
+        """
+        boards = self._boards
+        if boards is None or boards[0] is not self.game_board or boards[1] is not self.hidden_board:
+            boards = self._boards = (self.game_board, self.hidden_board,
+                                     Board.from_dict(self.game_board), Board.from_dict(self.hidden_board))
+        return boards[2], boards[3]
+
+    def set_boards(self, board, hidden_board):
+        """Hamleyi uygulayan kodun güncellediği Board'lar, alanlara atanan yeni sözlüklerle eşleştirilir."""
+        self._boards = (self.game_board, self.hidden_board, board, hidden_board)
+
+    def record(self):
+        return game_record(self)
+
+    def apply(self, record):
+        """Kayıttan farklı nesne tutan alanları kayıttakiyle değiştirir (geri alma)."""
+        for field in MUTABLE_FIELDS:
+            if getattr(self, field) is not record[field]:
+                setattr(self, field, record[field])
+
+
+def game_boards(game):
+    """
+    Oyunun (tahta, gizli tahta) Board'ları. Önbellekteki oyunda hamleler arasında bellekte tutulur; veritabanı
+    satırı (DirectGameStore) her istekte yeniden okunduğundan sözlüklerden oluşturulur.
+    """
+    if isinstance(game, CachedGame):
+        return game.boards()
+    return Board.from_dict(game.game_board), Board.from_dict(game.hidden_board)
+
+
+def remember_boards(game, board, hidden_board):
+    """Hamleden sonraki Board'ları önbellekteki oyuna kaydeder (game_board / hidden_board atandıktan sonra)."""
+    if isinstance(game, CachedGame):
+        game.set_boards(board, hidden_board)
+
+
+def worker_id():
+    """Günlük dosyası adındaki süreç kimliği: GAME_WORKER_ID (sabit worker numarası) veya PID."""
+    return re.sub(r'[^A-Za-z0-9_-]', '_', os.environ.get('GAME_WORKER_ID') or str(os.getpid()))
+
+
+def _try_lock(path):
+    """
+    path'te süreçler arası özel kilit almayı dener: alınırsa açık dosyayı, alınamazsa None döndürür. Kilit dosyası
+    biz beklerken silinip yeniden oluşturulduysa (devralma bitti) eski dosyanın kilidi geçersizdir, None döner.
+    """
+    handle = open(path, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        try:
+            current = os.stat(path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(handle.fileno()).st_ino:
+            handle.close()
+            return None
+    return handle
+
+
+def _rotated_files(path):
+    """path'in döndürülmüş kopyaları (path.<zaman>), eskiden yeniye."""
+    rotated = [p for p in glob.glob(f"{glob.escape(path)}.*") if p.rsplit('.', 1)[1].isdigit()]
+    return sorted(rotated, key=lambda p: int(p.rsplit('.', 1)[1]))
+
+
+def read_journal_moves(paths):
+    """Günlük dosyalarındaki hamleler, oyun başına versiyon sırasıyla: game_id -> [hamle]."""
+    moves = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Günlükte yarım kalmış satır atlandı: {path}")
+                    continue
+                moves.setdefault(entry["game_id"], {})[entry["seq"]] = entry
+    return {game_id: [by_seq[seq] for seq in sorted(by_seq)] for game_id, by_seq in moves.items()}
+
+
+class OrphanJournal:
+    """Devralınan sahipsiz günlük: dosyaları ve (varsa) sahibinin kilit dosyası, devralan süreçte kilitli."""
+
+    def __init__(self, files, lock_path=None, handle=None):
+        self.files = files
+        self.lock_path = lock_path
+        self._handle = handle
+
+    def discard(self):
+        """İçerik veritabanına yazıldıktan sonra dosyaları (ve sahibin kilit dosyasını) siler."""
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+        if self.lock_path is not None and os.path.exists(self.lock_path):
+            os.remove(self.lock_path)
+
+    def release(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class GameJournal:
+    """
+    Bu sürecin kabul ettiği hamlelerin append-only günlüğü (satır başına bir hamle satırı, JSON). Her süreç kendi
+    dosyasına (<kök>.<worker>.log) yazar ve yaşadığı sürece <kök>.<worker>.lock dosyasını kilitli tutar.
+    Veritabanına yazma başlarken günlük döndürülür (rotate); yazma başarılı olunca sadece bu sürecin döndürdüğü
+    dosyalar silinir. Kilidi boşta olan (sahibi ölmüş) günlükler claim_orphans ile açıkça devralınır.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, fsync=True, worker=None):
+        self.root, self.ext = os.path.splitext(path)
+        self.legacy_path = path  # Süreç başına günlükten önceki ortak günlük (eski sürümden kalmış olabilir)
+        self.fsync = fsync
+        self._worker = worker
+        self._lock = threading.Lock()
+        self._pid = None  # Günlüğü açan süreç; fork edilen alt süreç (örn. gunicorn --preload) kendi günlüğünü açar
+        self._ensure_open()
+
+    def _ensure_open(self):
+        """Günlüğü bu süreç adına açar: kimlik kilidi alınır, önceki süreçten kalan dosyalar devralınmaya ayrılır."""
+        if self._pid == os.getpid():
+            return
+        self.worker = self._worker or worker_id()
+        self.path = f"{self.root}.{self.worker}{self.ext}"
+        self.conflict_path = f"{self.root}.{self.worker}.conflicts{self.ext}"
+        self._owner = self._lock_own(f"{self.root}.{self.worker}.lock")
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            # Aynı kimlikle önceki süreçten kalmış günlük: recover() ile devralınır, flush silmez
+            os.replace(self.path, f"{self.path}.{time.time_ns()}")
+        self._leftover = _rotated_files(self.path)
+        self._rotated = []  # Bu sürecin döndürdüğü, henüz silinmemiş günlükler
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _lock_own(lock_path):
+        deadline = time.monotonic() + JOURNAL_LOCK_WAIT_SECONDS
+        while True:
+            handle = _try_lock(lock_path)
+            if handle is not None:
+                return handle
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Oyun günlüğü başka bir süreç tarafından kullanılıyor ({lock_path}); "
+                                   f"GAME_WORKER_ID her worker için farklı olmalıdır.")
+            time.sleep(0.1)
+
+    def append(self, line):
+        with self._lock:
+            self._ensure_open()
+            self._file.write(line + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def rotate(self):
+        """Mevcut günlüğü (boş değilse) kenara alır ve yenisini açar."""
+        with self._lock:
+            self._ensure_open()
+            self._file.close()
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                rotated = f"{self.path}.{time.time_ns()}"
+                os.replace(self.path, rotated)
+                self._rotated.append(rotated)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def discard_rotated(self):
+        """Bu sürecin döndürdüğü günlükleri siler (içerikleri veritabanına yazıldıktan sonra çağrılır)."""
+        with self._lock:
+            self._ensure_open()
+            rotated, self._rotated = self._rotated, []
+        for path in rotated:
+            os.remove(path)
+
+    def keep_conflicts(self, moves):
+        """Veritabanına yazılamayan (çakışan) hamleleri silinmeyen çakışma dosyasına ekler."""
+        with self._lock:
+            self._ensure_open()
+            with open(self.conflict_path, 'a', encoding='utf-8') as f:
+                for move in moves:
+                    f.write(json.dumps(move) + '\n')
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+    def claim_orphans(self):
+        """
+        Sahibi çalışmayan günlükleri devralır: bu kimliğin önceki süreçten kalan dosyaları, kilidi boşta olan diğer
+        worker günlükleri ve eski ortak günlük. Devralınanların kilitleri OrphanJournal.release() çağrılana kadar
+        tutulur; aynı günlüğü iki süreç birden devralamaz.
+        """
+        with self._lock:
+            self._ensure_open()
+        claims = []
+        if self._leftover:
+            claims.append(OrphanJournal(self._leftover))
+            self._leftover = []
+        legacy = _rotated_files(self.legacy_path) + [self.legacy_path]
+        if any(os.path.exists(path) for path in legacy):
+            claims.append(self._claim(f"{self.root}.lock", legacy))
+        for lock_path in glob.glob(f"{glob.escape(self.root)}.*.lock"):
+            worker = lock_path[len(self.root) + 1:-len('.lock')]
+            if worker == self.worker:
+                continue
+            if fcntl is None:
+                logger.warning(f"Dosya kilidi yok, {worker} worker'ının günlüğü devralınmadı.")
+                continue
+            active_path = f"{self.root}.{worker}{self.ext}"
+            claims.append(self._claim(lock_path, _rotated_files(active_path) + [active_path]))
+        return [claim for claim in claims if claim is not None]
+
+    @staticmethod
+    def _claim(lock_path, files):
+        handle = _try_lock(lock_path)
+        if handle is None:
+            return None  # Sahibi çalışıyor veya başka bir süreç devralıyor
+        return OrphanJournal(files, lock_path, handle)
+
+    def close(self):
+        """Günlüğü kapatır ve sahiplik kilidini bırakır (kalan dosyalar sonraki recover'da devralınır)."""
+        with self._lock:
+            self._file.close()
+            self._owner.close()
+
+
+class _Entry:
+    __slots__ = ('lock', 'game', 'committed', 'pending_moves', 'persisted_version', 'last_access', 'loaded',
+                 'needs_resync')
+
+    def __init__(self):
+        self.lock = threading.Lock()  # Bu oyunun hamlelerini sıralar
+        self.game = None
+        self.committed = None  # Son kabul edilen kayıt (alan referansları; yarım kalan hamlede geri dönmek için)
+        self.pending_moves = []  # Veritabanına henüz yazılmamış hamle satırları
+        self.persisted_version = 0
+        self.last_access = time.monotonic()
+        self.loaded = False
+        self.needs_resync = False  # Veritabanına yazarken çakıştı; bekleyen hamleler tutuluyor
+
+
+class GameCache:
+    """Oyun durumunun yetkili (authoritative) kopyası; veritabanına write-behind ile yazar."""
+
+    def __init__(self, journal):
+        self.journal = journal
+        self._entries = {}  # game_id -> _Entry
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.on_finished = None  # Biten oyunun kaydı veritabanına yazılınca çağrılır (örn. aktif oyun listeleri)
+
+    def recover(self):
+        """
+        Sahipsiz günlüklerde (çökmüş süreçler, bu kimliğin önceki süreci) kalmış ama veritabanına yazılmamış
+        hamleleri uygular (app context içinde). Devralınan günlükler ancak commit'ten sonra silinir.
+        """
+        claims = self.journal.claim_orphans()
+        try:
+            applied = self._replay(read_journal_moves([path for claim in claims for path in claim.files]))
+            for claim in claims:
+                claim.discard()
+        finally:
+            for claim in claims:
+                claim.release()
+        if applied:
+            logger.warning(f"Günlükten {applied} oyunun kaydedilmemiş durumu veritabanına uygulandı.")
+        if glob.glob(f"{glob.escape(self.journal.root)}.*.conflicts{self.journal.ext}"):
+            logger.error("Veritabanına yazılamamış (çakışan) hamle dosyaları var, elle incelenmeli: "
+                         f"{self.journal.root}.*.conflicts{self.journal.ext}")
+
+    def _replay(self, journal_moves):
+        """Günlük hamlelerini veritabanındaki oyunlara uygular ve commit eder; güncellenen oyun sayısı."""
+        applied = 0
+        for game_id, moves in journal_moves.items():
+            game = db.session.get(Game, game_id)
+            if game is None:
+                continue
+            persisted_version = game.state_version or 0
+            record = copy.deepcopy(game_record(game))
+            replayed = []
+            for move in moves:
+                if move["seq"] <= persisted_version:
+                    continue
+                if move["seq"] != record['state_version'] + 1:
+                    logger.error(f"Oyun {game_id} günlüğünde boşluk: v{record['state_version']} -> v{move['seq']}")
+                    break
+                apply_move(record, move)
+                replayed.append(move)
+            if not replayed:
+                continue
+            for field, value in record.items():
+                setattr(game, field, value)
+            db.session.add_all(history_rows(game_id, persisted_version, record, replayed))
+            applied += 1
+        db.session.commit()
+        return applied
+
+    def acquire(self, game_id):
+        """
+        Oyunu kilitleyip önbellekteki kopyasını döndürür (yoksa veritabanından yükler).
+        Oyun yoksa None döner ve kilit tutulmaz. Her acquire için release() çağrılmalıdır.
+        Oyun veritabanıyla çakıştıysa (flush) kilit tutulmadan GameResyncRequired fırlatılır.
+        """
+        with self._lock:
+            entry = self._entries.get(game_id)
+            if entry is None:
+                entry = self._entries[game_id] = _Entry()
+        entry.lock.acquire()
+        if self._entries.get(game_id) is not entry:
+            # Biz beklerken önbellekten çıkarıldı, baştan dene
+            entry.lock.release()
+            return self.acquire(game_id)
+        if not entry.loaded:
+            self.misses += 1
+            try:
+                game = db.session.get(Game, game_id)
+                if game is not None:
+                    entry.game = CachedGame.from_model(game)
+                    entry.game.cache_entry = entry
+                    db.session.expunge(game)  # JSON alanları artık sadece önbelleğe ait
+                    entry.committed = entry.game.record()
+                    entry.persisted_version = entry.game.state_version
+                    entry.loaded = True
+            finally:
+                if not entry.loaded:
+                    self._evict(game_id, entry)
+                    entry.lock.release()
+            if not entry.loaded:
+                return None
+        else:
+            self.hits += 1
+        if entry.needs_resync:
+            entry.lock.release()
+            raise GameResyncRequired(game_id)
+        entry.last_access = time.monotonic()
+        return entry.game
+
+    def commit(self, game, player_id=None, kind=MOVE_PLACE):
+        """Hamleyi kabul eder: hamle satırı günlüğe yazılır, veritabanına sonra toplu yazılır."""
+        entry = game.cache_entry
+        record = game.record()
+        move = build_move(game.id, entry.committed, record, player_id, kind)
+        self.journal.append(json.dumps(move))
+        entry.committed = record
+        entry.pending_moves.append(move)
+
+    def release(self, game):
+        """Kilidi bırakır. commit() edilmemiş değişiklikler (hata/geçersiz hamle) geri alınır."""
+        entry = game.cache_entry
+        game.apply(entry.committed)
+        entry.lock.release()
+
+    def pending_moves(self, game):
+        """acquire edilmiş oyunun veritabanına henüz yazılmamış hamle satırları (eskiden yeniye)."""
+        return list(game.cache_entry.pending_moves)
+
+    def flush(self):
+        """Kaydedilmemiş oyunları veritabanına yazar (app context içinde). Yazılan oyun sayısını döndürür."""
+        with self._flush_lock:
+            self.journal.rotate()
+            with self._lock:
+                entries = list(self._entries.items())
+
+            pending = []
+            for game_id, entry in entries:
+                with entry.lock:
+                    if (not entry.loaded or entry.needs_resync
+                            or entry.game.state_version == entry.persisted_version):
+                        continue
+                    pending.append((game_id, entry, entry.persisted_version, entry.committed, entry.pending_moves))
+                    entry.pending_moves = []
+
+            conflicted = []
+            try:
+                for item in pending:
+                    game_id, entry, expected_version, record, moves = item
+                    updated = Game.query.filter_by(id=game_id, state_version=expected_version).update(
+                        record, synchronize_session=False)
+                    if updated:
+                        db.session.add_all(history_rows(game_id, expected_version, record, moves))
+                    else:
+                        conflicted.append(item)  # Başka bir worker bu oyunu değiştirmiş
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                for _, entry, _, _, moves in pending:
+                    with entry.lock:
+                        entry.pending_moves[:0] = moves
+                raise  # Günlük dosyaları silinmez; sonraki flush veya recover tekrar dener
+
+            for item in conflicted:
+                self._mark_conflict(*item)
+            finished = []
+            for _, entry, _, record, _ in pending:
+                if not entry.needs_resync:
+                    entry.persisted_version = max(entry.persisted_version, record['state_version'])
+                    if record['status'] != 'active':
+                        finished.append(entry.game)
+            # Önceki başarısız denemelerden kalanlar dahil tüm kayıtlar artık veritabanında (çakışanlar da
+            # çakışma dosyasında)
+            self.journal.discard_rotated()
+            self._evict_idle()
+            _notify_finished(self.on_finished, finished)
+            return len(pending) - len(conflicted)
+
+    def _mark_conflict(self, game_id, entry, expected_version, record, moves):
+        """
+        Yazılamayan hamleler atılmaz: bellekte ve çakışma dosyasında tutulur, oyun eşitleme gerekli olarak
+        işaretlenir. Oyuna sonraki erişimler GameResyncRequired alır; oyun önbellekten çıkarılmaz.
+        """
+        with entry.lock:
+            entry.pending_moves[:0] = moves
+            entry.needs_resync = True
+            self.journal.keep_conflicts(entry.pending_moves)
+        self.conflicts += 1
+        logger.error(f"Oyun {game_id} veritabanında değişmiş (v{expected_version} bekleniyordu); "
+                     f"{len(entry.pending_moves)} kabul edilmiş hamle yazılamadı, {self.journal.conflict_path} "
+                     f"dosyasında tutuluyor. Oyun eşitlenene kadar hamle kabul edilmeyecek.")
+
+    def _evict(self, game_id, entry):
+        with self._lock:
+            if self._entries.get(game_id) is entry:
+                del self._entries[game_id]
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        for game_id, entry in entries:
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                finished = entry.loaded and entry.game.status != 'active'
+                persisted = not entry.loaded or entry.game.state_version == entry.persisted_version
+                if persisted and (finished or now - entry.last_access > IDLE_EVICT_SECONDS):
+                    self._evict(game_id, entry)
+            finally:
+                entry.lock.release()
+
+    def stats(self):
+        with self._lock:
+            cached = len(self._entries)
+            dirty = sum(1 for e in self._entries.values()
+                        if e.loaded and e.game.state_version != e.persisted_version)
+            resync = [game_id for game_id, e in self._entries.items() if e.needs_resync]
+        return {"backend": "cache", "cached_games": cached, "dirty_games": dirty, "hits": self.hits,
+                "misses": self.misses, "conflicts": self.conflicts, "resync_games": resync}
+
+
+class DirectGameStore:
+    """Önbelleksiz mod: her hamle oyun satırını SELECT ... FOR UPDATE ile kilitler, hamle satırıyla hemen commit
+    eder."""
+
+    def __init__(self):
+        self._committed = {}  # id(game) -> son kaydedilen kayıt (hamle satırı farkla üretilir)
+        self.on_finished = None  # GameCache.on_finished ile aynı; burada kayıt commit'te yazılır
+
+    def recover(self):
+        pass
+
+    def acquire(self, game_id):
+        game = db.session.query(Game).filter_by(id=game_id).with_for_update().first()
+        if game is not None:
+            self._committed[id(game)] = game_record(game)
+        return game
+
+    def commit(self, game, player_id=None, kind=MOVE_PLACE):
+        before = self._committed[id(game)]
+        record = game_record(game)
+        move = build_move(game.id, before, record, player_id, kind)
+        db.session.add_all(history_rows(game.id, before['state_version'] or 0, record, [move]))
+        db.session.commit()
+        self._committed[id(game)] = record
+        if record['status'] != 'active':
+            _notify_finished(self.on_finished, [game])
+
+    def release(self, game):
+        self._committed.pop(id(game), None)
+
+    def pending_moves(self, game):
+        return []  # Hamleler commit'te yazılır
+
+    def flush(self):
+        return 0
+
+    def stats(self):
+        return {"backend": "direct"}
+
+
+def _notify_finished(callback, games):
+    if callback is None:
+        return
+    for game in games:
+        try:
+            callback(game)
+        except Exception as e:
+            logger.error(f"Oyun {game.id} bitişi bildirilirken hata: {e}", exc_info=True)
+
+
+def create_game_store():
+    """GAME_CACHE=0 ise doğrudan veritabanı, aksi halde write-behind önbellek (varsayılan)."""
+    if os.environ.get('GAME_CACHE', '1') == '0':
+        return DirectGameStore()
+    journal = GameJournal(os.environ.get('GAME_JOURNAL_PATH', DEFAULT_JOURNAL_PATH),
+                          fsync=os.environ.get('GAME_JOURNAL_FSYNC', '1') != '0')
+    return GameCache(journal)
@@ -0,0 +1,198 @@
+# Hamle Geçmişi (Event Sourcing)
+# Her kalıcı değişiklik 'move' tablosuna tek bir küçük satır olarak eklenir (append-only): kim oynadı, konan taşlar,
+# skor farkları, tetiklenen gizli öğeler ve değişen diğer küçük alanlar (el, ödüller, torbadan eksilen harfler, sıra,
+# durum). Hamle satırı, oyunun önceki kaydı (record) ile yeni kaydı karşılaştırılarak üretilir; hamle kodunun ayrıca
+# olay üretmesi gerekmez. Oyun oluşturulurken ve her SNAPSHOT_INTERVAL versiyonda bir tam kayıt 'game_snapshot'
+# tablosuna yazılır. Herhangi bir versiyondaki durum, ondan önceki en yakın snapshot'a hamleler uygulanarak bulunur.
+# Snapshot'larda tahta ve gizli tahta Board'un ikili biçiminde (base64) saklanır.
+import copy
+import base64
+import logging
+
+from board import Board, LETTER_CODES, HIDDEN_ITEM_CODES
+from models import Move, GameSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL = 20  # Kaç versiyonda bir tam kayıt saklanır
+
+MOVE_PLACE = 'place'  # Taş yerleştirme
+MOVE_DEAL = 'deal'  # Oyun başında harf dağıtımı
+MOVE_RESIGN = 'resign'  # Pes etme
+
+# Hamlelerle değişen Game alanları (önbellek, günlük ve snapshot kayıtları bu alanlardan oluşur)
+MUTABLE_FIELDS = (
+    'game_board', 'hidden_board', 'remaining_letters', 'score1', 'score2', 'turn_order', 'status', 'winner',
+    'user1_letters', 'user2_letters', 'user1_rewards', 'user2_rewards', 'user1_pass', 'user2_pass',
+    'state_version',
+)
+# Hamle satırında değişmişse yeni değeriyle saklanan küçük alanlar
+_REPLACED_FIELDS = ('user1_letters', 'user2_letters', 'user1_rewards', 'user2_rewards', 'turn_order', 'status',
+                    'winner', 'user1_pass', 'user2_pass')
+# Snapshot'ta ikili biçimde saklanan tahtalar ve değer kodları
+_PACKED_BOARDS = {'game_board': LETTER_CODES, 'hidden_board': HIDDEN_ITEM_CODES}
+
+
+def game_record(game):
+    """Game (veya CachedGame) nesnesinin değişebilen alanları."""
+    return {field: getattr(game, field) for field in MUTABLE_FIELDS}
+
+
+def snapshot_due(previous_seq, seq):
+    """previous_seq -> seq geçişinde bir SNAPSHOT_INTERVAL sınırı aşıldı mı?"""
+    return previous_seq // SNAPSHOT_INTERVAL != seq // SNAPSHOT_INTERVAL
+
+
+def build_move(game_id, before, after, player_id=None, kind=MOVE_PLACE):
+    """
+    İki kayıt arasındaki farkı hamle satırı olarak (sözlük) döndürür. Tahta, gizli tahta ve torba için sadece
+    farklar saklanır; fark beklenen biçimde değilse (örn. tahtadan harf silinmesi) alanın tamamı changes'e yazılır.
+    Alanlar copy-on-write olduğundan aynı nesneyi tutan alanlar karşılaştırılmadan atlanır.
+    """
+    changes = {}
+
+    before_board, after_board = before['game_board'] or {}, after['game_board'] or {}
+    tiles = []
+    if before_board is after_board:
+        pass
+    elif before_board.keys() <= after_board.keys():
+        for key, letter in after_board.items():
+            if before_board.get(key) != letter:
+                row, col = key.split('_')
+                tiles.append({"row": int(row), "col": int(col), "letter": letter})
+    else:
+        changes['game_board'] = after_board
+
+    before_hidden, after_hidden = before['hidden_board'] or {}, after['hidden_board'] or {}
+    triggered = []
+    if before_hidden is after_hidden:
+        pass
+    elif all(before_hidden.get(key) == item for key, item in after_hidden.items()):
+        triggered = [{"key": key, "type": item} for key, item in before_hidden.items() if key not in after_hidden]
+    else:
+        changes['hidden_board'] = after_hidden
+
+    before_bag, after_bag = before['remaining_letters'] or {}, after['remaining_letters'] or {}
+    if before_bag is after_bag:
+        pass
+    elif before_bag.keys() == after_bag.keys() and all(
+            {**before_bag[letter], 'count': data.get('count')} == data for letter, data in after_bag.items()):
+        bag = {letter: data['count'] - before_bag[letter]['count'] for letter, data in after_bag.items()
+               if data['count'] != before_bag[letter]['count']}
+        if bag:
+            changes['bag'] = bag
+    else:
+        changes['remaining_letters'] = after_bag
+
+    for field in _REPLACED_FIELDS:
+        if before[field] is not after[field] and before[field] != after[field]:
+            changes[field] = after[field]
+
+    return {
+        "game_id": game_id,
+        "seq": after['state_version'],
+        "player_id": player_id,
+        "kind": kind,
+        "tiles": tiles,
+        "score1_delta": (after['score1'] or 0) - (before['score1'] or 0),
+        "score2_delta": (after['score2'] or 0) - (before['score2'] or 0),
+        "triggered": triggered,
+        "changes": changes,
+    }
+
+
+def apply_move(record, move):
+    """Hamle satırını (sözlük) kayda uygular; kayıt yerinde değişir."""
+    changes = dict(move['changes'])
+    board = dict(record['game_board'] or {})
+    for tile in move['tiles']:
+        board[f"{tile['row']}_{tile['col']}"] = tile['letter']
+    record['game_board'] = changes.pop('game_board', board)
+
+    hidden = dict(record['hidden_board'] or {})
+    for item in move['triggered']:
+        hidden.pop(item['key'], None)
+    record['hidden_board'] = changes.pop('hidden_board', hidden)
+
+    bag = changes.pop('bag', None)
+    if bag:
+        remaining = dict(record['remaining_letters'] or {})
+        for letter, delta in bag.items():
+            remaining[letter] = {**remaining[letter], 'count': remaining[letter]['count'] + delta}
+        record['remaining_letters'] = remaining
+
+    record['score1'] = (record['score1'] or 0) + move['score1_delta']
+    record['score2'] = (record['score2'] or 0) + move['score2_delta']
+    record.update(changes)
+    record['state_version'] = move['seq']
+    return record
+
+
+def move_to_dict(move):
+    return {"game_id": move.game_id, "seq": move.seq, "player_id": move.player_id, "kind": move.kind,
+            "tiles": move.tiles, "score1_delta": move.score1_delta, "score2_delta": move.score2_delta,
+            "triggered": move.triggered, "changes": move.changes}
+
+
+def _pack_boards(record):
+    """Tahtaları ikili biçime çevirir; biçime sığmayan (bilinmeyen harf vb.) tahta sözlük olarak kalır."""
+    for field, codes in _PACKED_BOARDS.items():
+        try:
+            data = Board.from_dict(record[field]).to_bytes(codes)
+        except ValueError:
+            continue
+        if Board.from_bytes(data, codes).to_dict() == (record[field] or {}):
+            record[field] = base64.b64encode(data).decode('ascii')
+    return record
+
+
+def _unpack_boards(record):
+    for field, codes in _PACKED_BOARDS.items():
+        if isinstance(record[field], str):
+            record[field] = Board.from_bytes(base64.b64decode(record[field]), codes).to_dict()
+    return record
+
+
+def snapshot_row(game_id, record):
+    return GameSnapshot(game_id=game_id, seq=record['state_version'] or 0, state=_pack_boards(copy.deepcopy(record)))
+
+
+def history_rows(game_id, previous_seq, record, moves):
+    """
+    Veritabanına eklenecek satırlar: hamleler ve (bir SNAPSHOT_INTERVAL sınırı aşıldıysa) son kaydın snapshot'ı.
+    previous_seq veritabanındaki son versiyondur.
+    """
+    rows = [Move(**move) for move in moves]
+    if moves and snapshot_due(previous_seq, record['state_version']):
+        rows.append(snapshot_row(game_id, record))
+    return rows
+
+
+def reconstruct_game_record(game_id, seq=None, pending_moves=()):
+    """
+    Oyunun seq versiyonundaki (verilmezse son) kaydını snapshot + hamlelerden yeniden oluşturur.
+    pending_moves: veritabanına henüz yazılmamış (önbellekteki) hamleler, veritabanındakilerin devamı olarak uygulanır.
+    Snapshot yoksa veya hamle zincirinde boşluk varsa None döner.
+    """
+    snapshot_query = GameSnapshot.query.filter(GameSnapshot.game_id == game_id)
+    if seq is not None:
+        snapshot_query = snapshot_query.filter(GameSnapshot.seq <= seq)
+    snapshot = snapshot_query.order_by(GameSnapshot.seq.desc()).first()
+    if snapshot is None:
+        return None
+
+    move_query = Move.query.filter(Move.game_id == game_id, Move.seq > snapshot.seq)
+    if seq is not None:
+        move_query = move_query.filter(Move.seq <= seq)
+    moves = [move_to_dict(move) for move in move_query.order_by(Move.seq)]
+    last_seq = moves[-1]['seq'] if moves else snapshot.seq
+    moves += [move for move in pending_moves if move['seq'] > last_seq and (seq is None or move['seq'] <= seq)]
+    record = _unpack_boards(copy.deepcopy(snapshot.state))
+    for move in moves:
+        if move['seq'] != record['state_version'] + 1:
+            logger.error(f"Oyun {game_id} hamle geçmişinde boşluk: v{record['state_version']} -> v{move['seq']}")
+            return None
+        apply_move(record, move)
+    if seq is not None and record['state_version'] != seq:
+        return None
+    return record
@@ -0,0 +1,103 @@
+# Oyun Durumu Yayınları ('game_updated')
+# İki tür mesaj gönderilir:
+#   full  : oyunun tam durumu (ilk yükleme, resync, oyun sonu)
+#   delta : sadece hamlenin değiştirdikleri (yerleştirilen taşlar, skorlar, hamleyi yapanın eli, sıra)
+# Her kalıcı değişiklik Game.state_version'ı bir artırır. Delta, üzerine uygulanacağı versiyonu
+# (base_version) taşır; istemci kendi versiyonuyla uyuşmazsa 'request_resync' ile tam durumu ister.
+# Oyuncuların elleri ve ödülleri gizlidir: ortak kısım hamle başına bir kez oluşturulur, her oyuncuya
+# kendi oyuncu odasından (player_room) sadece kendi eli/ödülleri eklenmiş sığ bir kopyası gönderilir.
+
+UPDATE_FULL = 'full'
+UPDATE_DELTA = 'delta'
+
+
+def bump_state_version(game):
+    """Oyunun durum versiyonunu bir artırır ve yeni versiyonu döndürür (commit'ten önce çağrılır)."""
+    game.state_version = (game.state_version or 0) + 1
+    return game.state_version
+
+
+def player_room(game_id, user_id):
+    """Bir oyuncunun o oyundaki bağlantılarının katıldığı oda."""
+    return f"{game_id}:{user_id}"
+
+
+def _player_slot(game, user_id):
+    if user_id == game.user1:
+        return 'user1'
+    if user_id == game.user2:
+        return 'user2'
+    return None
+
+
+def serialize_game_state(game, last_move_info=None):
+    """Oyunun tam durumu, oyuncuların elleri ve ödülleri olmadan (ortak kısım)."""
+    state = {
+        "type": UPDATE_FULL,
+        "version": game.state_version or 0,
+        "id": game.id, "user1": game.user1, "user2": game.user2,
+        "board_layout_id": game.board_layout_id,  # Ödül tahtası /board-layouts/<id> ile bir kez alınır
+        "game_board": game.game_board or {},
+        "score1": game.score1, "score2": game.score2,
+        "turn_order": game.turn_order,
+        "remaining_letters": game.remaining_letters or {},
+        "gamemode": game.gamemode.name if game.gamemode else None,
+        "created_at": game.created_at.isoformat() if game.created_at else None,
+        "remaining_time": game.remaining_time.isoformat() if game.remaining_time else None,
+        "status": game.status,
+        "winner_id": game.winner,
+    }
+    if last_move_info is not None:
+        state["last_move_info"] = last_move_info
+    return state
+
+
+def player_game_state(state, game, user_id):
+    """
+    Ortak tam duruma sadece bu oyuncunun elini ve ödüllerini (userN_letters / userN_rewards) ve rakibin
+    elindeki harf sayısını (opponent_letter_count) ekler.
+    """
+    slot = _player_slot(game, user_id)
+    if slot is None:
+        return state
+    opponent_slot = 'user2' if slot == 'user1' else 'user1'
+    return {**state,
+            f"{slot}_letters": getattr(game, f"{slot}_letters") or [],
+            f"{slot}_rewards": getattr(game, f"{slot}_rewards") or [],
+            "opponent_letter_count": len(getattr(game, f"{opponent_slot}_letters") or [])}
+
+
+def remaining_letter_count(remaining_letters):
+    return sum(data.get('count', 0) for data in (remaining_letters or {}).values())
+
+
+def build_move_delta(game, user_id, placed_tiles, last_move_info):
+    """
+    Kabul edilen bir hamlenin ortak delta mesajı. Sadece hamleyle değişen alanlar gönderilir;
+    ödül tahtası ve kalan harf tablosu gibi değişmeyen alanlar gönderilmez. Hamleyi yapanın yeni eli
+    player_move_delta ile sadece ona eklenir.
+    """
+    version = game.state_version or 0
+    return {
+        "type": UPDATE_DELTA,
+        "version": version,
+        "base_version": version - 1,
+        "id": game.id,
+        "placed_tiles": [{"row": tile['row'], "col": tile['col'], "letter": tile['letter']} for tile in placed_tiles],
+        "score1": game.score1, "score2": game.score2,
+        "turn_order": game.turn_order,
+        "status": game.status,
+        "player_id": user_id,
+        "remaining_letter_count": remaining_letter_count(game.remaining_letters),
+        "last_move_info": last_move_info,
+    }
+
+
+def player_move_delta(delta, game, user_id):
+    """Delta'yı alıcıya göre özelleştirir: hamleyi yapan oyuncu kendi yeni elini ve ödüllerini de alır."""
+    slot = _player_slot(game, user_id)
+    if slot is None or user_id != delta["player_id"]:
+        return delta
+    return {**delta,
+            "hand": {"user_id": user_id, "letters": getattr(game, f"{slot}_letters") or []},
+            "rewards": {"user_id": user_id, "items": getattr(game, f"{slot}_rewards") or []}}
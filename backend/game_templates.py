@@ -0,0 +1,65 @@
+# Hazır Oyun Şablonları
+# Yeni oyun için harf dağıtımı (iki el + kalan torba) ve gizli tahta eşleşme anında üretilmez; arka plandaki
+# görev (refill) sınırlı bir havuzu önceden doldurur. Eşleşmede havuzdan bir şablon alınır (hit) ve oyun satırı
+# eklenir. Havuz boşsa şablon o anda üretilir (miss). Havuz boyutu: GAME_TEMPLATE_POOL_SIZE.
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 64
+REFILL_INTERVAL_SECONDS = 0.2
+
+
+class GameTemplatePool:
+    """factory() ile üretilen şablonların sınırlı havuzu. Her şablon yalnızca bir kez verilir."""
+
+    def __init__(self, factory, capacity=DEFAULT_POOL_SIZE):
+        self.factory = factory
+        self.capacity = capacity
+        self._templates = deque()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+    def take(self):
+        """Havuzdan bir şablon alır; havuz boşsa yenisini hemen üretir."""
+        with self._lock:
+            if self._templates:
+                self.hits += 1
+                return self._templates.popleft()
+            self.misses += 1
+        logger.debug("Şablon havuzu boş, şablon eşleşme sırasında üretiliyor.")
+        return self._generate()
+
+    def refill(self, pause=None):
+        """
+        Havuzu kapasitesine kadar doldurur ve eklenen şablon sayısını döndürür. pause verilirse her şablondan sonra
+        çağrılır (örn. socketio.sleep(0)), böylece doldurma diğer işleri bekletmez.
+        """
+        added = 0
+        while len(self._templates) < self.capacity:
+            template = self._generate()
+            with self._lock:
+                if len(self._templates) >= self.capacity:
+                    break
+                self._templates.append(template)
+            added += 1
+            if pause is not None:
+                pause(0)
+        return added
+
+    def _generate(self):
+        template = self.factory()
+        with self._lock:
+            self.generated += 1
+        return template
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"size": len(self._templates), "capacity": self.capacity, "hits": self.hits,
+                    "misses": self.misses, "generated": self.generated,
+                    "hit_rate": round(self.hits / requests, 4) if requests else None}
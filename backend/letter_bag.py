@@ -0,0 +1,150 @@
+# Harf Torbası
+# Torba, harf başına adet olarak tutulur ({"A": {"count": 12, "score": 1}, ...} JSON biçimiyle birebir).
+# Çekiliş, torbadaki taşlar arasından eşit olasılıkla yapılır: 0..toplam-1 arasında bir sayı seçilip harf
+# adetleri üzerinde yürünür. Maliyet torbadaki taş sayısına değil, alfabe boyuna (~30) bağlıdır; her çekilişte
+# 100 elemanlı düz liste kurulmaz, karıştırılmaz ve torba JSON ile kopyalanmaz.
+# rng: random modülü (varsayılan) veya testler için random.Random(seed).
+# draw_balanced_rack: en az 2 sesli ve 2 sessiz harfli el. Düz çekilen el dengesizse taşlar torbaya geri konur ve
+# yeniden çekilir (reddetme örneklemesi); böylece her taş (joker dahil) dengeli eller arasında torbadaki sıklığıyla
+# gelir. Tam torbada ellerin ~%83'ü dengelidir, yani ortalama ~1.2 deneme.
+import random
+
+VOWELS = frozenset("AEIİOÖUÜ")
+BLANK = 'Blank'  # Joker: ne sesli ne sessiz sayılır
+RACK_SIZE = 7
+BALANCED_RACK_ATTEMPTS = 100  # Bu kadar denemede dengeli el çıkmazsa (torbada sesli/sessiz çok azsa) kurarak çekilir
+
+
+class LetterBag:
+    __slots__ = ('letters', 'scores', 'counts', 'total', 'rng')
+
+    def __init__(self, letters, scores, counts, rng=None):
+        self.letters = letters  # Harf sırası (JSON'daki anahtar sırası); kopyalar arasında paylaşılır
+        self.scores = scores
+        self.counts = counts
+        self.total = sum(counts)
+        self.rng = rng or random
+
+    @classmethod
+    def from_pool(cls, pool, rng=None):
+        """Game.remaining_letters biçimindeki sözlükten torba oluşturur."""
+        pool = pool or {}
+        letters = tuple(pool)
+        scores = tuple(data.get('score', 0) for data in pool.values())
+        counts = [max(0, data.get('count', 0)) if isinstance(data.get('count'), int) else 0 for data in pool.values()]
+        return cls(letters, scores, counts, rng)
+
+    def to_pool(self):
+        """Game.remaining_letters biçimi (JSON sütunu ve API için)."""
+        return {letter: {"count": count, "score": score}
+                for letter, count, score in zip(self.letters, self.counts, self.scores)}
+
+    def copy(self):
+        bag = LetterBag.__new__(LetterBag)
+        bag.letters, bag.scores, bag.counts, bag.total, bag.rng = (
+            self.letters, self.scores, list(self.counts), self.total, self.rng)
+        return bag
+
+    def __len__(self):
+        return self.total
+
+    def count(self, letter):
+        try:
+            return self.counts[self.letters.index(letter)]
+        except ValueError:
+            return 0
+
+    def remove(self, letter):
+        """Torbadan belirli bir harfi çıkarır (yoksa False)."""
+        try:
+            index = self.letters.index(letter)
+        except ValueError:
+            return False
+        if self.counts[index] <= 0:
+            return False
+        self.counts[index] -= 1
+        self.total -= 1
+        return True
+
+    def add(self, letter):
+        """Taşı torbaya geri koyar (torbada olmayan harf için False)."""
+        try:
+            index = self.letters.index(letter)
+        except ValueError:
+            return False
+        self.counts[index] += 1
+        self.total += 1
+        return True
+
+    def draw(self, exclude=None):
+        """Rastgele bir taş çeker (exclude'daki harfler hariç). Torba boşsa None."""
+        counts = self.counts
+        total = self.total
+        if exclude:
+            total -= sum(counts[i] for i, letter in enumerate(self.letters) if letter in exclude)
+        if total <= 0:
+            return None
+        target = self.rng.randrange(total)
+        for index, count in enumerate(counts):
+            if not count or (exclude and self.letters[index] in exclude):
+                continue
+            if target < count:
+                counts[index] -= 1
+                self.total -= 1
+                return self.letters[index]
+            target -= count
+        return None
+
+    def draw_many(self, count):
+        """En fazla count taş çeker (torba yeterli değilse kalanların hepsi)."""
+        drawn = []
+        for _ in range(min(count, self.total)):
+            drawn.append(self.draw())
+        return drawn
+
+
+def rack_balance(rack):
+    """Eldeki (sesli, sessiz) harf sayıları; joker sayılmaz."""
+    vowels = sum(1 for letter in rack if letter in VOWELS)
+    blanks = sum(1 for letter in rack if letter in (BLANK, '*'))
+    return vowels, len(rack) - vowels - blanks
+
+
+def draw_balanced_rack(bag, size=RACK_SIZE, min_vowels=2, min_consonants=2):
+    """
+    Torbadan en az min_vowels sesli ve min_consonants sessiz harfli, size harflik el çeker. El, düz çekilişlerin
+    dengeli olanları arasından eşit olasılıkla seçilir: dengesiz el torbaya geri konup yeniden çekilir. Torbada
+    yeterli sesli/sessiz yoksa veya BALANCED_RACK_ATTEMPTS denemede dengeli el çıkmazsa _build_balanced_rack ile
+    olabildiğince yaklaşılır.
+    """
+    size = min(size, bag.total)
+    vowels = sum(count for letter, count in zip(bag.letters, bag.counts) if letter in VOWELS)
+    blanks = bag.count(BLANK)
+    if vowels >= min_vowels and bag.total - vowels - blanks >= min_consonants and size >= min_vowels + min_consonants:
+        for _ in range(BALANCED_RACK_ATTEMPTS):
+            rack = bag.draw_many(size)
+            rack_vowels, rack_consonants = rack_balance(rack)
+            if rack_vowels >= min_vowels and rack_consonants >= min_consonants:
+                return rack
+            for letter in rack:
+                bag.add(letter)
+    return _build_balanced_rack(bag, size, min_vowels, min_consonants)
+
+
+def _build_balanced_rack(bag, size, min_vowels, min_consonants):
+    """
+    Önce sesli havuzundan min_vowels, sessiz havuzundan min_consonants harf, kalanı tüm torbadan çeker. Denge
+    şartını torbanın izin verdiği kadar sağlar ama harf sıklıklarını korumaz (sadece yedek yol).
+    """
+    non_vowels = {letter for letter in bag.letters if letter not in VOWELS}
+    non_consonants = {letter for letter in bag.letters if letter in VOWELS or letter == BLANK}
+    rack = []
+    for exclude, needed in ((non_vowels, min_vowels), (non_consonants, min_consonants)):
+        for _ in range(min(needed, size - len(rack))):
+            letter = bag.draw(exclude=exclude)
+            if letter is None:
+                break
+            rack.append(letter)
+    rack.extend(bag.draw_many(size - len(rack)))
+    bag.rng.shuffle(rack)  # Sesliler elin başında toplanmasın
+    return rack
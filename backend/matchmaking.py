@@ -0,0 +1,465 @@
+# Eşleştirme (Matchmaking) Servisi
+# Her oyun modu için ayrı kilitle korunan bir FIFO kuyruk tutar. Kuyruğa ekleme, kuyruktan çıkarma ve iptal O(1)'dir.
+# Kuyruklar matchmaking_store.py'deki bir store'da tutulur (bellek içi veya birden fazla worker için Redis).
+# Bekleyen oyuncu bir Event üzerinde uyur; eşleşme olduğu anda uyandırılır (1 saniyelik polling yok).
+# Socket.IO üzerinden katılan oyuncular için ticket'ta sid tutulur ve sonuç match_found ile gönderilir.
+# Rakip seçimi puana (User.total_points) göre yapılır: bekleyenler puan kovalarına ayrılır, arama
+# penceresi bekleme süresiyle genişler.
+# Eşleşme iki aşamalıdır: rakip store kilidi altında seçilir ve çift MatchQueue'ya eklenir; oyun satırı
+# kilit dışında bir worker tarafından yazılır. Oyun oluşturulana kadar çift matched_players'da (game_id=None)
+# görünür.
+import bisect
+import queue
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+GAME_MODES = ("TWO_MIN", "FIVE_MIN", "TWELVE_HOUR", "TWENTYFOUR_HOUR")
+
+# Eşleşme seçildikten sonra oyun oluşturulurken (complete / fail gelene kadar) uyarı loglanan bekleme aralığı
+PAIRING_GRACE_SECONDS = 10
+# Oyunu oluşturacak işlem bu kadar saniyede sonuç bildirmezse (örn. çöktüyse) bekleyen eşleşmeden vazgeçilir
+PAIRING_TIMEOUT_SECONDS = 60
+
+# Puan eşleştirme ayarları
+RATING_BUCKET_WIDTH = 50       # Bir kovadaki puan aralığı
+RATING_BASE_WINDOW = 100       # Yeni katılan oyuncunun kabul ettiği puan farkı
+RATING_WIDEN_PER_SECOND = 50   # Beklenen her saniye için pencereye eklenen puan
+RATING_UNLIMITED_AFTER = 10    # Bu kadar saniye bekleyen herkesle eşleşebilir
+
+
+def rating_window(waited_seconds):
+    """Bekleme süresine göre kabul edilen en büyük puan farkı."""
+    if waited_seconds >= RATING_UNLIMITED_AFTER:
+        return float('inf')
+    return RATING_BASE_WINDOW + RATING_WIDEN_PER_SECOND * max(0.0, waited_seconds)
+
+
+class TicketStatus:
+    Waiting = 'waiting'      # Kuyrukta rakip bekliyor
+    Pairing = 'pairing'      # Rakip seçildi, oyun oluşturuluyor
+    Matched = 'matched'      # Oyun oluşturuldu
+    Cancelled = 'cancelled'  # Kullanıcı aramayı iptal etti
+    Timeout = 'timeout'      # Süre doldu
+    Failed = 'failed'        # Oyun oluşturulamadı
+
+
+class Ticket:
+    """Bir kullanıcının tek bir rakip arama isteği."""
+    __slots__ = ('user_id', 'mode', 'sid', 'rating', 'excluded', 'joined_at', 'status', 'game_id',
+                 'opponent_id', 'cancel_requested', 'event')
+
+    def __init__(self, user_id, mode, sid=None, rating=0, excluded=frozenset(), joined_at=0.0):
+        self.user_id = user_id
+        self.mode = mode
+        self.sid = sid  # Socket.IO ile katıldıysa bağlantı ID'si
+        self.rating = rating  # User.total_points
+        self.excluded = excluded  # Aktif oyunu olan rakipler
+        self.joined_at = joined_at
+        self.status = TicketStatus.Waiting
+        self.game_id = None
+        self.opponent_id = None
+        self.cancel_requested = False
+        self.event = threading.Event()
+
+    def to_record(self):
+        """Paylaşılan store'da saklanan (JSON uyumlu) hali."""
+        return {"user_id": self.user_id, "rating": self.rating, "excluded": sorted(self.excluded),
+                "joined_at": self.joined_at}
+
+    @classmethod
+    def from_record(cls, mode, record):
+        return cls(record["user_id"], mode, rating=record["rating"], excluded=frozenset(record["excluded"]),
+                   joined_at=record["joined_at"])
+
+
+class RatingQueue:
+    """
+    Bir modun bekleme kuyruğu. FIFO sırası bir OrderedDict'te, puan index'i ise sıralı kova
+    anahtarları (bisect) ve kova başına FIFO OrderedDict'lerde tutulur. Ekleme/çıkarma O(1)
+    (yeni kova açılırken O(kova sayısı)), rakip arama O(log kova sayısı) + incelenen aday sayısıdır.
+    """
+
+    def __init__(self):
+        self._order = OrderedDict()  # user_id -> Ticket (en eski başta)
+        self._buckets = {}  # kova no -> OrderedDict(user_id -> Ticket)
+        self._bucket_keys = []  # boş olmayan kovaların sıralı listesi
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, user_id):
+        return user_id in self._order
+
+    def __iter__(self):
+        return iter(self._order.values())
+
+    def get(self, user_id):
+        return self._order.get(user_id)
+
+    def add(self, ticket):
+        self._order[ticket.user_id] = ticket
+        key = ticket.rating // RATING_BUCKET_WIDTH
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = OrderedDict()
+            bisect.insort(self._bucket_keys, key)
+        bucket[ticket.user_id] = ticket
+
+    def remove(self, ticket):
+        if self._order.pop(ticket.user_id, None) is None:
+            return
+        key = ticket.rating // RATING_BUCKET_WIDTH
+        bucket = self._buckets[key]
+        del bucket[ticket.user_id]
+        if not bucket:
+            del self._buckets[key]
+            del self._bucket_keys[bisect.bisect_left(self._bucket_keys, key)]
+
+    def oldest(self):
+        return next(iter(self._order.values()), None)
+
+    def find_partner(self, ticket, now):
+        """
+        Ticket için en yakın puanlı uygun rakibi bulur. Kovalar, ticket'ın kovasından başlayarak
+        uzaklık sırasıyla gezilir; her kovada en eski bekleyen önce denenir.
+        """
+        if not self._order:
+            return None
+        oldest = self.oldest()
+        own_window = rating_window(now - ticket.joined_at)
+        # Hiçbir rakip bu farktan daha uzağı kabul etmez (en geniş pencere en eski bekleyenindir)
+        reach = max(own_window, rating_window(now - oldest.joined_at))
+
+        keys = self._bucket_keys
+        own_key = ticket.rating // RATING_BUCKET_WIDTH
+        right = bisect.bisect_left(keys, own_key)
+        left = right - 1
+        while left >= 0 or right < len(keys):
+            # Puan olarak daha yakın olan tarafı seç
+            left_gap = ticket.rating - (keys[left] + 1) * RATING_BUCKET_WIDTH + 1 if left >= 0 else float('inf')
+            right_gap = keys[right] * RATING_BUCKET_WIDTH - ticket.rating if right < len(keys) else float('inf')
+            if left_gap <= right_gap:
+                key, gap = keys[left], max(0, left_gap)
+                left -= 1
+            else:
+                key, gap = keys[right], max(0, right_gap)
+                right += 1
+            if gap > reach:
+                break
+
+            for candidate in self._buckets[key].values():
+                if candidate is ticket:
+                    continue
+                waited_window = rating_window(now - candidate.joined_at)
+                if gap > max(own_window, waited_window):
+                    break  # Bu kovadaki sonraki adaylar daha yeni, pencereleri daha dar
+                if candidate.user_id in ticket.excluded or ticket.user_id in candidate.excluded:
+                    continue
+                if abs(candidate.rating - ticket.rating) <= max(own_window, waited_window):
+                    return candidate
+        return None
+
+
+class InstrumentedLock:
+    """Bekleme süresini ve çekişme (contention) sayısını ölçen kilit."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            waited = time.perf_counter() - start
+            self.contended += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
+
+    def stats(self):
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait_ms_total": round(self.wait_seconds * 1000, 3),
+            "wait_ms_max": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class MatchQueue:
+    """
+    Rakibi seçilmiş, oyunu henüz oluşturulmamış çiftlerin kuyruğu. Eşleşmeyi bulan istek çifti buraya ekleyip
+    hemen beklemeye geçer; oyunlar bir worker tarafından toplu olarak (tek commit ile) oluşturulur.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def put(self, ticket, opponent_ticket):
+        self._queue.put((ticket, opponent_ticket))
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def take_batch(self, max_items, timeout=None):
+        """İlk çifti bekler (en fazla timeout saniye), hazır olanlarla birlikte en fazla max_items çift döner."""
+        try:
+            pairs = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(pairs) < max_items:
+            try:
+                pairs.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            self.batches += 1
+        return pairs
+
+    def stats(self):
+        with self._lock:
+            return {"depth": self._queue.qsize(), "max_depth": self.max_depth, "enqueued": self.enqueued,
+                    "batches": self.batches}
+
+
+class Matchmaker:
+    """
+    Eşleştirme servisi. Kuyruk durumu bir MatchmakingStore'da tutulur (tek işlem için bellek içi,
+    birden fazla worker için Redis). Bu sınıf sadece bu işlemde bekleyen oyuncuların ticket'larını
+    ve Event'lerini yönetir; eşleşme/başarısızlık olayları store üzerinden tüm işlemlere yayılır.
+    Yerel ticket kayıtları kısa tutulan bir kayıt kilidiyle korunur.
+    """
+
+    def __init__(self, modes=GAME_MODES, clock=time.time, store=None):
+        if store is None:
+            from matchmaking_store import InProcessMatchmakingStore
+            store = InProcessMatchmakingStore(modes)
+        self.modes = tuple(modes)
+        self.store = store
+        self.on_resolved = None  # Yerel bir ticket sonuçlandığında çağrılır (örn. Socket.IO bildirimi)
+        self._clock = clock
+        self._tickets = {}  # user_id -> bu işlemde aktif Ticket
+        self._sid_users = {}  # sid -> user_id (Socket.IO ile bekleyenler)
+        self._registry_lock = InstrumentedLock('registry')
+        self.store.subscribe(self._handle_event)
+
+    @property
+    def matched_players(self):
+        return self.store.matched_players
+
+    def is_valid_mode(self, mode):
+        return mode in self.modes
+
+    def join(self, user_id, mode, sid=None, excluded_opponents=frozenset(), rating=0):
+        """
+        Kullanıcıyı kuyruğa ekler (sid verilirse Socket.IO bağlantısına bağlanır). Kuyrukta uygun bir
+        rakip varsa ikisini de kuyruktan çıkarır ve (ticket, rakip_ticket) döner; çift bekleyen eşleşme
+        olarak matched_players'a yazılır. Çağıran oyunu (örn. MatchQueue üzerinden bir worker ile) oluşturup
+        complete() veya fail() çağırmalıdır. Rakip yoksa (ticket, None) döner ve ticket kuyrukta bekler.
+        excluded_opponents: kullanıcının zaten aktif oyunu olan rakipler (kilit alınmadan önce tek sorguyla bulunur).
+        rating: kullanıcının puanı (User.total_points); en yakın puanlı rakip seçilir.
+        """
+        with self._registry_lock:
+            existing = self._tickets.get(user_id)
+            if existing is not None and existing.status in (TicketStatus.Waiting, TicketStatus.Pairing):
+                logger.info(f"Kullanıcı {user_id} zaten {existing.mode} kuyruğunda bekliyor.")
+                if sid is not None:
+                    self._set_sid(existing, sid)
+                return existing, None
+
+            ticket = Ticket(user_id, mode, rating=rating or 0, excluded=frozenset(excluded_opponents),
+                            joined_at=self._clock())
+            self._tickets[user_id] = ticket
+            if sid is not None:
+                self._set_sid(ticket, sid)
+
+        # Rakip arama ve kuyruğa ekleme store'da atomik yapılır
+        opponent_ticket = self.store.pair_or_enqueue(mode, ticket, ticket.joined_at)
+        if opponent_ticket is None:
+            logger.info(f"Kullanıcı {user_id} (puan {ticket.rating}), {mode} kuyruğuna eklendi.")
+            if ticket.cancel_requested and self._end_waiting(ticket, TicketStatus.Cancelled):
+                # Kuyruğa girerken iptal istendi
+                ticket.event.set()
+            return ticket, None
+
+        ticket, opponent_ticket = self._mark_pairing(ticket, opponent_ticket)
+        logger.info(f"{user_id} ile {opponent_ticket.user_id} eşleşti ({mode}, "
+                    f"puan farkı {abs(ticket.rating - opponent_ticket.rating)}).")
+        return ticket, opponent_ticket
+
+    def sweep(self, mode):
+        """
+        Penceresi zamanla genişleyen bekleyenleri birbiriyle eşleştirir. Arka planda periyodik çağrılır;
+        bulunan (ticket, rakip_ticket) çiftleri için oyun oluşturulmalıdır.
+        """
+        pairs = [self._mark_pairing(ticket, opponent_ticket)
+                 for ticket, opponent_ticket in self.store.sweep(mode, self._clock())]
+        for ticket, opponent_ticket in pairs:
+            logger.info(f"{ticket.user_id} ile {opponent_ticket.user_id} eşleşti ({mode}, pencere genişledi).")
+        return pairs
+
+    def _mark_pairing(self, *tickets):
+        """Store'dan dönen ticket'ları (varsa) bu işlemdeki ticket'larla değiştirip eşleşiyor durumuna alır."""
+        with self._registry_lock:
+            local = [self._tickets.get(t.user_id) or t for t in tickets]
+            first, second = local
+            for own, other in ((first, second), (second, first)):
+                own.status = TicketStatus.Pairing
+                own.opponent_id = other.user_id
+        # Oyun oluşturulana kadar bekleyen eşleşme (game_id=None)
+        self.store.set_match(first.user_id, None, second.user_id)
+        self.store.set_match(second.user_id, None, first.user_id)
+        return first, second
+
+    def complete(self, ticket, opponent_ticket, game_id):
+        """Oyun oluşturulduktan sonra iki oyuncuyu da (hangi işlemde bekliyorlarsa) bilgilendirir."""
+        self.store.set_match(ticket.user_id, game_id, opponent_ticket.user_id)
+        self.store.set_match(opponent_ticket.user_id, game_id, ticket.user_id)
+        self.store.publish({"type": TicketStatus.Matched, "game_id": game_id,
+                            "users": [ticket.user_id, opponent_ticket.user_id],
+                            "joined": [ticket.joined_at, opponent_ticket.joined_at]})
+
+    def fail(self, ticket, opponent_ticket):
+        """Oyun oluşturulamazsa bekleyen eşleşmeyi siler ve iki oyuncunun da aramasını sonlandırır."""
+        self.store.pop_match(ticket.user_id)
+        self.store.pop_match(opponent_ticket.user_id)
+        self.store.publish({"type": TicketStatus.Failed, "game_id": None,
+                            "users": [ticket.user_id, opponent_ticket.user_id],
+                            "joined": [ticket.joined_at, opponent_ticket.joined_at]})
+
+    def _handle_event(self, event):
+        """
+        Store'dan gelen eşleşme olayını bu işlemde bekleyen ticket'lara uygular. Olay, ait olduğu ticket'ları
+        joined_at ile tanımlar: vazgeçilmiş bir eşleşmenin geç gelen sonucu kullanıcının yeni aramasını etkilemez.
+        """
+        users, joined = event["users"], event["joined"]
+        resolved = []
+        with self._registry_lock:
+            for user_id, opponent_id, joined_at in ((users[0], users[1], joined[0]), (users[1], users[0], joined[1])):
+                ticket = self._tickets.get(user_id)
+                if ticket is None or ticket.joined_at != joined_at:
+                    continue
+                ticket.status = event["type"]
+                ticket.game_id = event["game_id"]
+                ticket.opponent_id = opponent_id
+                self._release(ticket)
+                resolved.append(ticket)
+        for ticket in resolved:
+            ticket.event.set()
+            if self.on_resolved is not None:
+                try:
+                    self.on_resolved(ticket)
+                except Exception as e:
+                    logger.error(f"Eşleşme bildirimi sırasında hata: {e}", exc_info=True)
+
+    def cancel(self, user_id):
+        """Kuyrukta bekleyen aramayı hemen iptal eder. Eşleşme zaten seçildiyse False döner."""
+        with self._registry_lock:
+            ticket = self._tickets.get(user_id)
+            if ticket is None or ticket.status != TicketStatus.Waiting:
+                return False
+            ticket.cancel_requested = True
+        if not self._end_waiting(ticket, TicketStatus.Cancelled):
+            # Henüz kuyruğa girmediyse join() iptali uygular; başka bir işlem eşleştirdiyse olay gelecek
+            return ticket.status == TicketStatus.Waiting
+        ticket.event.set()
+        logger.info(f"Kullanıcı {user_id} aramayı iptal etti ({ticket.mode}).")
+        return True
+
+    def cancel_sid(self, sid):
+        """Socket bağlantısı kapanınca o bağlantıyla bekleyen aramayı iptal eder."""
+        with self._registry_lock:
+            user_id = self._sid_users.get(sid)
+        if user_id is None:
+            return False
+        return self.cancel(user_id)
+
+    def _end_waiting(self, ticket, status):
+        """Kuyrukta bekleyen ticket'ı verilen durumla sonlandırır. Kuyrukta değilse False döner."""
+        if not self.store.remove(ticket.mode, ticket.user_id):
+            return False
+        with self._registry_lock:
+            ticket.status = status
+            self._release(ticket)
+        return True
+
+    def _set_sid(self, ticket, sid):
+        if ticket.sid is not None:
+            self._sid_users.pop(ticket.sid, None)
+        ticket.sid = sid
+        self._sid_users[sid] = ticket.user_id
+
+    def _release(self, ticket):
+        """Biten ticket'ı aktif aramalardan çıkarır (kayıt kilidi altında çağrılır)."""
+        if self._tickets.get(ticket.user_id) is ticket:
+            del self._tickets[ticket.user_id]
+        if ticket.sid is not None and self._sid_users.get(ticket.sid) == ticket.user_id:
+            del self._sid_users[ticket.sid]
+
+    def wait(self, ticket, timeout):
+        """
+        Eşleşme, iptal veya zaman aşımına kadar bekler ve ticket'ı döndürür. Süre dolduğunda rakip seçilmişse
+        (Pairing) oyun oluşturulana kadar, yani complete() veya fail() sonucu gelene kadar beklemeye devam eder;
+        sonuç PAIRING_TIMEOUT_SECONDS içinde gelmezse ticket Failed ile sonlandırılır.
+        """
+        if not ticket.event.wait(timeout):
+            if self._end_waiting(ticket, TicketStatus.Timeout):
+                logger.info(f"{ticket.user_id} için timeout (find_opponent).")
+            else:
+                # Rakip seçildi ama oyun hala oluşturuluyor (bu veya başka bir işlemde)
+                deadline = time.monotonic() + PAIRING_TIMEOUT_SECONDS
+                while not ticket.event.wait(min(PAIRING_GRACE_SECONDS, max(0.0, deadline - time.monotonic()))):
+                    if time.monotonic() >= deadline:
+                        self._abandon_pairing(ticket)
+                        break
+                    logger.warning(f"{ticket.user_id} için oyun oluşturulması sürüyor (rakip: {ticket.opponent_id}), "
+                                   f"beklemeye devam ediliyor.")
+
+        if ticket.status == TicketStatus.Matched:
+            self.pop_match(ticket.user_id)
+        return ticket
+
+    def _abandon_pairing(self, ticket):
+        """
+        Oyunu oluşturacak işlemden sonuç gelmedi (örn. complete/fail'den önce çöktü): ticket Failed ile
+        sonlandırılır, aktif aramalardan ve bekleyen eşleşmelerden çıkarılır; kullanıcı yeniden kuyruğa girebilir.
+        Sonradan gelen olay bu ticket'ı bulamaz ve yok sayılır; yeni aramaya da uygulanmaz (bkz. _handle_event).
+        """
+        with self._registry_lock:
+            if ticket.status not in (TicketStatus.Waiting, TicketStatus.Pairing):
+                return  # Son anda sonuçlandı
+            ticket.status = TicketStatus.Failed
+            self._release(ticket)
+        self.store.pop_match(ticket.user_id)
+        ticket.event.set()
+        logger.error(f"{ticket.user_id} ile {ticket.opponent_id} eşleşmesinin oyunu {PAIRING_TIMEOUT_SECONDS} saniyede "
+                     f"oluşturulmadı, eşleşmeden vazgeçildi.")
+
+    def pop_match(self, user_id):
+        """Kullanıcıya bildirilen eşleşmeyi matched_players'dan çıkarır."""
+        return self.store.pop_match(user_id)
+
+    def stats(self):
+        """Kuyruk uzunlukları ve kilit bekleme istatistikleri."""
+        stats = self.store.stats()
+        stats.setdefault("locks", {})["registry"] = self._registry_lock.stats()
+        return stats
@@ -0,0 +1,545 @@
+# Eşleştirme Kuyruğu Depoları (Matchmaking Store)
+# InProcessMatchmakingStore: tek worker için bellek içi kuyruklar (varsayılan).
+# RedisMatchmakingStore: birden fazla worker/sunucu için Redis protokolü üzerinden paylaşılan kuyruklar.
+#   Rakip seçip iki oyuncuyu kuyruktan çıkarma işlemi Lua script'i ile atomik yapılır; script sadece puana en
+#   yakın adayları okur, sweep sadece penceresi yeni bir adaya ulaşan ticket'lara bakar.
+# FakeRedis: canlı Redis olmadan RedisMatchmakingStore'u çalıştırmak için küçük bellek içi taklit.
+import os
+import json
+import queue
+import logging
+import threading
+
+from matchmaking import (
+    GAME_MODES, Ticket, RatingQueue, InstrumentedLock, rating_window,
+    RATING_BASE_WINDOW, RATING_WIDEN_PER_SECOND, RATING_UNLIMITED_AFTER,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessMatchmakingStore:
+    """Tek işlem içinde, mod başına ayrı kilit ve RatingQueue ile çalışan store."""
+
+    def __init__(self, modes=GAME_MODES):
+        self.waiting_players = {mode: RatingQueue() for mode in modes}  # mod -> bekleyen Ticket'lar
+        self.matched_players = {}  # user_id -> (game_id, opponent_id)
+        self._mode_locks = {mode: InstrumentedLock(mode) for mode in modes}
+        self._matched_lock = InstrumentedLock('matched')
+        self._handlers = []
+
+    def pair_or_enqueue(self, mode, ticket, now):
+        """Uygun rakip varsa ikisini de kuyruktan çıkarıp rakibi döndürür, yoksa ticket'ı kuyruğa ekler."""
+        with self._mode_locks[mode]:
+            waiting = self.waiting_players[mode]
+            opponent_ticket = waiting.find_partner(ticket, now)
+            if opponent_ticket is None:
+                waiting.add(ticket)
+                return None
+            waiting.remove(opponent_ticket)
+            return opponent_ticket
+
+    def sweep(self, mode, now):
+        pairs = []
+        with self._mode_locks[mode]:
+            waiting = self.waiting_players[mode]
+            for ticket in list(waiting):
+                if ticket.user_id not in waiting:
+                    continue  # Bu taramada zaten eşleşti
+                opponent_ticket = waiting.find_partner(ticket, now)
+                if opponent_ticket is None:
+                    continue
+                waiting.remove(ticket)
+                waiting.remove(opponent_ticket)
+                pairs.append((ticket, opponent_ticket))
+        return pairs
+
+    def remove(self, mode, user_id):
+        with self._mode_locks[mode]:
+            waiting = self.waiting_players[mode]
+            ticket = waiting.get(user_id)
+            if ticket is None:
+                return False
+            waiting.remove(ticket)
+            return True
+
+    def set_match(self, user_id, game_id, opponent_id):
+        with self._matched_lock:
+            self.matched_players[user_id] = (game_id, opponent_id)
+
+    def pop_match(self, user_id):
+        with self._matched_lock:
+            return self.matched_players.pop(user_id, None)
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def publish(self, event):
+        # Aynı işlemde olduğumuz için olay hemen iletilir
+        for handler in self._handlers:
+            handler(event)
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "queues": {mode: len(waiting) for mode, waiting in self.waiting_players.items()},
+            "locks": {name: lock.stats() for name, lock in self._mode_locks.items()},
+        }
+
+
+# --- Redis ---
+
+# Rakip aramada puanın üstünde ve altında incelenen en fazla aday sayısı (her yön için)
+CANDIDATE_LIMIT = 16
+
+# KEYS: puan zset'i, katılma zamanı zset'i, ticket hash'i, yeniden kontrol zset'i
+# ARGV: ticket json, şimdiki zaman, kuyruğa ekle (1/0), pencere ayarları (taban, saniye başı, sınırsız sonrası),
+#       yön başına aday sınırı
+# Uygun rakip varsa iki oyuncuyu da kuyruktan atomik olarak çıkarır ve rakibin kaydını döndürür. Sadece puana en
+# yakın adaylar okunur (ZRANGEBYSCORE / ZREVRANGEBYSCORE ... LIMIT 0 k), yani maliyet kuyruk boyundan bağımsızdır.
+# Eşleşme olmazsa ticket yeniden kontrol zset'ine, penceresinin en yakın adaya ulaşacağı zamanla yazılır; sweep
+# sadece zamanı gelen ticket'lara bakar. Penceresi artık büyümeyen (sınırsız) ticket'lar oradan çıkarılır, onlarla
+# eşleşmeyi yeni katılanlar arar.
+PAIR_OR_ENQUEUE_SCRIPT = """
+local t = cjson.decode(ARGV[1])
+local now = tonumber(ARGV[2])
+local base, per_sec, unlimited = tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6])
+local limit = tonumber(ARGV[7])
+local function window(waited)
+  if waited >= unlimited then return math.huge end
+  return base + per_sec * math.max(0, waited)
+end
+local function reached_at(joined, gap)
+  return joined + math.min(unlimited, math.max(0, (gap - base) / per_sec))
+end
+local me = tostring(t.user_id)
+if ARGV[3] == '0' and not redis.call('ZSCORE', KEYS[1], me) then
+  redis.call('ZREM', KEYS[4], me)
+  return false
+end
+
+local own = window(now - t.joined_at)
+local reach = own
+local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+if oldest[2] then reach = math.max(reach, window(now - tonumber(oldest[2]))) end
+
+local excluded = {}
+for _, id in ipairs(t.excluded) do excluded[tostring(id)] = true end
+local next_check = nil
+local up = redis.call('ZRANGEBYSCORE', KEYS[1], t.rating, '+inf', 'WITHSCORES', 'LIMIT', 0, limit)
+local down = redis.call('ZREVRANGEBYSCORE', KEYS[1], '(' .. t.rating, '-inf', 'WITHSCORES', 'LIMIT', 0, limit)
+local function earlier(at)
+  if next_check == nil or at < next_check then next_check = at end
+end
+-- Adaylar puan farkı sırasıyla (iki yön birleştirilerek) incelenir
+local i, j = 1, 1
+local best, best_gap, best_raw = nil, nil, nil
+local exhausted = false
+while true do
+  -- Okunan adayları biten yönde daha yakın, okunmamış adaylar olabilir: sonraki sweep'te tekrar bakılır
+  if (not up[i] and #up == 2 * limit) or (not down[j] and #down == 2 * limit) then exhausted = true; break end
+  if not up[i] and not down[j] then break end
+  local up_gap = up[i] and (tonumber(up[i + 1]) - t.rating) or math.huge
+  local down_gap = down[j] and (t.rating - tonumber(down[j + 1])) or math.huge
+  local id, gap
+  if up_gap <= down_gap then id, gap = up[i], up_gap; i = i + 2 else id, gap = down[j], down_gap; j = j + 2 end
+  if gap > reach or (best and gap > best_gap) then
+    if not best then
+      local joined = tonumber(redis.call('ZSCORE', KEYS[2], id)) or t.joined_at
+      earlier(reached_at(math.min(t.joined_at, joined), gap))
+    end
+    break
+  end
+  if id ~= me and not excluded[id] then
+    local raw = redis.call('HGET', KEYS[3], id)
+    if raw then
+      local c = cjson.decode(raw)
+      local blocked = false
+      for _, x in ipairs(c.excluded) do
+        if tostring(x) == me then blocked = true; break end
+      end
+      if not blocked then
+        if gap <= math.max(own, window(now - c.joined_at)) then
+          if best == nil or c.joined_at < best.joined_at then best, best_gap, best_raw = c, gap, raw end
+        else
+          earlier(reached_at(math.min(t.joined_at, c.joined_at), gap))
+        end
+      end
+    end
+  end
+end
+
+if best then
+  for _, id in ipairs({me, tostring(best.user_id)}) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('HDEL', KEYS[3], id)
+    redis.call('ZREM', KEYS[4], id)
+  end
+  return best_raw
+end
+if ARGV[3] == '1' then
+  redis.call('ZADD', KEYS[1], t.rating, me)
+  redis.call('ZADD', KEYS[2], t.joined_at, me)
+  redis.call('HSET', KEYS[3], me, ARGV[1])
+end
+if own == math.huge then
+  redis.call('ZREM', KEYS[4], me)
+else
+  if exhausted then next_check = now end
+  next_check = math.min(next_check or math.huge, t.joined_at + unlimited)
+  redis.call('ZADD', KEYS[4], tostring(next_check), me)
+end
+return false
+"""
+
+# KEYS: puan zset'i, katılma zamanı zset'i, ticket hash'i, yeniden kontrol zset'i; ARGV: user_id
+REMOVE_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[4], ARGV[1])
+return 1
+"""
+
+# KEYS: eşleşme hash'i; ARGV: user_id
+POP_MATCH_SCRIPT = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if raw then redis.call('HDEL', KEYS[1], ARGV[1]) end
+return raw
+"""
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _pair_or_enqueue_py(client, keys, args):
+    """PAIR_OR_ENQUEUE_SCRIPT'in FakeRedis için Python karşılığı (aynı mantık)."""
+    rating_key, joined_key, tickets_key, recheck_key = keys
+    t = json.loads(args[0])
+    now = float(args[1])
+    enqueue = str(args[2]) == '1'
+    base, per_sec, unlimited = float(args[3]), float(args[4]), float(args[5])
+    limit = int(args[6])
+    me = str(t["user_id"])
+    if not enqueue and client.zscore(rating_key, me) is None:
+        client.zrem(recheck_key, me)
+        return None
+
+    def reached_at(joined, gap):
+        return joined + min(unlimited, max(0.0, (gap - base) / per_sec))
+
+    own = rating_window(now - t["joined_at"])
+    reach = own
+    oldest = client.zrange(joined_key, 0, 0, withscores=True)
+    if oldest:
+        reach = max(reach, rating_window(now - oldest[0][1]))
+
+    excluded = {str(x) for x in t["excluded"]}
+    up = client.zrangebyscore(rating_key, t["rating"], '+inf', start=0, num=limit, withscores=True)
+    down = client.zrevrangebyscore(rating_key, f"({t['rating']}", '-inf', start=0, num=limit, withscores=True)
+    best = best_gap = best_raw = next_check = None
+    exhausted = False
+    i = j = 0
+    while True:
+        if (i == len(up) == limit) or (j == len(down) == limit):
+            exhausted = True
+            break
+        if i == len(up) and j == len(down):
+            break
+        up_gap = up[i][1] - t["rating"] if i < len(up) else float('inf')
+        down_gap = t["rating"] - down[j][1] if j < len(down) else float('inf')
+        if up_gap <= down_gap:
+            member, gap = _decode(up[i][0]), up_gap
+            i += 1
+        else:
+            member, gap = _decode(down[j][0]), down_gap
+            j += 1
+        if gap > reach or (best is not None and gap > best_gap):
+            if best is None:
+                joined = client.zscore(joined_key, member)
+                due = reached_at(min(t["joined_at"], t["joined_at"] if joined is None else joined), gap)
+                next_check = due if next_check is None else min(next_check, due)
+            break
+        if member == me or member in excluded:
+            continue
+        raw = client.hget(tickets_key, member)
+        if raw is None:
+            continue
+        c = json.loads(raw)
+        if me in {str(x) for x in c["excluded"]}:
+            continue
+        if gap <= max(own, rating_window(now - c["joined_at"])):
+            if best is None or c["joined_at"] < best["joined_at"]:
+                best, best_gap, best_raw = c, gap, raw
+        else:
+            due = reached_at(min(t["joined_at"], c["joined_at"]), gap)
+            next_check = due if next_check is None else min(next_check, due)
+
+    if best is not None:
+        for member in (me, str(best["user_id"])):
+            client.zrem(rating_key, member)
+            client.zrem(joined_key, member)
+            client.hdel(tickets_key, member)
+            client.zrem(recheck_key, member)
+        return best_raw
+    if enqueue:
+        client.zadd(rating_key, {me: t["rating"]})
+        client.zadd(joined_key, {me: t["joined_at"]})
+        client.hset(tickets_key, me, args[0])
+    if own == float('inf'):
+        client.zrem(recheck_key, me)
+    else:
+        if exhausted:
+            next_check = now
+        client.zadd(recheck_key, {me: min(next_check if next_check is not None else float('inf'),
+                                          t["joined_at"] + unlimited)})
+    return None
+
+
+def _remove_py(client, keys, args):
+    rating_key, joined_key, tickets_key, recheck_key = keys
+    if client.zrem(rating_key, args[0]) == 0:
+        return 0
+    client.zrem(joined_key, args[0])
+    client.hdel(tickets_key, args[0])
+    client.zrem(recheck_key, args[0])
+    return 1
+
+
+def _pop_match_py(client, keys, args):
+    raw = client.hget(keys[0], args[0])
+    if raw is not None:
+        client.hdel(keys[0], args[0])
+    return raw
+
+
+class RedisMatchmakingStore:
+    """
+    Redis protokolü üzerinden paylaşılan store. Birden fazla worker aynı kuyrukları görür;
+    eşleşme olayları pub/sub kanalıyla tüm worker'lara yayılır.
+    client: redis-py uyumlu istemci (redis.Redis) veya FakeRedis.
+    """
+
+    def __init__(self, client, modes=GAME_MODES, prefix='matchmaking'):
+        self._redis = client
+        self._modes = tuple(modes)
+        self._prefix = prefix
+        self._channel = f"{prefix}:events"
+        self._matched_key = f"{prefix}:matched"
+        self._pair_script = self._register_script(PAIR_OR_ENQUEUE_SCRIPT, _pair_or_enqueue_py)
+        self._remove_script = self._register_script(REMOVE_SCRIPT, _remove_py)
+        self._pop_match_script = self._register_script(POP_MATCH_SCRIPT, _pop_match_py)
+        self._handlers = []
+        self._listener = None
+
+    def _register_script(self, lua, python_impl):
+        if isinstance(self._redis, FakeRedis):
+            return lambda keys, args: self._redis.run_atomic(python_impl, keys, args)
+        script = self._redis.register_script(lua)
+        return lambda keys, args: script(keys=keys, args=args)
+
+    def _keys(self, mode):
+        return [f"{self._prefix}:{mode}:{name}" for name in ('rating', 'joined', 'tickets', 'recheck')]
+
+    def _window_args(self):
+        return [RATING_BASE_WINDOW, RATING_WIDEN_PER_SECOND, RATING_UNLIMITED_AFTER, CANDIDATE_LIMIT]
+
+    def pair_or_enqueue(self, mode, ticket, now):
+        raw = self._pair_script(self._keys(mode), [json.dumps(ticket.to_record()), now, 1] + self._window_args())
+        return Ticket.from_record(mode, json.loads(raw)) if raw else None
+
+    def sweep(self, mode, now):
+        """Sadece penceresi son kontrolden beri yeni bir adaya ulaşmış (zamanı gelmiş) ticket'lara bakılır."""
+        keys = self._keys(mode)
+        pairs = []
+        for member in self._redis.zrangebyscore(keys[3], '-inf', now):
+            raw = self._redis.hget(keys[2], _decode(member))
+            if raw is None:
+                self._redis.zrem(keys[3], _decode(member))
+                continue  # Bu arada eşleşti veya iptal edildi
+            opponent_raw = self._pair_script(keys, [_decode(raw), now, 0] + self._window_args())
+            if opponent_raw:
+                pairs.append((Ticket.from_record(mode, json.loads(raw)),
+                              Ticket.from_record(mode, json.loads(opponent_raw))))
+        return pairs
+
+    def remove(self, mode, user_id):
+        return bool(self._remove_script(self._keys(mode), [str(user_id)]))
+
+    def set_match(self, user_id, game_id, opponent_id):
+        self._redis.hset(self._matched_key, str(user_id), json.dumps([game_id, opponent_id]))
+
+    def pop_match(self, user_id):
+        raw = self._pop_match_script([self._matched_key], [str(user_id)])
+        return tuple(json.loads(raw)) if raw else None
+
+    @property
+    def matched_players(self):
+        return {int(_decode(k)): tuple(json.loads(v)) for k, v in self._redis.hgetall(self._matched_key).items()}
+
+    def subscribe(self, handler):
+        """Olay kanalını dinleyen arka plan thread'ini (eventlet altında green thread) başlatır."""
+        self._handlers.append(handler)
+        if self._listener is None:
+            pubsub = self._redis.pubsub()
+            pubsub.subscribe(self._channel)
+            self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True)
+            self._listener.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            if message.get('type') != 'message':
+                continue
+            try:
+                event = json.loads(_decode(message['data']))
+                for handler in self._handlers:
+                    handler(event)
+            except Exception as e:
+                logger.error(f"Eşleştirme olayı işlenirken hata: {e}", exc_info=True)
+
+    def publish(self, event):
+        self._redis.publish(self._channel, json.dumps(event))
+
+    def stats(self):
+        return {
+            "backend": "redis",
+            "queues": {mode: self._redis.zcard(self._keys(mode)[0]) for mode in self._modes},
+            "locks": {},
+        }
+
+
+class FakeRedis:
+    """
+    RedisMatchmakingStore'un kullandığı komutların bellek içi taklidi (test ve yerel geliştirme için).
+    Aynı FakeRedis nesnesini paylaşan store'lar, aynı Redis'e bağlı ayrı worker'lar gibi davranır.
+    Lua script'leri yerine aynı mantığın Python karşılıkları tek bir kilit altında (atomik) çalışır.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._hashes = {}
+        self._zsets = {}
+        self._subscribers = {}
+
+    def run_atomic(self, func, keys, args):
+        with self._lock:
+            return func(self, keys, args)
+
+    # Hash komutları
+    def hset(self, key, field, value):
+        with self._lock:
+            h = self._hashes.setdefault(key, {})
+            is_new = field not in h
+            h[field] = value
+            return int(is_new)
+
+    def hget(self, key, field):
+        with self._lock:
+            return self._hashes.get(key, {}).get(str(field))
+
+    def hdel(self, key, field):
+        with self._lock:
+            return int(self._hashes.get(key, {}).pop(str(field), None) is not None)
+
+    def hgetall(self, key):
+        with self._lock:
+            return dict(self._hashes.get(key, {}))
+
+    # Sıralı küme komutları
+    def zadd(self, key, mapping):
+        with self._lock:
+            z = self._zsets.setdefault(key, {})
+            added = sum(1 for member in mapping if member not in z)
+            z.update({member: float(score) for member, score in mapping.items()})
+            return added
+
+    def zrem(self, key, member):
+        with self._lock:
+            return int(self._zsets.get(key, {}).pop(str(member), None) is not None)
+
+    def zscore(self, key, member):
+        with self._lock:
+            return self._zsets.get(key, {}).get(str(member))
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._zsets.get(key, {}))
+
+    def _sorted(self, key):
+        return sorted(self._zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+
+    def zrange(self, key, start, end, withscores=False):
+        with self._lock:
+            items = self._sorted(key)
+            items = items[start:] if end == -1 else items[start:end + 1]
+            return items if withscores else [member for member, _ in items]
+
+    @staticmethod
+    def _bound(value):
+        """Redis skor sınırı: sayı veya '(' ile başlayan dışlayıcı sınır -> (değer, dışlayıcı mı)."""
+        value = str(value)
+        if value.startswith('('):
+            return float(value[1:]), True
+        return float(value), False
+
+    def zrangebyscore(self, key, lo, hi, start=None, num=None, withscores=False):
+        (lo, lo_open), (hi, hi_open) = self._bound(lo), self._bound(hi)
+        with self._lock:
+            items = [(member, score) for member, score in self._sorted(key)
+                     if (lo < score if lo_open else lo <= score) and (score < hi if hi_open else score <= hi)]
+        return self._page(items, start, num, withscores)
+
+    def zrevrangebyscore(self, key, hi, lo, start=None, num=None, withscores=False):
+        items = self.zrangebyscore(key, lo, hi, withscores=True)[::-1]
+        return self._page(items, start, num, withscores)
+
+    @staticmethod
+    def _page(items, start, num, withscores):
+        if start is not None:
+            items = items[start:start + num]
+        return items if withscores else [member for member, _ in items]
+
+    # Pub/Sub
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+        for subscriber in subscribers:
+            subscriber.put({'type': 'message', 'channel': channel, 'data': message})
+        return len(subscribers)
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+
+class _FakePubSub:
+    def __init__(self, client):
+        self._client = client
+        self._messages = queue.Queue()
+
+    def subscribe(self, channel):
+        with self._client._lock:
+            self._client._subscribers.setdefault(channel, []).append(self._messages)
+
+    def listen(self):
+        while True:
+            yield self._messages.get()
+
+
+def create_matchmaking_store(modes=GAME_MODES):
+    """
+    MATCHMAKING_STORE ortam değişkenine göre store oluşturur:
+    boş / "memory" -> bellek içi, "redis://..." -> Redis (redis paketi gerekir), "fakeredis" -> FakeRedis.
+    """
+    url = os.environ.get('MATCHMAKING_STORE', 'memory')
+    if url == 'memory':
+        return InProcessMatchmakingStore(modes)
+    if url == 'fakeredis':
+        return RedisMatchmakingStore(FakeRedis(), modes)
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("MATCHMAKING_STORE için 'redis' paketi gerekli: pip install redis")
+    logger.info(f"Eşleştirme kuyruğu Redis üzerinde: {url}")
+    return RedisMatchmakingStore(redis.Redis.from_url(url), modes)
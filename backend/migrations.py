@@ -0,0 +1,215 @@
+# Veritabanı Şema Geçişleri (Migrations)
+# Şema değişiklikleri burada sıralı, numaralı geçişler olarak tutulur; uygulanan geçişler 'schema_migrations'
+# tablosuna yazılır ve bir daha çalıştırılmaz. Geçiş adımları idempotent'tir (tablo, sütun veya indeks zaten varsa
+# atlanır): yazlab2_2.sql dökümünden kurulmuş eski veritabanı, db.create_all() ile oluşturulmuş veritabanı ve boş
+# veritabanı aynı son şemaya ulaşır. MySQL'de DDL örtük commit yaptığı için yarıda kalan bir geçiş tekrar
+# çalıştırılabilir olmalıdır.
+# Yeni şema değişikliği: models.py'yi güncelle ve MIGRATIONS'a yeni numaralı bir geçiş ekle.
+#
+# python migrations.py upgrade   -> bekleyen geçişleri uygular
+# python migrations.py status    -> uygulanmış / bekleyen geçişler
+import argparse
+import logging
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, JSON, MetaData, String, Table, inspect, select, text
+
+import game_data
+from board_layouts import DEFAULT_LAYOUT_NAME, DEFAULT_LAYOUT_VERSION
+from models import db, BoardLayout
+
+logger = logging.getLogger(__name__)
+
+# Geçiş kayıtları modellerin metadata'sında değil: db.create_all() bu tabloya dokunmaz
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def _quote(conn, name):
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _is_mysql(conn):
+    return conn.dialect.name in ('mysql', 'mariadb')
+
+
+def _columns(conn, table):
+    return {column['name'] for column in inspect(conn).get_columns(table)}
+
+
+def add_column(conn, table, name, column_type, backfill=None, nullable=True, params=None):
+    """
+    Sütun yoksa ekler. Mevcut satırlar backfill SQL ifadesiyle doldurulur; nullable=False ise ardından NOT NULL
+    yapılır (MySQL; sqlite'ta sütun tanımı değiştirilemediği için sütun boş değer kabul etmeye devam eder).
+    """
+    if name in _columns(conn, table):
+        return False
+    type_sql = column_type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {_quote(conn, table)} ADD COLUMN {_quote(conn, name)} {type_sql}"))
+    if backfill is not None:
+        conn.execute(text(f"UPDATE {_quote(conn, table)} SET {_quote(conn, name)} = {backfill} "
+                          f"WHERE {_quote(conn, name)} IS NULL"), params or {})
+    if not nullable and _is_mysql(conn):
+        conn.execute(text(f"ALTER TABLE {_quote(conn, table)} MODIFY {_quote(conn, name)} {type_sql} NOT NULL"))
+    logger.info(f"Sütun eklendi: {table}.{name}")
+    return True
+
+
+def drop_column(conn, table, name):
+    if name not in _columns(conn, table):
+        return False
+    conn.execute(text(f"ALTER TABLE {_quote(conn, table)} DROP COLUMN {_quote(conn, name)}"))
+    logger.info(f"Sütun silindi: {table}.{name}")
+    return True
+
+
+def add_foreign_key(conn, table, column, referred_table, name):
+    """Yabancı anahtar ekler (sadece MySQL; sqlite mevcut tabloya kısıt eklemeyi desteklemez)."""
+    if not _is_mysql(conn):
+        return False
+    if any(fk['constrained_columns'] == [column] for fk in inspect(conn).get_foreign_keys(table)):
+        return False
+    conn.execute(text(f"ALTER TABLE {_quote(conn, table)} ADD CONSTRAINT {_quote(conn, name)} "
+                      f"FOREIGN KEY ({_quote(conn, column)}) REFERENCES {_quote(conn, referred_table)} (id)"))
+    return True
+
+
+def modify_column(conn, table, name, column_type, nullable=True, default=None):
+    """Sütun tipini, NOT NULL'u ve varsayılan değeri değiştirir (sadece MySQL; sqlite sütun tanımını değiştiremez)."""
+    if not _is_mysql(conn):
+        return False
+    type_sql = column_type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {_quote(conn, table)} MODIFY {_quote(conn, name)} {type_sql}"
+                      f"{'' if nullable else ' NOT NULL'}{'' if default is None else f' DEFAULT {default}'}"))
+    logger.info(f"Sütun değiştirildi: {table}.{name}")
+    return True
+
+
+def create_index(conn, table, name, columns, unique=False):
+    """İndeks yoksa oluşturur. Aynı sütunlarda (unique ise benzersiz) bir indeks veya kısıt varsa atlanır."""
+    inspector = inspect(conn)
+    existing = inspector.get_indexes(table)
+    if unique:
+        existing = [index for index in existing if index['unique']] + [
+            {**constraint, 'unique': True} for constraint in inspector.get_unique_constraints(table)]
+    for index in existing:
+        if index['name'] == name or index['column_names'] == list(columns):
+            return False
+    column_sql = ", ".join(_quote(conn, column) for column in columns)
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {_quote(conn, name)} "
+                      f"ON {_quote(conn, table)} ({column_sql})"))
+    logger.info(f"İndeks oluşturuldu: {table}.{name} ({', '.join(columns)})")
+    return True
+
+
+def _ensure_default_layout(conn):
+    """Standart ödül tahtası düzeninin ID'si (yoksa eklenir)."""
+    layouts = BoardLayout.__table__
+    layout_id = conn.execute(select(layouts.c.id).where(layouts.c.name == DEFAULT_LAYOUT_NAME,
+                                                        layouts.c.version == DEFAULT_LAYOUT_VERSION)).scalar()
+    if layout_id is None:
+        layout_id = conn.execute(layouts.insert().values(
+            name=DEFAULT_LAYOUT_NAME, version=DEFAULT_LAYOUT_VERSION, cells=game_data.reward_punishment_board,
+            created_at=datetime.utcnow())).inserted_primary_key[0]
+    return layout_id
+
+
+def _0001_sync_game_schema(conn):
+    """yazlab2_2.sql dökümündeki eski 'game' tablosunu modellere eşitler; eksik tabloları oluşturur."""
+    db.metadata.create_all(conn, checkfirst=True)  # Boş veritabanında tüm tablolar; aksi halde sadece eksikler
+    layout_id = _ensure_default_layout(conn)
+
+    legacy_score = 'score0' in _columns(conn, 'game')  # Dökümde ikinci oyuncunun skoru
+    add_column(conn, 'game', 'score2', Integer(), 'score0' if legacy_score else '0')
+    add_column(conn, 'game', 'status', String(20), "'active'")
+    add_column(conn, 'game', 'remaining_time', DateTime(), 'created_at', nullable=False)
+    add_column(conn, 'game', 'user1_letters', JSON(), "'[]'", nullable=False)
+    add_column(conn, 'game', 'user2_letters', JSON(), "'[]'", nullable=False)
+    add_column(conn, 'game', 'user1_rewards', JSON(), "'[]'")
+    add_column(conn, 'game', 'user2_rewards', JSON(), "'[]'")
+    add_column(conn, 'game', 'hidden_board', JSON(), "'{}'", nullable=False)
+    add_column(conn, 'game', 'winner', Integer())
+    add_column(conn, 'game', 'user1_pass', Integer(), '0', nullable=False)
+    add_column(conn, 'game', 'user2_pass', Integer(), '0', nullable=False)
+    add_column(conn, 'game', 'state_version', Integer(), '0', nullable=False)
+    add_column(conn, 'game', 'board_layout_id', Integer(), ':layout_id', nullable=False,
+               params={'layout_id': layout_id})
+    add_foreign_key(conn, 'game', 'winner', 'user', 'fk_game_winner')
+    add_foreign_key(conn, 'game', 'board_layout_id', 'board_layout', 'fk_game_board_layout')
+
+    drop_column(conn, 'game', 'score0')
+    drop_column(conn, 'game', 'reward_punishment_board')  # Oyunlar artık paylaşılan düzene başvurur
+
+
+def _0002_hot_query_indexes(conn):
+    """Sık çalışan sorgular için indeksler (aktif / biten oyun listeleri, eşleştirme, giriş ve kayıt)."""
+    create_index(conn, 'game', 'ix_game_user1_status_created', ('user1', 'status', 'created_at'))
+    create_index(conn, 'game', 'ix_game_user2_status_created', ('user2', 'status', 'created_at'))
+    create_index(conn, 'user', 'uq_user_username', ('username',), unique=True)
+    create_index(conn, 'user', 'uq_user_email', ('email',), unique=True)
+
+
+def _0003_user_password_and_points(conn):
+    """
+    Şifre sütunu werkzeug hash'ine yetecek genişlikte (varchar(255)) ve total_points varsayılan 0 olmalı: /register
+    kullanıcıyı total_points vermeden ekler, strict modda varsayılansız NOT NULL sütun kaydı reddeder.
+    """
+    users = _quote(conn, 'user')
+    conn.execute(text(f"UPDATE {users} SET total_points = 0 WHERE total_points IS NULL"))
+    # Şifresi boş eski kayıt varsa (eski dökümde sütun NULL kabul ediyordu) NOT NULL yapılamaz
+    null_passwords = conn.execute(text(f"SELECT COUNT(*) FROM {users} WHERE password IS NULL")).scalar()
+    modify_column(conn, 'user', 'password', String(255), nullable=bool(null_passwords))
+    modify_column(conn, 'user', 'total_points', Integer(), nullable=False, default=0)
+
+
+# (versiyon, ad, geçiş) - sadece sona ekleme yapılır, uygulanmış geçişler değiştirilmez
+MIGRATIONS = (
+    (1, 'sync_game_schema', _0001_sync_game_schema),
+    (2, 'hot_query_indexes', _0002_hot_query_indexes),
+    (3, 'user_password_and_points', _0003_user_password_and_points),
+)
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def upgrade(engine=None):
+    """Bekleyen geçişleri sırayla (her biri kendi işleminde) uygular; uygulanan geçiş sayısını döndürür."""
+    engine = engine or db.engine
+    count = 0
+    for version, name, migrate in MIGRATIONS:
+        with engine.begin() as conn:
+            if version in applied_versions(conn):
+                continue
+            logger.info(f"Şema geçişi uygulanıyor: {version:04d}_{name}")
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.utcnow()))
+        count += 1
+    return count
+
+
+def migration_status(engine=None):
+    """[(versiyon, ad, uygulandı mı)]"""
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [(version, name, version in applied) for version, name, _ in MIGRATIONS]
+
+
+if __name__ == '__main__':
+    from app import app
+
+    parser = argparse.ArgumentParser(description="Veritabanı şema geçişleri.")
+    parser.add_argument('command', choices=('upgrade', 'status'), nargs='?', default='upgrade')
+    args = parser.parse_args()
+    with app.app_context():
+        if args.command == 'upgrade':
+            print(f"{upgrade()} geçiş uygulandı.")
+        for version, name, applied in migration_status():
+            print(f"{version:04d}_{name}: {'uygulandı' if applied else 'bekliyor'}")
@@ -23,16 +23,32 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(80), nullable=False)
-    total_points = db.Column(db.Integer, nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # werkzeug hash'i (pbkdf2:sha256 ~103 karakter)
+    total_points = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
+class BoardLayout(db.Model):
+    """Ödül/ceza tahtası düzeni ("A1": "TW", ...). Değiştirilmez; yeni düzen yeni sürüm olarak eklenir."""
+    __tablename__ = 'board_layout'
+    __table_args__ = (db.UniqueConstraint('name', 'version', name='uq_board_layout_name_version'),)
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(40), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    cells = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
 class Game(db.Model):
     __tablename__ = 'game'
+    # Oyuncunun aktif / biten oyunları: (user1 = ? OR user2 = ?) AND status ... ORDER BY created_at
+    __table_args__ = (
+        db.Index('ix_game_user1_status_created', 'user1', 'status', 'created_at'),
+        db.Index('ix_game_user2_status_created', 'user2', 'status', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user1 = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user2 = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    reward_punishment_board = db.Column(db.JSON, nullable=False)
+    board_layout_id = db.Column(db.Integer, db.ForeignKey('board_layout.id'), nullable=False)  # Ödül tahtası
     game_board = db.Column(db.JSON, nullable=False)
     score1 = db.Column(db.Integer, default=0)
     score2 = db.Column(db.Integer, default=0)
@@ -50,3 +66,32 @@ class Game(db.Model):
     winner = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     user1_pass = db.Column(db.Integer, nullable=False, default=0)
     user2_pass = db.Column(db.Integer, nullable=False, default=0)
+    state_version = db.Column(db.Integer, nullable=False, default=0)  # Her kalıcı değişiklikte artar (game_updated)
+
+
+class Move(db.Model):
+    """Oyunun append-only hamle günlüğü: her kabul edilen hamle için tek bir küçük satır (bkz. game_history.py)."""
+    __tablename__ = 'move'
+    __table_args__ = (db.UniqueConstraint('game_id', 'seq', name='uq_move_game_seq'),)
+    id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)  # Hamleden sonraki Game.state_version
+    player_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    kind = db.Column(db.String(20), nullable=False)
+    tiles = db.Column(db.JSON, nullable=False)  # Tahtaya konan taşlar [{row, col, letter}]
+    score1_delta = db.Column(db.Integer, nullable=False, default=0)
+    score2_delta = db.Column(db.Integer, nullable=False, default=0)
+    triggered = db.Column(db.JSON, nullable=False)  # Tetiklenen gizli öğeler [{key, type}]
+    changes = db.Column(db.JSON, nullable=False)  # Değişen diğer alanlar (el, ödüller, torba, sıra, durum)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class GameSnapshot(db.Model):
+    """Oyunun belirli bir versiyondaki tam durumu; hamleler en yakın snapshot'tan itibaren yeniden uygulanır."""
+    __tablename__ = 'game_snapshot'
+    __table_args__ = (db.UniqueConstraint('game_id', 'seq', name='uq_game_snapshot_game_seq'),)
+    id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    state = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
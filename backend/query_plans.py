@@ -0,0 +1,46 @@
+# Sorgu Planı Kontrolü
+# Bir isteğin (uç nokta çağrısı) çalıştırdığı SELECT'ler yakalanır ve her biri EXPLAIN ile planlanır; tablonun
+# tamamını tarayan (full scan) sorgular işaretlenir. benchmark.py explain ve tests/test_query_plans.py kullanır.
+# INSERT / UPDATE planlanmaz (MySQL EXPLAIN INSERT satırı her zaman 'ALL' gösterir); istek yine çalıştırılır.
+from sqlalchemy import event
+
+
+def is_full_scan(dialect, plan_row, tables):
+    """
+    EXPLAIN satırı bir tablonun tamamını (veya bir indeksin tamamını) tarıyor mu? Alt sorgu sonuçlarının
+    (sqlite co-routine, MySQL <derived>/<union>) okunması tablo taraması sayılmaz.
+    """
+    if dialect == 'sqlite':
+        detail = plan_row['detail']
+        return detail.startswith('SCAN ') and detail.split()[1] in tables
+    return plan_row.get('type') in ('ALL', 'index') and plan_row.get('table') in tables
+
+
+def explain_request(engine, tables, run):
+    """
+    run() çağrısının çalıştırdığı farklı SELECT'lerin planları: (sorgu, plan satırları, tam tarama satırları)
+    listesi. Aynı sorgu farklı parametrelerle (örn. her rakip için kullanıcı adı) tekrar çalışırsa bir kez planlanır.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    dialect = engine.dialect.name
+    explain = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    plans, seen = [], set()
+    for statement, parameters in captured:
+        if statement in seen:
+            continue
+        seen.add(statement)
+        with engine.connect() as conn:
+            plan = [dict(row._mapping) for row in conn.exec_driver_sql(explain + statement, parameters)]
+        plans.append((statement, plan, [row for row in plan if is_full_scan(dialect, row, tables)]))
+    return plans
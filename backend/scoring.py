@@ -0,0 +1,48 @@
+# Sunucu Tarafı Skor Hesaplama
+# Kelime yolları hücre indeksleriyle (row * 15 + col) yürünür; ödül kareleri board.py'deki, işlem başına bir kez
+# hesaplanan çarpan dizilerinden okunur. Böylece her harf için "A1"/"row_col" string'i üretilmez ve sözlükte
+# aranmaz; harfin kelimedeki yeri de yol üzerinde sayılarak bulunur (path.index yok).
+import logging
+
+from board import BOARD_SIZE, LETTER_MULTIPLIERS, WORD_MULTIPLIERS
+
+logger = logging.getLogger(__name__)
+
+BINGO_TILE_COUNT = 7  # Tek hamlede elin tamamı kullanılırsa
+BINGO_BONUS = 50
+
+
+def score_words(valid_words, placed_tiles, letter_scores, block_bonuses=False,
+                letter_multipliers=LETTER_MULTIPLIERS, word_multipliers=WORD_MULTIPLIERS):
+    """
+    Hamlenin toplam puanı. Ödül kareleri sadece bu turda konan taşlar için (ve bloklanmadıysa) uygulanır,
+    joker (is_blank) taşlar 0 puandır. Yolda bu tur konmayan taşların harfi kelimenin kendisinden alınır.
+    """
+    if not valid_words:
+        return 0
+    placed = {int(tile['row']) * BOARD_SIZE + int(tile['col']): tile for tile in placed_tiles}
+
+    total_score = 0
+    for word_info in valid_words:
+        word = word_info.get('word', '')
+        word_score = 0
+        word_multiplier = 1
+        for position, pos in enumerate(word_info.get('path', ())):
+            index = pos['row'] * BOARD_SIZE + pos['col']
+            tile = placed.get(index)
+            if tile is None:
+                if position >= len(word):
+                    logger.error(f"Skorlama: Path/Word uyumsuzluğu! Word:'{word}', Pos:{pos}")
+                    continue
+                word_score += letter_scores.get(word[position].upper(), 0)
+                continue
+            letter_score = 0 if tile.get('is_blank', False) else letter_scores.get(tile['letter'].upper(), 0)
+            if not block_bonuses:
+                letter_score *= letter_multipliers[index]
+                word_multiplier *= word_multipliers[index]
+            word_score += letter_score
+        total_score += word_score * word_multiplier
+
+    if len(placed_tiles) == BINGO_TILE_COUNT:
+        total_score += BINGO_BONUS
+    return max(0, total_score)
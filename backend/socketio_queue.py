@@ -0,0 +1,51 @@
+# Socket.IO Mesaj Kuyruğu (Çoklu Worker Yayını)
+# socketio.emit(..., to=room) sadece aynı process'e bağlı istemcilere ulaşır. Birden fazla worker
+# çalışırken emit'ler bir mesaj kuyruğu üzerinden diğer worker'lara da iletilir.
+# SOCKETIO_MESSAGE_QUEUE ortam değişkeni:
+#   boş             -> tek process, kuyruk yok (varsayılan)
+#   redis://host:port/0 -> Flask-SocketIO'nun Redis yöneticisi (message_queue=, redis paketi gerekir)
+#   loopback://     -> aynı process içindeki socketio.Server örnekleri arasında bellek içi kuyruk (test için;
+#                      Flask-SocketIO test_client kuyrukla çalışmaz, bkz. tests/test_socketio_queue.py)
+import queue
+import threading
+
+import socketio
+
+DEFAULT_CHANNEL = 'flask-socketio'  # Flask-SocketIO'nun varsayılan kanalı
+
+
+class LoopbackManager(socketio.PubSubManager):
+    """
+    Aynı process'teki birden fazla Socket.IO sunucusunu (ayrı worker'lar gibi) birbirine bağlar.
+    Mesajlar gerçek kuyruktaki gibi JSON'a çevrilip her aboneye kopyalanır.
+    """
+    name = 'loopback'
+    _channels = {}  # kanal adı -> abone kuyrukları
+    _channels_lock = threading.Lock()
+
+    def __init__(self, url='loopback://', channel=DEFAULT_CHANNEL, write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self._queue = queue.Queue()
+        if not write_only:
+            with self._channels_lock:
+                self._channels.setdefault(channel, []).append(self._queue)
+
+    def _publish(self, data):
+        message = self.json.dumps(data)
+        with self._channels_lock:
+            subscribers = list(self._channels.get(self.channel, []))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def _listen(self):
+        while True:
+            yield self._queue.get()
+
+
+def socketio_queue_options(url):
+    """SOCKETIO_MESSAGE_QUEUE değerini SocketIO(...) için keyword argümanlarına çevirir."""
+    if not url:
+        return {}
+    if url.startswith('loopback://'):
+        return {"client_manager": LoopbackManager(url)}
+    return {"message_queue": url}
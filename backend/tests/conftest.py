@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Backend modülleri paket değil, düz dosyalar (app.py'deki gibi doğrudan import edilir)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py veritabanı adresini import anında okur: testler geçici bir sqlite veritabanı kullanır
+_workdir = tempfile.mkdtemp(prefix='backend-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_workdir, 'test.db')}")
+os.environ.setdefault('GAME_JOURNAL_PATH', os.path.join(_workdir, 'journal.log'))
+os.environ.setdefault('GAME_JOURNAL_FSYNC', '0')
+
+
+@pytest.fixture(scope='session')
+def server():
+    """Şeması kurulmuş (migrations.upgrade) ve 1-4 ID'li kullanıcıları olan app modülü."""
+    import app as server
+    from migrations import upgrade
+    from models import db, User
+
+    with server.app.app_context():
+        upgrade()
+        for user_id in range(1, 5):
+            db.session.add(User(id=user_id, username=f"test{user_id}", email=f"test{user_id}@example.com",
+                                password="-", total_points=0))
+        db.session.commit()
+    return server
+
+
+@pytest.fixture
+def new_game(server):
+    """Kullanıcı 1 ile 2 arasında, sıra kullanıcı 1'de olan ve elinde verilen harfler bulunan yeni oyun."""
+    from game_state import bump_state_version
+
+    def create(letters="ELMAKTR", **fields):
+        with server.app.app_context():
+            game_id = server.create_matched_game(1, 2, "FIVE_MIN")
+            server.ensure_game_store()
+            game = server.game_store.acquire(game_id)
+            game.turn_order = 1
+            game.user1_letters = list(letters)
+            game.hidden_board = {}  # Tuzaksız tahta: hamle sonucu rastgele değişmez
+            for name, value in fields.items():
+                setattr(game, name, value)
+            bump_state_version(game)
+            server.game_store.commit(game)
+            server.game_store.release(game)
+        return game_id
+
+    return create
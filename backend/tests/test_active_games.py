@@ -0,0 +1,19 @@
+# Aktif oyun listesi önbelleği: biten oyun, bitiş kaydı veritabanına yazılınca listeden düşmeli
+def _active_ids(client, user_id):
+    response = client.get(f'/active-games/{user_id}?limit=100')
+    assert response.status_code == 200, response.get_json()
+    return {game['id'] for game in response.get_json()['games']}
+
+
+def test_resigned_game_leaves_the_list_once_flushed(server, new_game):
+    game_id = new_game()
+    client = server.app.test_client()
+    assert game_id in _active_ids(client, 1)
+
+    response = client.post(f'/leave-game/{game_id}', json={'userId': 1})
+    assert response.status_code == 200, response.get_json()
+    _active_ids(client, 2)  # Bitiş henüz yazılmadıysa veritabanından "aktif" olarak okunup önbelleklenir
+
+    with server.app.app_context():
+        server.game_store.flush()
+    assert game_id not in _active_ids(client, 1) | _active_ids(client, 2)
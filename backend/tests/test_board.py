@@ -0,0 +1,71 @@
+# Düz tahta: ikili biçim (snapshot'lar) ve önbellekteki oyunun hamleler arasında bellekte tutulan Board'ları
+import random
+
+import pytest
+
+import game_data
+from board import Board, BOARD_SIZE, CELL_COUNT, HIDDEN_ITEM_CODES, LETTER_CODES
+from game_cache import GameCache, game_boards
+
+
+def test_letters_round_trip_through_bytes():
+    rng = random.Random(3)
+    board = Board()
+    for index in rng.sample(range(CELL_COUNT), 60) + [0, CELL_COUNT - 1]:
+        board[index] = rng.choice(LETTER_CODES)
+
+    data = board.to_bytes()
+    assert len(data) == 2 + 2 * len(board.to_dict())
+    assert Board.from_bytes(data).cells == board.cells
+    assert Board.from_bytes(Board().to_bytes()).is_empty()
+
+
+def test_hidden_items_round_trip_through_bytes():
+    hidden = Board.from_dict(game_data.generate_hidden_board())
+    data = hidden.to_bytes(HIDDEN_ITEM_CODES)
+    assert Board.from_bytes(data, HIDDEN_ITEM_CODES).to_dict() == hidden.to_dict()
+    with pytest.raises(ValueError):
+        hidden.to_bytes(LETTER_CODES)  # Gizli öğeler harf tablosunda yok
+
+
+def test_unknown_format_version_is_rejected():
+    with pytest.raises(ValueError):
+        Board.from_bytes(b'\x09\x00')
+
+
+def test_cached_boards_follow_accepted_moves(server, new_game, monkeypatch):
+    if not isinstance(server.game_store, GameCache):
+        pytest.skip("Board'lar sadece önbellekteki oyunda hamleler arasında tutulur (GAME_CACHE=0)")
+    game_id = new_game("ELMAKTR", hidden_board={"7_8": game_data.REWARD_EXTRA_TURN,
+                                                "0_0": game_data.TRAP_LETTER_LOSS})
+    with server.app.app_context():
+        game = server.game_store.acquire(game_id)
+        game_boards(game)  # Önbellekteki oyunun Board'ları kurulur
+        server.game_store.release(game)
+
+    rebuilt = []
+    from_dict = Board.from_dict.__func__
+
+    def counting_from_dict(cls, board_dict):
+        rebuilt.append(board_dict)
+        return from_dict(cls, board_dict)
+
+    monkeypatch.setattr(Board, 'from_dict', classmethod(counting_from_dict))
+    client = server.app.test_client()
+    tiles = [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]
+    response = client.post('/submit-move', json={'game_id': game_id, 'user_id': 1, 'placed_tiles': tiles})
+    assert response.status_code == 200, response.get_json()
+    assert rebuilt == []  # Hamle tahtaları sözlüklerden yeniden kurmadı
+    monkeypatch.undo()
+
+    with server.app.app_context():
+        game = server.game_store.acquire(game_id)
+        try:
+            board, hidden = game_boards(game)
+            assert game_boards(game)[0] is board  # Tekrar kurulmaz
+            assert board.cells == Board.from_dict(game.game_board).cells
+            assert hidden.cells == Board.from_dict(game.hidden_board).cells
+            assert hidden.get(7, 8) is None and hidden.get(0, 0) == game_data.TRAP_LETTER_LOSS
+            assert [board[7 * BOARD_SIZE + 7 + i] for i in range(4)] == list("ELMA")
+        finally:
+            server.game_store.release(game)
@@ -0,0 +1,58 @@
+# DAWG sözlüğü: küçük bir kelime listesinin derlenmesi, aramalar (Türkçe İ/ı büyük-küçük harf dönüşümü dahil)
+# ve build_dictionary.py'nin yazdığı dosyanın yeniden açılması
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dictionary import DawgDictionary, normalize_entry
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORD_LIST = ["ılık", "ıslak", "iğne", "ince", "inci", "kâğıt", "kış", "kışla", "su / sular", "ak sakal", "kitap"]
+
+
+@pytest.fixture
+def dictionary():
+    return DawgDictionary.from_words(word for line in WORD_LIST for word in normalize_entry(line))
+
+
+def test_contains_uses_turkish_casing(dictionary):
+    assert dictionary.contains("ILIK") and "ılık" in dictionary
+    assert dictionary.contains("İNCE") and dictionary.contains("ince")
+    assert not dictionary.contains("INCE")  # Noktasız I farklı bir harf
+    assert dictionary.contains("kağıt")  # Şapka kaldırılır
+    assert dictionary.contains("SULAR") and dictionary.contains("SU")  # "a / b" varyantları ayrı kelime
+    assert not dictionary.contains("AKSAKAL") and not dictionary.contains("KIŞL") and not dictionary.contains("")
+
+
+def test_has_prefix(dictionary):
+    assert dictionary.has_prefix("ı") and dictionary.has_prefix("İN") and dictionary.has_prefix("kışla")
+    assert not dictionary.has_prefix("IN") and not dictionary.has_prefix("x")
+    assert dictionary.has_prefix("")
+
+
+def test_iter_with_prefix_is_alphabetical(dictionary):
+    assert list(dictionary.iter_with_prefix("i")) == ["İĞNE", "İNCE", "İNCİ"]
+    assert list(dictionary.iter_with_prefix("kış")) == ["KIŞ", "KIŞLA"]
+    assert list(dictionary.iter_with_prefix("ı")) == ["ILIK", "ISLAK"]
+    assert list(dictionary.iter_with_prefix("zz")) == []
+    assert len(dictionary) == 11
+
+
+def test_built_file_reloads(tmp_path, dictionary):
+    word_list = tmp_path / "words.txt"
+    word_list.write_text("\n".join(WORD_LIST[:6]), encoding='utf-8')
+    extra = tmp_path / "extra.json"
+    extra.write_text(json.dumps(WORD_LIST[6:]), encoding='utf-8')
+    output = tmp_path / "words.dawg"
+
+    subprocess.run([sys.executable, "build_dictionary.py", "-i", str(word_list), "--json", str(extra),
+                    "-o", str(output)], cwd=BACKEND_DIR, check=True, capture_output=True)
+    reloaded = DawgDictionary.open(str(output))
+    try:
+        assert list(reloaded) == list(dictionary)
+        assert "ıslak" in reloaded and list(reloaded.iter_with_prefix("kı")) == ["KIŞ", "KIŞLA"]
+    finally:
+        reloaded.close()
@@ -0,0 +1,34 @@
+# Oyuncuların elleri gizlidir: HTTP durum yanıtları ve Socket.IO oyuncu odaları sadece o oyuncuya açıktır
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/game/{}/initialize', '/resume-game/{}'])
+def test_state_contains_only_the_requesting_players_hand(server, new_game, path):
+    game_id = new_game("ELMAKTR")
+    client = server.app.test_client()
+
+    own = client.get(path.format(game_id) + '?user_id=1').get_json()
+    assert own['user1_letters'] == list("ELMAKTR") and 'user2_letters' not in own
+    assert own['opponent_letter_count'] == 7
+
+    other = client.get(path.format(game_id) + '?user_id=3').get_json()
+    assert 'user1_letters' not in other and 'user2_letters' not in other
+
+
+def _joined_room(server, game_id, user_id, token=None):
+    auth = {'token': token} if token else None
+    client = server.socketio.test_client(server.app, auth=auth)
+    client.emit('join_game', {'game_id': game_id, 'user_id': user_id})
+    room = next(event['args'][0]['room'] for event in client.get_received() if event['name'] == 'joined_room')
+    client.disconnect()
+    return room
+
+
+def test_player_room_requires_the_authenticated_user(server, new_game):
+    game_id = new_game()
+    token = server.session_tokens.dumps(1)
+
+    assert _joined_room(server, game_id, 1, token) == f"{game_id}:1"
+    assert _joined_room(server, game_id, 1) == str(game_id)  # Oturum anahtarı yok
+    assert _joined_room(server, game_id, 2, token) == str(game_id)  # Başka oyuncunun eli
+    assert _joined_room(server, game_id, 1, token + 'x') == str(game_id)  # Geçersiz imza
@@ -0,0 +1,123 @@
+# Write-behind oyun önbelleği: süreç başına günlük, sahipsiz günlüklerin devralınması ve flush çakışmaları
+import json
+import os
+
+import pytest
+
+from game_cache import GameCache, GameJournal, GameResyncRequired, read_journal_moves
+from game_state import bump_state_version
+from models import db, Game
+
+
+def _line(game_id, seq):
+    return json.dumps({"game_id": game_id, "seq": seq})
+
+
+def _files(journal):
+    return sorted(os.listdir(os.path.dirname(journal.path)))
+
+
+def test_workers_rotate_and_discard_only_their_own_journal(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    first = GameJournal(path, fsync=False, worker='a')
+    second = GameJournal(path, fsync=False, worker='b')
+    first.append(_line(1, 1))
+    second.append(_line(2, 1))
+    first.rotate()
+    second.rotate()
+    first.discard_rotated()
+
+    remaining = [str(tmp_path / name) for name in _files(second) if name.startswith('journal.b.log.')]
+    assert list(read_journal_moves(remaining)) == [2]
+    assert first.claim_orphans() == []  # b çalışıyor: günlüğüne dokunulmaz
+
+
+def test_dead_workers_journal_is_claimed_once(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    alive = GameJournal(path, fsync=False, worker='alive')
+    dead = GameJournal(path, fsync=False, worker='dead')
+    dead.append(_line(5, 1))
+    dead.rotate()
+    dead.append(_line(5, 2))
+    dead.close()  # Süreç öldü: kilit bırakıldı, dosyalar kaldı
+
+    claims = alive.claim_orphans()
+    other = GameJournal(path, fsync=False, worker='other')
+    assert other.claim_orphans() == []  # Devralma sürerken başka süreç aynı günlüğü alamaz
+    assert [move['seq'] for move in read_journal_moves(claims[0].files)[5]] == [1, 2]
+    for claim in claims:
+        claim.discard()
+        claim.release()
+    assert not [name for name in _files(alive) if name.startswith('journal.dead.')]
+
+
+def test_recover_replays_a_dead_workers_moves(server, new_game, tmp_path):
+    game_id = new_game()
+    path = str(tmp_path / 'journal.log')
+    with server.app.app_context():
+        server.game_store.flush()
+        dead = GameCache(GameJournal(path, fsync=False, worker='dead'))
+        game = dead.acquire(game_id)
+        game.score1 = 7
+        bump_state_version(game)
+        dead.commit(game, 1)
+        version = game.state_version
+        dead.release(game)
+        dead.journal.close()  # flush edilmeden çöktü
+
+        GameCache(GameJournal(path, fsync=False, worker='alive')).recover()
+        db.session.expire_all()
+        row = db.session.get(Game, game_id)
+        assert (row.score1, row.state_version) == (7, version)
+
+
+def test_flush_conflict_keeps_moves_and_requires_resync(server, new_game, tmp_path):
+    game_id = new_game()
+    with server.app.app_context():
+        server.game_store.flush()
+        cache = GameCache(GameJournal(str(tmp_path / 'journal.log'), fsync=False, worker='w'))
+        game = cache.acquire(game_id)
+        game.score1 = 3
+        bump_state_version(game)
+        cache.commit(game, 1)
+        cache.release(game)
+        # Başka bir worker oyunu değiştirdi
+        Game.query.filter_by(id=game_id).update({'state_version': Game.state_version + 5})
+        db.session.commit()
+
+        assert cache.flush() == 0
+        assert cache.flush() == 0  # Tekrar denenmez, hamleler atılmaz
+        with pytest.raises(GameResyncRequired):
+            cache.acquire(game_id)
+        assert cache.stats()['resync_games'] == [game_id]
+        kept = read_journal_moves([cache.journal.conflict_path])[game_id]
+        assert [move['score1_delta'] for move in kept] == [3]
+
+
+def test_moves_on_a_conflicted_game_are_rejected(server, new_game):
+    game_id = new_game("ELMAKTR")
+    with server.app.app_context():
+        Game.query.filter_by(id=game_id).update({'state_version': Game.state_version + 5})
+        db.session.commit()
+        server.game_store.flush()
+    client = server.app.test_client()
+    tiles = [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]
+    response = client.post('/submit-move', json={'game_id': game_id, 'user_id': 1, 'placed_tiles': tiles})
+    assert response.status_code == 409
+    assert client.get(f'/resume-game/{game_id}').status_code == 409
+
+
+def test_reads_see_unflushed_moves(server, new_game):
+    game_id = new_game("ELMAKTR")
+    client = server.app.test_client()
+    tiles = [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]
+    move = client.post('/submit-move', json={'game_id': game_id, 'user_id': 1, 'placed_tiles': tiles}).get_json()
+
+    resumed = client.get(f'/resume-game/{game_id}').get_json()
+    assert resumed['game_board'] == move['game_board'] and resumed['turn_order'] == move['next_turn']
+
+    assert client.post(f'/leave-game/{game_id}', json={'userId': 2}).status_code == 200
+    moves = client.get(f'/game/{game_id}/moves').get_json()['moves']
+    assert moves[-1]['kind'] == 'resign'
+    final = client.get(f"/game/{game_id}/replay/{moves[-1]['seq']}").get_json()
+    assert final['status'] == 'finished' and final['game_board'] == move['game_board']
@@ -0,0 +1,74 @@
+# Hamle geçmişi: hamle satırları + en son snapshot'tan yeniden oluşturulan kayıt, canlı kayıtla aynı olmalı
+import random
+
+import pytest
+
+import game_data
+from game_cache import DirectGameStore, GameCache, GameJournal
+from game_history import SNAPSHOT_INTERVAL, game_record, reconstruct_game_record
+from game_state import bump_state_version
+from models import GameSnapshot
+
+MOVES = 2 * SNAPSHOT_INTERVAL + 7
+
+
+def _play(game, rng):
+    """Rastgele bir hamle: alanlar, önbellekteki gibi yeni nesnelerle değiştirilir (copy-on-write)."""
+    board = dict(game.game_board or {})
+    free = [(row, col) for row in range(game_data.BOARD_SIZE) for col in range(game_data.BOARD_SIZE)
+            if f"{row}_{col}" not in board]
+    for row, col in rng.sample(free, rng.randint(1, 4)):
+        board[f"{row}_{col}"] = rng.choice("ABCÇDEĞİKLMNOÖŞÜZ")
+    game.game_board = board
+
+    if game.hidden_board and rng.random() < 0.3:
+        hidden = dict(game.hidden_board)
+        hidden.pop(rng.choice(sorted(hidden)))
+        game.hidden_board = hidden
+
+    bag = dict(game.remaining_letters)
+    letter = rng.choice([letter for letter, data in bag.items() if data['count'] > 0])
+    bag[letter] = {**bag[letter], 'count': bag[letter]['count'] - 1}
+    game.remaining_letters = bag
+
+    slot = 'user1' if game.turn_order == game.user1 else 'user2'
+    setattr(game, f"{slot}_letters", [letter] + list(getattr(game, f"{slot}_letters") or [])[1:])
+    setattr(game, f"score{slot[-1]}", (getattr(game, f"score{slot[-1]}") or 0) + rng.randint(2, 30))
+    if rng.random() < 0.2:
+        rewards = list(getattr(game, f"{slot}_rewards") or [])
+        setattr(game, f"{slot}_rewards", rewards + [game_data.REWARD_EXTRA_TURN])
+    player_id = game.turn_order
+    game.turn_order = game.user2 if slot == 'user1' else game.user1
+    bump_state_version(game)
+    return player_id
+
+
+@pytest.mark.parametrize('store_kind', ['cache', 'direct'])
+def test_history_rebuilds_the_live_record(server, new_game, tmp_path, store_kind):
+    game_id = new_game(hidden_board={"0_0": game_data.TRAP_SCORE_DIVIDE, "3_5": game_data.REWARD_EXTRA_TURN,
+                                     "14_14": game_data.TRAP_LETTER_LOSS})
+    rng = random.Random(7)
+    with server.app.app_context():
+        server.game_store.flush()
+        if store_kind == 'cache':
+            store = GameCache(GameJournal(str(tmp_path / 'journal.log'), fsync=False, worker='history'))
+        else:
+            store = DirectGameStore()
+        for _ in range(MOVES):
+            game = store.acquire(game_id)
+            store.commit(game, _play(game, rng))
+            store.release(game)
+            store.flush()
+
+        game = store.acquire(game_id)
+        live = game_record(game)
+        store.release(game)
+
+        rows = GameSnapshot.query.filter_by(game_id=game_id).order_by(GameSnapshot.seq).all()
+        snapshots = [row.seq for row in rows]
+        assert [seq for seq in snapshots if seq % SNAPSHOT_INTERVAL == 0][-2:] == \
+            [(live['state_version'] // SNAPSHOT_INTERVAL - 1) * SNAPSHOT_INTERVAL,
+             live['state_version'] // SNAPSHOT_INTERVAL * SNAPSHOT_INTERVAL]
+        assert snapshots[-1] < live['state_version']  # Son kısım hamle satırlarından uygulanır
+        assert all(isinstance(rows[-1].state[field], str) for field in ('game_board', 'hidden_board'))  # İkili biçim
+        assert reconstruct_game_record(game_id) == live
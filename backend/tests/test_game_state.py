@@ -0,0 +1,90 @@
+# 'game_updated' mesajları: delta versiyon zinciri ve ellerin sadece sahibine gönderilmesi
+from types import SimpleNamespace
+
+from game_state import (UPDATE_DELTA, UPDATE_FULL, build_move_delta, bump_state_version, player_game_state,
+                        player_move_delta, serialize_game_state)
+
+HAND_FIELDS = {'user1_letters', 'user2_letters', 'user1_rewards', 'user2_rewards', 'hand', 'rewards'}
+
+
+def _game(**fields):
+    game = SimpleNamespace(id=5, user1=1, user2=2, board_layout_id=1, game_board={}, score1=0, score2=0,
+                           turn_order=1, remaining_letters={"A": {"count": 3, "score": 1}}, gamemode=None,
+                           created_at=None, remaining_time=None, status='active', winner=None, state_version=4,
+                           user1_letters=list("ELMAKTR"), user2_letters=list("SUKAPIN"),
+                           user1_rewards=[], user2_rewards=["extra_turn"])
+    for name, value in fields.items():
+        setattr(game, name, value)
+    return game
+
+
+def _move(game, user_id, tiles):
+    bump_state_version(game)
+    return build_move_delta(game, user_id, tiles, {"words": []})
+
+
+def test_deltas_chain_on_base_version():
+    game = _game()
+    first = _move(game, 1, [{'row': 7, 'col': 7, 'letter': 'E'}])
+    second = _move(game, 2, [{'row': 8, 'col': 7, 'letter': 'S'}])
+    assert (first['type'], first['base_version'], first['version']) == (UPDATE_DELTA, 4, 5)
+    assert (second['base_version'], second['version']) == (first['version'], 6)
+    assert player_move_delta(second, game, 2)['version'] == second['version']
+
+
+def test_only_the_mover_gets_their_new_hand():
+    game = _game()
+    delta = _move(game, 1, [{'row': 7, 'col': 7, 'letter': 'E'}])
+    assert HAND_FIELDS.isdisjoint(delta)
+
+    mover = player_move_delta(delta, game, 1)
+    assert mover['hand'] == {"user_id": 1, "letters": list("ELMAKTR")} and mover['rewards']['user_id'] == 1
+    assert player_move_delta(delta, game, 2) is delta  # Rakip: ortak delta
+    assert player_move_delta(delta, game, 9) is delta
+    assert HAND_FIELDS.isdisjoint(delta)  # Ortak delta değişmedi
+
+
+def test_full_state_leaves_out_hands():
+    game = _game()
+    state = serialize_game_state(game)
+    assert state['type'] == UPDATE_FULL and state['version'] == 4
+    assert HAND_FIELDS.isdisjoint(state)
+
+    own = player_game_state(state, game, 2)
+    assert own['user2_letters'] == list("SUKAPIN") and own['user2_rewards'] == ["extra_turn"]
+    assert 'user1_letters' not in own and own['opponent_letter_count'] == 7
+    assert player_game_state(state, game, 9) is state
+
+
+def _socket(server, game_id, user_id=None):
+    auth = {'token': server.session_tokens.dumps(user_id)} if user_id else None
+    client = server.socketio.test_client(server.app, auth=auth)
+    client.emit('join_game', {'game_id': game_id, 'user_id': user_id})
+    client.get_received()
+    return client
+
+
+def _updates(client):
+    return [event['args'][0] for event in client.get_received() if event['name'] == 'game_updated']
+
+
+def test_rooms_receive_only_their_own_hand(server, new_game):
+    game_id = new_game("ELMAKTR")
+    mover, opponent, spectator = (_socket(server, game_id, 1), _socket(server, game_id, 2),
+                                  _socket(server, game_id))
+    tiles = [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]
+    response = server.app.test_client().post('/submit-move', json={'game_id': game_id, 'user_id': 1,
+                                                                   'placed_tiles': tiles})
+    assert response.status_code == 200, response.get_json()
+
+    [mine], [theirs], [shared] = _updates(mover), _updates(opponent), _updates(spectator)
+    assert mine['hand']['letters'] == response.get_json()['new_player_letters']
+    assert HAND_FIELDS.isdisjoint(theirs) and HAND_FIELDS.isdisjoint(shared)
+    assert mine['version'] == theirs['version'] == shared['version'] == shared['base_version'] + 1
+
+    for client, expected in ((spectator, set()), (opponent, {'user2_letters', 'user2_rewards'})):
+        client.emit('request_resync', {'game_id': game_id})
+        [state] = _updates(client)
+        assert state['type'] == UPDATE_FULL and HAND_FIELDS & set(state) == expected
+    for client in (mover, opponent, spectator):
+        client.disconnect()
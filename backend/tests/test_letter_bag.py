@@ -0,0 +1,49 @@
+# Dengeli el örnekleyicisi: her taş, dengeli düz çekilişlerdeki sıklığıyla gelmeli (joker dahil)
+import random
+from collections import Counter
+
+import game_data
+from letter_bag import RACK_SIZE, LetterBag, draw_balanced_rack, rack_balance
+
+RACKS = 30000
+
+
+def _reference_frequencies(rng):
+    """Düz listeden rastgele 7 taş, sadece dengeli olanlar: harf başına el başına ortalama adet."""
+    tiles = [letter for letter, data in game_data.remaining_letters.items() for _ in range(data['count'])]
+    totals, racks = Counter(), 0
+    while racks < RACKS:
+        rack = rng.sample(tiles, RACK_SIZE)
+        vowels, consonants = rack_balance(rack)
+        if vowels >= 2 and consonants >= 2:
+            totals.update(rack)
+            racks += 1
+    return {letter: totals[letter] / RACKS for letter in game_data.remaining_letters}
+
+
+def test_balanced_rack_keeps_tile_frequencies():
+    expected = _reference_frequencies(random.Random(1))
+    rng = random.Random(2)
+    totals = Counter()
+    for _ in range(RACKS):
+        rack = draw_balanced_rack(LetterBag.from_pool(game_data.remaining_letters, rng=rng))
+        vowels, consonants = rack_balance(rack)
+        assert len(rack) == RACK_SIZE and vowels >= 2 and consonants >= 2
+        totals.update(rack)
+    for letter, mean in expected.items():
+        assert abs(totals[letter] / RACKS - mean) < 0.03, (letter, totals[letter] / RACKS, mean)
+
+
+def test_rejected_tiles_go_back_to_the_bag():
+    bag = LetterBag.from_pool(game_data.remaining_letters, rng=random.Random(3))
+    before = bag.total
+    for _ in range(10):
+        draw_balanced_rack(bag)
+    assert bag.total == before - 10 * RACK_SIZE
+    assert all(count >= 0 for count in bag.counts)
+
+
+def test_unbalanced_bag_falls_back():
+    pool = {"K": {"count": 6, "score": 1}, "A": {"count": 1, "score": 1}, "Blank": {"count": 1, "score": 0}}
+    rack = draw_balanced_rack(LetterBag.from_pool(pool, rng=random.Random(4)))
+    assert len(rack) == RACK_SIZE and rack.count("A") == 1
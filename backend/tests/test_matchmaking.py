@@ -0,0 +1,61 @@
+# Matchmaker: bekleme ve oyun oluşturma sonucunun bildirilmesi
+import threading
+
+import matchmaking
+from matchmaking import Matchmaker, TicketStatus
+
+
+def _paired(matchmaker):
+    matchmaker.join(1, "FIVE_MIN", rating=1000)
+    ticket, opponent_ticket = matchmaker.join(2, "FIVE_MIN", rating=1000)
+    assert opponent_ticket is not None and ticket.status == TicketStatus.Pairing
+    return ticket, opponent_ticket
+
+
+def test_wait_outlasts_slow_game_creation(monkeypatch):
+    monkeypatch.setattr(matchmaking, 'PAIRING_GRACE_SECONDS', 0.05)
+    matchmaker = Matchmaker()
+    ticket, opponent_ticket = _paired(matchmaker)
+    # Oyun, bekleme süresi ve birkaç ek bekleme aralığı dolduktan sonra oluşturulur
+    timer = threading.Timer(0.3, matchmaker.complete, (ticket, opponent_ticket, 42))
+    timer.start()
+    try:
+        result = matchmaker.wait(ticket, 0.05)
+    finally:
+        timer.join()
+    assert result.status == TicketStatus.Matched
+    assert result.game_id == 42 and result.opponent_id == opponent_ticket.user_id
+
+
+def test_wait_reports_failed_game_creation(monkeypatch):
+    monkeypatch.setattr(matchmaking, 'PAIRING_GRACE_SECONDS', 0.05)
+    matchmaker = Matchmaker()
+    ticket, opponent_ticket = _paired(matchmaker)
+    timer = threading.Timer(0.2, matchmaker.fail, (ticket, opponent_ticket))
+    timer.start()
+    try:
+        assert matchmaker.wait(ticket, 0.05).status == TicketStatus.Failed
+    finally:
+        timer.join()
+
+
+def test_wait_times_out_while_queued():
+    matchmaker = Matchmaker()
+    ticket, _ = matchmaker.join(1, "FIVE_MIN", rating=1000)
+    assert matchmaker.wait(ticket, 0.05).status == TicketStatus.Timeout
+    assert matchmaker.store.stats()["queues"]["FIVE_MIN"] == 0
+
+
+def test_wait_gives_up_when_game_creation_never_reports(monkeypatch):
+    monkeypatch.setattr(matchmaking, 'PAIRING_GRACE_SECONDS', 0.05)
+    monkeypatch.setattr(matchmaking, 'PAIRING_TIMEOUT_SECONDS', 0.2)
+    matchmaker = Matchmaker()
+    ticket, opponent_ticket = _paired(matchmaker)  # Oyunu oluşturacak işlem complete/fail'den önce öldü
+
+    assert matchmaker.wait(ticket, 0.05).status == TicketStatus.Failed
+    assert matchmaker.pop_match(ticket.user_id) is None
+    again, _ = matchmaker.join(ticket.user_id, "FIVE_MIN", rating=1000)
+    assert again is not ticket and again.status == TicketStatus.Waiting
+
+    matchmaker.complete(ticket, opponent_ticket, 42)  # Geç gelen sonuç yeni aramayı etkilemez
+    assert again.status == TicketStatus.Waiting
@@ -0,0 +1,125 @@
+# RedisMatchmakingStore: Lua script'leri gerçek bir redis-server'da (redislite paketi veya TEST_REDIS_URL),
+# Python karşılıkları FakeRedis'te aynı senaryolarla çalıştırılır.
+import os
+import random
+
+import pytest
+
+from matchmaking import Ticket, rating_window, RATING_UNLIMITED_AFTER
+from matchmaking_store import RedisMatchmakingStore, FakeRedis, CANDIDATE_LIMIT
+
+MODE = "FIVE_MIN"
+
+
+def _real_redis():
+    url = os.environ.get('TEST_REDIS_URL')
+    if url:
+        redis = pytest.importorskip('redis')
+        client = redis.Redis.from_url(url)
+        client.flushdb()
+        return client
+    redislite = pytest.importorskip('redislite')
+    return redislite.Redis()
+
+
+@pytest.fixture(params=['fakeredis', 'redis'])
+def client(request):
+    if request.param == 'fakeredis':
+        return FakeRedis()
+    return _real_redis()
+
+
+def _ticket(user_id, rating, joined_at, excluded=()):
+    return Ticket(user_id, MODE, rating=rating, excluded=frozenset(excluded), joined_at=joined_at)
+
+
+def _ids(pair):
+    return tuple(sorted(ticket.user_id for ticket in pair))
+
+
+def test_pairs_nearest_rating_within_window(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    assert store.pair_or_enqueue(MODE, _ticket(1, 1000, 0.0), 0.0) is None
+    assert store.pair_or_enqueue(MODE, _ticket(2, 1150, 0.0), 0.0) is None  # Fark 150 > pencere 100
+    opponent = store.pair_or_enqueue(MODE, _ticket(3, 1090, 0.0), 0.0)
+    assert opponent.user_id == 2  # 1150 (fark 60), 1000'den (fark 90) yakın
+    assert store.stats()["queues"][MODE] == 1
+
+
+def test_exclusions_are_respected_both_ways(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    store.pair_or_enqueue(MODE, _ticket(1, 1000, 0.0, excluded={2}), 0.0)
+    assert store.pair_or_enqueue(MODE, _ticket(2, 1000, 0.0), 0.0) is None
+    assert store.pair_or_enqueue(MODE, _ticket(3, 1000, 0.0, excluded={1}), 0.0).user_id == 2
+
+
+def test_sweep_only_reconsiders_tickets_whose_window_reached_a_candidate(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    store.pair_or_enqueue(MODE, _ticket(1, 1000, 0.0), 0.0)
+    store.pair_or_enqueue(MODE, _ticket(2, 1400, 0.0), 0.0)  # Fark 400: pencere 100 + 50/sn -> 6. saniye
+    recheck_key = store._keys(MODE)[3]
+    assert [_ticket_id for _ticket_id, _ in client.zrange(recheck_key, 0, -1, withscores=True)]
+    assert store.sweep(MODE, 5.0) == []
+    assert client.zrangebyscore(recheck_key, '-inf', 5.0) == []  # 5. saniyede bakılacak ticket yok
+    assert [_ids(pair) for pair in store.sweep(MODE, 6.0)] == [(1, 2)]
+    assert client.zcard(recheck_key) == 0
+
+
+def test_unlimited_tickets_leave_recheck_set(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    store.pair_or_enqueue(MODE, _ticket(1, 1000, 0.0, excluded={2}), 0.0)
+    store.pair_or_enqueue(MODE, _ticket(2, 3000, 0.0), 0.0)
+    assert store.sweep(MODE, RATING_UNLIMITED_AFTER + 1) == []  # Dışlanmış: eşleşemez
+    assert client.zcard(store._keys(MODE)[3]) == 0  # Pencereler artık büyümüyor: sweep onlara bakmaz
+    # Yeni katılan, sınırsız pencereli bekleyenlerle eşleşir
+    assert store.pair_or_enqueue(MODE, _ticket(3, 100, 20.0), 20.0).user_id in (1, 2)
+
+
+def test_scan_is_bounded_when_nearest_candidates_are_excluded(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    blocked = set(range(1, CANDIDATE_LIMIT * 2 + 1))
+    for user_id in blocked:  # 999 ve 1001 puanlı, birbirleriyle eşleşmeyen oyuncular
+        store.pair_or_enqueue(MODE, _ticket(user_id, 1000 + (user_id % 2) * 2 - 1, 0.0, blocked | {100}), 0.0)
+    store.pair_or_enqueue(MODE, _ticket(100, 1090, 0.0), 0.0)
+    # En yakın 2 * CANDIDATE_LIMIT aday dışlanmış, 1090 okunmaz: eşleşme yok, sonraki sweep'te tekrar bakılır
+    assert store.pair_or_enqueue(MODE, _ticket(200, 1000, 0.0, excluded=blocked), 0.0) is None
+    recheck = dict((_member.decode() if isinstance(_member, bytes) else _member, score)
+                   for _member, score in client.zrange(store._keys(MODE)[3], 0, -1, withscores=True))
+    assert recheck["200"] == 0.0
+
+
+def test_remove_clears_ticket(client):
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    store.pair_or_enqueue(MODE, _ticket(1, 1000, 0.0), 0.0)
+    assert store.remove(MODE, 1)
+    assert not store.remove(MODE, 1)
+    assert client.zcard(store._keys(MODE)[3]) == 0
+    assert store.pair_or_enqueue(MODE, _ticket(2, 1000, 0.0), 0.0) is None
+
+
+def _simulate(client, seed):
+    rng = random.Random(seed)
+    store = RedisMatchmakingStore(client, modes=(MODE,))
+    pairs, now, next_sweep = [], 0.0, 1.0
+    for user_id in range(1, 401):
+        now += rng.expovariate(20.0)
+        while next_sweep <= now:
+            pairs += [(next_sweep, _ids(pair)) for pair in store.sweep(MODE, next_sweep)]
+            next_sweep += 1.0
+        excluded = set(rng.sample(range(1, user_id), min(user_id - 1, 2)))
+        ticket = _ticket(user_id, max(0, int(rng.gauss(1000, 300))), now, excluded)
+        opponent = store.pair_or_enqueue(MODE, ticket, now)
+        if opponent is not None:
+            assert abs(opponent.rating - ticket.rating) <= max(rating_window(now - ticket.joined_at),
+                                                               rating_window(now - opponent.joined_at))
+            assert opponent.user_id not in ticket.excluded and ticket.user_id not in opponent.excluded
+            pairs.append((now, _ids((ticket, opponent))))
+    for _ in range(int(RATING_UNLIMITED_AFTER) + 2):
+        pairs += [(next_sweep, _ids(pair)) for pair in store.sweep(MODE, next_sweep)]
+        next_sweep += 1.0
+    return pairs, store.stats()["queues"][MODE]
+
+
+def test_lua_script_matches_python_implementation():
+    real = _real_redis()
+    assert _simulate(real, seed=7) == _simulate(FakeRedis(), seed=7)
@@ -0,0 +1,34 @@
+# Hamle hattının bellek ayırma bütçesi (benchmark.py move-alloc ile aynı ölçüm)
+import statistics
+import tracemalloc
+
+MOVE_BUDGET_KB = 24.0  # Hamle başına medyan geçici bellek tepe noktası sınırı (benchmark.py --budget-kb)
+MOVES = 40
+
+
+def _submit(server, game_id):
+    payload = {'game_id': game_id, 'user_id': 1,
+               'placed_tiles': [{'row': 7, 'col': 7 + i, 'letter': letter} for i, letter in enumerate("ELMA")]}
+    with server.app.test_request_context('/submit-move', method='POST', json=payload):
+        server.request.get_json()  # Gövde okuma tamponu (werkzeug) ölçüme girmesin
+        request_base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _, status = server.submit_move_secure()
+        return status, tracemalloc.get_traced_memory()[1] - request_base
+
+
+def test_move_allocation_budget(server, new_game):
+    # Her oyunda aynı el ve tuzaksız tahta: her hamle aynı işi yapar
+    game_ids = [new_game("ELMAKTR") for _ in range(MOVES + 1)]
+    tracemalloc.start()
+    try:
+        assert _submit(server, game_ids[0])[0] == 200  # Isınma (sözlük, lazy import'lar)
+        peaks = []
+        for game_id in game_ids[1:]:
+            status, peak = _submit(server, game_id)
+            assert status == 200, f"oyun {game_id}"
+            peaks.append(peak)
+    finally:
+        tracemalloc.stop()
+    median_kb = statistics.median(peaks) / 1024
+    assert median_kb <= MOVE_BUDGET_KB, f"hamle başına {median_kb:.1f} KB (bütçe {MOVE_BUDGET_KB} KB)"
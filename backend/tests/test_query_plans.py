@@ -0,0 +1,58 @@
+# Sık çalışan isteklerin sorgu planları: hiçbiri tablo taraması yapmamalı (benchmark.py explain ile aynı kontrol)
+from datetime import datetime
+
+import pytest
+
+from models import db
+from query_plans import explain_request
+
+REQUESTS = {
+    "login": lambda client: client.post('/login', json={'username': 'test1', 'password': '-'}),
+    "register (kullanıcı adı)": lambda client: client.post('/register', json={
+        'username': 'test1', 'email': 'x', 'password': '-'}),
+    "register (e-posta)": lambda client: client.post('/register', json={
+        'username': 'test1-yeni', 'email': 'test1@example.com', 'password': '-'}),
+    "active-games": lambda client: client.get('/active-games/1'),
+    "users (toplu)": lambda client: client.get('/users', query_string={'ids': '1,2'}),
+    "completed-games": lambda client: client.get('/completed-games/1'),
+    "completed-games (imleç)": lambda client: client.get('/completed-games/1', query_string={
+        'cursor': f"{datetime(2100, 1, 1).isoformat()}_1"}),
+}
+
+
+@pytest.fixture
+def plans(server, new_game):
+    """İsteği çalıştırıp yakalanan SELECT'lerin planlarını döndüren fonksiyon."""
+    finished = new_game()
+    new_game()
+    client = server.app.test_client()
+    assert client.post(f"/leave-game/{finished}", json={'userId': 2}).status_code == 200
+    with server.app.app_context():
+        server.game_store.flush()
+
+    def explain(run):
+        with server.app.app_context():
+            return explain_request(db.engine, db.metadata.tables, lambda: run(client))
+
+    return explain
+
+
+@pytest.mark.parametrize('name', REQUESTS)
+def test_request_uses_indexes(plans, name):
+    for statement, plan, scans in plans(REQUESTS[name]):
+        assert not scans, f"{name}: {' '.join(statement.split())} -> {plan}"
+
+
+def test_fresh_registration_uses_indexes(server, plans):
+    responses = []
+    checked = plans(lambda client: responses.append(client.post('/register', json={
+        'username': 'explain-yeni', 'email': 'explain-yeni@example.com', 'password': 'gizli'})))
+    assert responses[0].status_code == 201, responses[0].get_json()
+    assert len(checked) == 2  # Kullanıcı adı ve e-posta kontrolü; ardından INSERT
+    for statement, plan, scans in checked:
+        assert not scans, f"{' '.join(statement.split())} -> {plan}"
+
+
+def test_find_opponent_checks_use_indexes(server, plans):
+    checked = plans(lambda client: (server.get_active_opponents(1), server.get_user_rating(1)))
+    assert checked and not any(scans for _, _, scans in checked)
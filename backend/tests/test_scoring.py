@@ -0,0 +1,104 @@
+# Skor motoru: çarpan dizileriyle hesaplanan puan, ödül tahtasına "A1" anahtarlarıyla bakan eski hesapla aynı olmalı
+import random
+
+import game_data
+from board import premium_arrays
+from scoring import BINGO_BONUS, score_words
+
+LETTER_SCORES = game_data.LETTER_SCORES
+REWARD_BOARD = game_data.reward_punishment_board
+_BONUSES = {'DL': (2, 1), 'TL': (3, 1), 'DW': (1, 2), 'TW': (1, 3), '★': (1, 2)}
+
+
+def reference_score(valid_words, placed_tiles, reward_board, letter_scores, block_bonuses):
+    """Çarpan dizilerinden önceki hesap (calculate_score_server_side), loglar çıkarılmış hali."""
+    placed = {f"{tile['row']}_{tile['col']}": tile for tile in placed_tiles}
+    total_score = 0
+    for word_info in valid_words:
+        word_score, word_multiplier = 0, 1
+        path, word = word_info['path'], word_info['word']
+        for pos in path:
+            row, col = pos['row'], pos['col']
+            tile = placed.get(f"{row}_{col}")
+            letter = tile['letter'].upper() if tile else word[path.index(pos)].upper()
+            letter_score = 0 if tile and tile.get('is_blank', False) else letter_scores.get(letter, 0)
+            letter_multiplier = 1
+            a1 = f"{chr(ord('A') + col)}{row + 1}"
+            if not block_bonuses and tile and a1 in reward_board:
+                letter_multiplier, bonus = _BONUSES[reward_board[a1]]
+                word_multiplier *= bonus
+            word_score += letter_score * letter_multiplier
+        total_score += word_score * word_multiplier
+    if len(placed_tiles) == 7:
+        total_score += 50
+    return max(0, total_score)
+
+
+def _word(word, row, col, dr=0, dc=1):
+    return {'word': word, 'path': [{'row': row + dr * i, 'col': col + dc * i} for i in range(len(word))]}
+
+
+def _tiles(word_info, placed=None, blanks=()):
+    """Kelimenin placed (varsayılan: hepsi) indeksli harflerini bu tur konan taşlar olarak döndürür."""
+    indexes = range(len(word_info['word'])) if placed is None else placed
+    return [{**word_info['path'][i], 'letter': word_info['word'][i], 'is_blank': i in blanks} for i in indexes]
+
+
+def _both(words, tiles, block_bonuses=False):
+    score = score_words(words, tiles, LETTER_SCORES, block_bonuses)
+    assert score == reference_score(words, tiles, REWARD_BOARD, LETTER_SCORES, block_bonuses)
+    return score
+
+
+def test_centre_star_doubles_the_word():
+    elma = _word("ELMA", 7, 7)  # H8 (★) üzerinden
+    assert _both([elma], _tiles(elma)) == (1 + 1 + 2 + 1) * 2
+
+
+def test_premiums_only_count_under_new_tiles():
+    word = _word("ELMA", 0, 0)  # A1 (TW) ve D1 (DL)
+    assert _both([word], _tiles(word)) == (1 + 1 + 2 + 1 * 2) * 3
+    assert _both([word], _tiles(word, placed=[1, 2])) == 1 + 1 + 2 + 1  # A1 ve D1'de eski taşlar var
+
+
+def test_blank_scores_zero_even_on_a_premium():
+    word = _word("KAL", 3, 0)  # D1 (DL) üzerindeki K joker
+    assert _both([word], _tiles(word, blanks={0})) == 0 + 1 + 1
+
+
+def test_bonus_blocker_cancels_premium_squares():
+    elma = _word("ELMA", 7, 7)
+    assert _both([elma], _tiles(elma), block_bonuses=True) == 1 + 1 + 2 + 1
+
+
+def test_bingo_adds_fifty():
+    word = _word("KETMALR", 7, 4)
+    assert _both([word], _tiles(word)) == (1 + 1 + 1 + 2 + 1 + 1 + 1) * 2 + BINGO_BONUS  # H8 (★)
+    assert _both([word], _tiles(word)[:6]) == (1 + 1 + 1 + 2 + 1 + 1 + 1) * 2  # 6 taş: bingo yok
+
+
+def test_custom_layout_arrays_match_the_reward_board():
+    board = {"A1": "DL", "B1": "TW", "H8": "★"}
+    letters, words = premium_arrays(board)
+    word = _word("ELMA", 0, 0)
+    score = score_words([word], _tiles(word), LETTER_SCORES, False, letters, words)
+    assert score == reference_score([word], _tiles(word), board, LETTER_SCORES, False) == (1 * 2 + 1 + 2 + 1) * 3
+
+
+def test_random_moves_match_the_reward_board_path():
+    rng = random.Random(11)
+    letters = [letter for letter in LETTER_SCORES if letter != '*']
+    for _ in range(2000):
+        words, tiles = [], {}
+        for _ in range(rng.randint(1, 3)):
+            length = rng.randint(2, 8)
+            dr, dc = rng.choice(((0, 1), (1, 0)))
+            word = _word("".join(rng.choice(letters) for _ in range(length)),
+                         rng.randrange(game_data.BOARD_SIZE - dr * (length - 1)),
+                         rng.randrange(game_data.BOARD_SIZE - dc * (length - 1)), dr, dc)
+            words.append(word)
+            new = [i for i in range(length) if rng.random() < 0.6]
+            blanks = {i for i in new if rng.random() < 0.1}
+            for tile in _tiles(word, new, blanks):
+                tiles.setdefault((tile['row'], tile['col']), tile)
+        _both(words, list(tiles.values())[:7], block_bonuses=rng.random() < 0.1)
@@ -0,0 +1,48 @@
+# LoopbackManager: iki ayrı Socket.IO sunucusu (iki worker gibi) aynı kuyruğa bağlanır. Flask-SocketIO test_client
+# kuyrukla çalışmadığından istemci, Engine.IO long-polling isteklerini uygulamanın WSGI katmanına doğrudan gönderir.
+import json
+
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+
+from socketio_queue import LoopbackManager
+
+
+def _worker(channel):
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading', client_manager=LoopbackManager(channel=channel))
+
+    @socketio.on('join_game')
+    def handle_join_game(room):
+        join_room(room)
+        return room
+
+    return app, socketio
+
+
+class PollingClient:
+    """Engine.IO v4 polling istemcisi: her GET, sunucuda bekleyen paketleri (yoksa gelene kadar bekleyip) döndürür."""
+
+    def __init__(self, app):
+        self.http = app.test_client()
+        handshake = self.http.get('/socket.io/?EIO=4&transport=polling').get_data(as_text=True)
+        self.url = f"/socket.io/?EIO=4&transport=polling&sid={json.loads(handshake[1:])['sid']}"
+        self.send('40')  # Varsayılan namespace'e bağlan
+        assert self.receive().startswith('40')
+
+    def send(self, packet):
+        assert self.http.post(self.url, data=packet).get_data(as_text=True) == 'OK'
+
+    def receive(self):
+        return self.http.get(self.url).get_data(as_text=True)
+
+
+def test_emit_reaches_a_client_on_the_other_server():
+    sender_app, sender = _worker('test-loopback')
+    receiver_app, _ = _worker('test-loopback')
+    client = PollingClient(receiver_app)
+    client.send('421["join_game","7:1"]')
+    assert client.receive() == '431["7:1"]'
+
+    sender.emit('game_updated', {"version": 3}, to='7:1')  # Göndericide bu odada istemci yok
+    assert client.receive() == '42["game_updated",{"version":3}]'
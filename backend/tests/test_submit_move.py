@@ -0,0 +1,22 @@
+# /submit-move uç noktası
+
+
+def _submit(server, game_id, word, row=7, col=7):
+    client = server.app.test_client()
+    tiles = [{'row': row, 'col': col + i, 'letter': letter} for i, letter in enumerate(word)]
+    return client.post('/submit-move', json={'game_id': game_id, 'user_id': 1, 'placed_tiles': tiles})
+
+
+def test_lowercase_letters_are_stored_upper_case(server, new_game):
+    game_id = new_game("ELMAKTR")
+    response = _submit(server, game_id, "elma")
+    assert response.status_code == 200, response.get_json()
+    board = response.get_json()['game_board']
+    assert [board[f"7_{7 + i}"] for i in range(4)] == list("ELMA")
+
+
+def test_missing_layout_falls_back_to_default(server, new_game):
+    game_id = new_game("ELMAKTR", board_layout_id=999999)
+    response = _submit(server, game_id, "ELMA")
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['new_score1'] > 0
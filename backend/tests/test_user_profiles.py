@@ -0,0 +1,22 @@
+# /users profil önbelleği: oyun bitince oyuncuların profilleri yeniden yüklenmeli
+from models import db, User
+
+
+def _points(client, *user_ids):
+    users = client.get(f"/users?ids={','.join(map(str, user_ids))}").get_json()['users']
+    return [users[str(user_id)]['total_points'] for user_id in user_ids]
+
+
+def test_game_end_refreshes_cached_profiles(server, new_game):
+    client = server.app.test_client()
+    game_id = new_game()
+    before = _points(client, 1, 2)  # Önbelleğe alınır
+
+    with server.app.app_context():
+        db.session.get(User, 2).total_points = before[1] + 50  # Oyun sonu puan ödülü
+        db.session.commit()
+    assert _points(client, 1, 2) == before  # Önbellekten (ttl dolmadı)
+
+    response = client.post(f"/leave-game/{game_id}", json={'userId': 1})
+    assert response.status_code == 200, response.get_json()
+    assert _points(client, 1, 2) == [before[0], before[1] + 50]
@@ -0,0 +1,64 @@
+# Kelime doğrulama: yerleştirme kuralları; tahtadaki harflerin büyük/küçük yazımı sonucu değiştirmemeli
+from dictionary import DawgDictionary, get_dictionary
+from word_validator import ValidationStatus, check_word_placement
+
+
+def test_lowercase_board_cells_are_normalized():
+    dictionary = get_dictionary()
+    placed = [{'row': 7, 'col': 9, 'letter': 'L'}]
+    upper = check_word_placement(placed, {'7_7': 'K', '7_8': 'İ'}, dictionary)
+    lower = check_word_placement(placed, {'7_7': 'k', '7_8': 'i'}, dictionary)
+    assert upper.status == lower.status == 'Ok'
+
+
+# Küçük sözlükle yerleştirme kuralları (tahta: ELMA, 7. satır 7-10. sütunlar)
+SMALL_DICTIONARY = DawgDictionary.from_words(["ELMA", "AL", "AT", "EL", "KAL"])
+ELMA_BOARD = {'7_7': 'E', '7_8': 'L', '7_9': 'M', '7_10': 'A'}
+
+
+def _tiles(*cells):
+    return [{'row': row, 'col': col, 'letter': letter} for row, col, letter in cells]
+
+
+def _check(board, *cells):
+    return check_word_placement(_tiles(*cells), board, SMALL_DICTIONARY)
+
+
+def test_first_move_must_cover_the_centre():
+    assert _check({}, (7, 7, 'A'), (7, 8, 'L')).status == ValidationStatus.Ok
+    assert _check({}, (3, 3, 'A'), (3, 4, 'L')).status == ValidationStatus.InvalidPlacement
+
+
+def test_tiles_must_share_one_axis():
+    result = _check({}, (7, 7, 'A'), (7, 8, 'L'), (8, 7, 'T'))
+    assert result.status == ValidationStatus.InvalidAxis
+
+
+def test_gaps_between_tiles_are_rejected():
+    result = _check({}, (7, 7, 'A'), (7, 9, 'L'))
+    assert result.status == ValidationStatus.InvalidPlacement and "boşluk" in result.message
+    # Aradaki boşluk tahtadaki harfle doluysa geçerli
+    assert _check({'7_8': 'A'}, (7, 7, 'K'), (7, 9, 'L')).status == ValidationStatus.Ok
+
+
+def test_placement_must_touch_existing_tiles():
+    result = _check(ELMA_BOARD, (0, 0, 'A'), (0, 1, 'L'))
+    assert result.status == ValidationStatus.InvalidPlacement and "bağlanmalı" in result.message
+
+
+def test_invalid_cross_word_rejects_the_move():
+    # Yatay AL geçerli, ama E'nin altındaki A dikey "EA" kelimesini oluşturur
+    result = _check(ELMA_BOARD, (8, 7, 'A'), (8, 8, 'L'))
+    assert result.status == ValidationStatus.InvalidWord and result.invalidWord == "EA"
+
+
+def test_diagonal_word_through_an_existing_tile():
+    result = _check({'7_7': 'E'}, (8, 8, 'L'), (9, 9, 'M'), (10, 10, 'A'))
+    assert result.status == ValidationStatus.Ok
+    assert [(word['word'], word['path'][0], word['path'][-1]) for word in result.validWords] == \
+        [("ELMA", {'row': 7, 'col': 7}, {'row': 10, 'col': 10})]
+
+
+def test_unknown_word_is_reported():
+    result = _check({}, (7, 7, 'A'), (7, 8, 'L'), (7, 9, 'M'), (7, 10, 'A'))
+    assert result.status == ValidationStatus.InvalidWord and result.invalidWord == "ALMA"
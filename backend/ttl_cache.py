@@ -0,0 +1,91 @@
+# Süreli Bellek Önbelleği
+# Sık okunan, nadiren değişen sorgu sonuçları için işlem içi (worker başına) önbellek. Kayıtlar ttl saniye sonra
+# geçersiz olur; max_entries aşılınca en uzun süredir kullanılmayan kayıt atılır (LRU). Veri değiştiğinde ilgili
+# anahtarlar invalidate() ile silinir. Diğer worker'lardaki kopyalar silinmez, onlar için sınır ttl'dir.
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Anahtar -> değer önbelleği; süre (ttl) ve boyut (max_entries, LRU) sınırlı."""
+
+    def __init__(self, ttl, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # anahtar -> (son geçerlilik zamanı, değer)
+        self._lock = threading.Lock()
+        self._generation = 0  # Her invalidate'te artar; yükleme sırasında silinen veri önbelleğe yazılmaz
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader):
+        """Önbellekteki değeri, yoksa loader() sonucunu döndürür (ve önbelleğe yazar)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        value = loader()  # Kilit dışında: yavaş sorgu diğer anahtarları bekletmez
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value)
+        return value
+
+    def get_many_or_load(self, keys, loader):
+        """
+        Birden fazla anahtar için get_or_load: önbellekte olmayanlar tek loader(eksik_anahtarlar) çağrısıyla
+        yüklenir (loader anahtar -> değer sözlüğü döndürür). Loader'ın döndürmediği anahtarlar sonuçta yer almaz
+        ve önbelleğe yazılmaz.
+        """
+        found, missing = {}, []
+        with self._lock:
+            now = self.clock()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    missing.append(key)
+            self.hits += len(found)
+            self.misses += len(missing)
+            generation = self._generation
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                if generation == self._generation:
+                    for key, value in loaded.items():
+                        self._store(key, value)
+            found.update(loaded)
+        return found
+
+    def _store(self, key, value):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"size": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                    "hit_rate": round(self.hits / requests, 4) if requests else None}
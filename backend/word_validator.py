@@ -0,0 +1,182 @@
+# Sunucu Tarafı Hamle (Kelime ve Yerleştirme) Doğrulaması
+# İstemcideki word-checker.tsx ile aynı kuralları uygular: eksen, bitişiklik, merkez, çapraz kelimeler ve sözlük.
+import logging
+
+import game_data
+from board import Board
+from dictionary import turkish_upper, TURKISH_ALPHABET
+
+logger = logging.getLogger(__name__)
+
+BOARD_SIZE = game_data.BOARD_SIZE
+CENTER_ROW = 7
+CENTER_COL = 7
+MIN_WORD_LENGTH = 2
+
+AXIS_SINGLE = 'single'
+AXIS_HORIZONTAL = 'horizontal'
+AXIS_VERTICAL = 'vertical'
+AXIS_DIAGONAL = 'diagonal_tlbr'
+
+_AXIS_STEPS = {
+    AXIS_HORIZONTAL: (0, 1),
+    AXIS_VERTICAL: (1, 0),
+    AXIS_DIAGONAL: (1, 1),
+}
+_ORTHOGONAL_NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_DIAGONAL_NEIGHBORS = ((-1, -1), (1, 1), (-1, 1), (1, -1))
+
+
+class ValidationStatus:
+    Ok = 'Ok'
+    InvalidWord = 'InvalidWord'
+    InvalidPlacement = 'InvalidPlacement'
+    InvalidAxis = 'InvalidAxis'
+    NoTilesPlaced = 'NoTilesPlaced'
+
+
+class PlacementValidationResult:
+    def __init__(self, status, message, validWords=None, invalidWord=None):
+        self.status = status
+        self.message = message
+        self.validWords = validWords
+        self.invalidWord = invalidWord
+
+
+class FoundWord(dict):
+    """{'word': 'ELMA', 'path': [{'row': 7, 'col': 7}, ...]} şeklinde bulunan kelime."""
+    pass
+
+
+def _word_through(grid, row, col, dr, dc):
+    """(row, col) hücresinden geçen ve (dr, dc) ekseninde uzanan kelimeyi bulur."""
+    r, c = row, col
+    while 0 <= r - dr < BOARD_SIZE and 0 <= c - dc < BOARD_SIZE and grid[(r - dr) * BOARD_SIZE + c - dc]:
+        r -= dr
+        c -= dc
+
+    letters = []
+    path = []
+    while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+        letter = grid[r * BOARD_SIZE + c]
+        if not letter:
+            break
+        letters.append(letter)
+        path.append((r, c))
+        r += dr
+        c += dc
+
+    if len(letters) < MIN_WORD_LENGTH:
+        return None
+    return "".join(letters), tuple(path)
+
+
+def check_word_placement(placed_tiles, committed_board, dictionary):
+    """
+    Bu turda yerleştirilen taşları, tahtanın önceki durumuna (Board veya "row_col" sözlüğü) göre doğrular.
+    Geçerliyse oluşan tüm kelimeleri (ana kelime + çapraz kelimeler) yollarıyla birlikte döndürür.
+    """
+    # 1. Temel Kontrol
+    if not placed_tiles:
+        return PlacementValidationResult(ValidationStatus.NoTilesPlaced, "Hiç harf yerleştirilmedi.")
+
+    cells = committed_board.cells if isinstance(committed_board, Board) else Board.from_dict(committed_board).cells
+    # Yeni liste (geçici taşlar yazılacak, çağıranın tahtası değişmesin); eski kayıtlarda küçük harf olabilir
+    grid = [turkish_upper(cell) if cell else cell for cell in cells]
+    is_board_empty = not any(grid)
+
+    # 2. Taşları Ayrıştır (sınır, dolu kare, tekrar ve harf kontrolü)
+    tiles = []
+    seen = set()
+    for tile in placed_tiles:
+        try:
+            row, col = int(tile['row']), int(tile['col'])
+            letter = turkish_upper(str(tile['letter']))
+        except (KeyError, TypeError, ValueError):
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement, "Geçersiz taş verisi.")
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement, "Taş tahtanın dışında.")
+        if letter not in TURKISH_ALPHABET:
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement, f"Geçersiz harf: {letter}")
+        if (row, col) in seen or grid[row * BOARD_SIZE + col]:
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement, "Dolu bir kareye harf konulamaz.")
+        seen.add((row, col))
+        tiles.append((row, col, letter))
+
+    # 3. Eksen Kontrolü (Yatay, Dikey veya Sol Üstten Sağ Alta Çapraz)
+    tiles.sort()
+    first_row, first_col, _ = tiles[0]
+    if len(tiles) == 1:
+        axis = AXIS_SINGLE
+    elif all(r == first_row for r, _, _ in tiles):
+        axis = AXIS_HORIZONTAL
+    elif all(c == first_col for _, c, _ in tiles):
+        axis = AXIS_VERTICAL
+    elif all(r - c == first_row - first_col for r, c, _ in tiles):
+        axis = AXIS_DIAGONAL
+    else:
+        return PlacementValidationResult(
+            ValidationStatus.InvalidAxis,
+            "Harfler tek bir sıra (yatay, dikey veya sol üstten sağ alta çapraz) üzerinde olmalı.")
+
+    # 4. Geçici Tam Tahta
+    for row, col, letter in tiles:
+        grid[row * BOARD_SIZE + col] = letter
+
+    # 5. Boşluk Kontrolü (ilk ve son taş arası tamamen dolu olmalı)
+    if axis != AXIS_SINGLE:
+        dr, dc = _AXIS_STEPS[axis]
+        last_row, last_col, _ = tiles[-1]
+        r, c = first_row, first_col
+        while (r, c) != (last_row, last_col):
+            r += dr
+            c += dc
+            if not grid[r * BOARD_SIZE + c]:
+                return PlacementValidationResult(ValidationStatus.InvalidPlacement,
+                                                 "Harfler arasında boşluk bırakılamaz.")
+
+    # 6. Yerleştirme Kuralları (Merkez / Bağlantı)
+    if is_board_empty:
+        if (CENTER_ROW, CENTER_COL) not in seen:
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement,
+                                             "İlk hamle merkez (★) karesini kullanmalı.")
+    else:
+        neighbors = _ORTHOGONAL_NEIGHBORS + _DIAGONAL_NEIGHBORS if axis == AXIS_DIAGONAL else _ORTHOGONAL_NEIGHBORS
+        is_connected = False
+        for row, col, _ in tiles:
+            for nr, nc in neighbors:
+                r, c = row + nr, col + nc
+                if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and (r, c) not in seen and grid[r * BOARD_SIZE + c]:
+                    is_connected = True
+                    break
+            if is_connected:
+                break
+        if not is_connected:
+            return PlacementValidationResult(ValidationStatus.InvalidPlacement,
+                                             "Yeni harfler mevcut harflere bağlanmalı.")
+
+    # 7. Kelime Bulma (ana eksen + her taş için yatay ve dikey kelimeler)
+    found = {}  # path -> kelime (aynı yol iki kez eklenmesin)
+    if axis == AXIS_DIAGONAL:
+        word_info = _word_through(grid, first_row, first_col, 1, 1)
+        if word_info:
+            found[word_info[1]] = word_info[0]
+    for row, col, _ in tiles:
+        for dr, dc in ((0, 1), (1, 0)):
+            word_info = _word_through(grid, row, col, dr, dc)
+            if word_info:
+                found[word_info[1]] = word_info[0]
+
+    if not found:
+        return PlacementValidationResult(ValidationStatus.InvalidPlacement,
+                                         "Geçerli bir kelime (min 2 harf) oluşturulamadı.")
+
+    # 8. Sözlük Kontrolü
+    valid_words = []
+    for path, word in found.items():
+        if not dictionary.contains(word):
+            return PlacementValidationResult(ValidationStatus.InvalidWord, f'"{word}" geçerli bir kelime değil.',
+                                             invalidWord=word)
+        valid_words.append(FoundWord(word=word, path=[{'row': r, 'col': c} for r, c in path]))
+
+    return PlacementValidationResult(ValidationStatus.Ok, "Geçerli hamle.", validWords=valid_words)
@@ -6,6 +6,9 @@
 -- Üretim Zamanı: 22 Nis 2025, 23:58:41
 -- Sunucu sürümü: 10.4.32-MariaDB
 -- PHP Sürümü: 8.2.12
+--
+-- Şema models.py ile eşittir (migrations.py'deki tüm geçişler uygulanmış halde).
+-- Mevcut bir veritabanını güncellemek için: python migrations.py upgrade
 
 SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";
 START TRANSACTION;
@@ -23,24 +26,104 @@ SET time_zone = "+00:00";
 
 -- --------------------------------------------------------
 
+--
+-- Tablo için tablo yapısı `board_layout`
+--
+
+CREATE TABLE `board_layout` (
+  `id` int(11) NOT NULL,
+  `name` varchar(40) NOT NULL,
+  `version` int(11) NOT NULL,
+  `cells` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`cells`)),
+  `created_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Tablo için tablo yapısı `game`
 --
 
 CREATE TABLE `game` (
-  `id` int(255) NOT NULL,
-  `user1` int(255) NOT NULL,
-  `user2` int(255) NOT NULL,
-  `reward_punishment_board` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`reward_punishment_board`)),
+  `id` int(11) NOT NULL,
+  `user1` int(11) NOT NULL,
+  `user2` int(11) NOT NULL,
+  `board_layout_id` int(11) NOT NULL,
   `game_board` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`game_board`)),
-  `score1` int(255) NOT NULL,
-  `turn_order` int(255) NOT NULL,
+  `score1` int(11) DEFAULT NULL,
+  `score2` int(11) DEFAULT NULL,
+  `turn_order` int(11) DEFAULT NULL,
   `remaining_letters` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`remaining_letters`)),
-  `gamemode` varchar(255) NOT NULL,
-  `created_at` datetime NOT NULL,
-  `score0` int(255) NOT NULL
+  `gamemode` enum('TWO_MIN','FIVE_MIN','TWELVE_HOUR','TWENTYFOUR_HOUR') NOT NULL,
+  `created_at` datetime DEFAULT NULL,
+  `status` varchar(20) DEFAULT NULL,
+  `remaining_time` datetime NOT NULL,
+  `user1_letters` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`user1_letters`)),
+  `user2_letters` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`user2_letters`)),
+  `user1_rewards` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`user1_rewards`)),
+  `user2_rewards` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`user2_rewards`)),
+  `hidden_board` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`hidden_board`)),
+  `winner` int(11) DEFAULT NULL,
+  `user1_pass` int(11) NOT NULL,
+  `user2_pass` int(11) NOT NULL,
+  `state_version` int(11) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Tablo için tablo yapısı `game_snapshot`
+--
+
+CREATE TABLE `game_snapshot` (
+  `id` int(11) NOT NULL,
+  `game_id` int(11) NOT NULL,
+  `seq` int(11) NOT NULL,
+  `state` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`state`)),
+  `created_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Tablo için tablo yapısı `move`
+--
+
+CREATE TABLE `move` (
+  `id` int(11) NOT NULL,
+  `game_id` int(11) NOT NULL,
+  `seq` int(11) NOT NULL,
+  `player_id` int(11) DEFAULT NULL,
+  `kind` varchar(20) NOT NULL,
+  `tiles` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`tiles`)),
+  `score1_delta` int(11) NOT NULL,
+  `score2_delta` int(11) NOT NULL,
+  `triggered` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`triggered`)),
+  `changes` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`changes`)),
+  `created_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Tablo için tablo yapısı `schema_migrations`
+--
+
+CREATE TABLE `schema_migrations` (
+  `version` int(11) NOT NULL,
+  `name` varchar(100) NOT NULL,
+  `applied_at` datetime NOT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
+--
+-- Tablo döküm verisi `schema_migrations`
+--
+
+INSERT INTO `schema_migrations` (`version`, `name`, `applied_at`) VALUES
+(1, 'sync_game_schema', '2025-04-22 23:58:41'),
+(2, 'hot_query_indexes', '2025-04-22 23:58:41'),
+(3, 'user_password_and_points', '2025-04-22 23:58:41');
+
 -- --------------------------------------------------------
 
 --
@@ -48,46 +131,96 @@ CREATE TABLE `game` (
 --
 
 CREATE TABLE `user` (
-  `id` int(255) NOT NULL,
-  `username` varchar(255) DEFAULT NULL,
-  `email` varchar(255) DEFAULT NULL,
-  `password` varchar(255) DEFAULT NULL,
-  `total_points` int(255) DEFAULT NULL
+  `id` int(11) NOT NULL,
+  `username` varchar(80) NOT NULL,
+  `email` varchar(120) NOT NULL,
+  `password` varchar(255) NOT NULL,
+  `total_points` int(11) NOT NULL DEFAULT 0
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
 -- Dökümü yapılmış tablolar için indeksler
 --
 
+--
+-- Tablo için indeksler `board_layout`
+--
+ALTER TABLE `board_layout`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_board_layout_name_version` (`name`,`version`);
+
 --
 -- Tablo için indeksler `game`
 --
 ALTER TABLE `game`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `user1` (`user1`),
-  ADD KEY `user2` (`user2`);
+  ADD KEY `ix_game_user1_status_created` (`user1`,`status`,`created_at`),
+  ADD KEY `ix_game_user2_status_created` (`user2`,`status`,`created_at`),
+  ADD KEY `board_layout_id` (`board_layout_id`),
+  ADD KEY `winner` (`winner`);
+
+--
+-- Tablo için indeksler `game_snapshot`
+--
+ALTER TABLE `game_snapshot`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_game_snapshot_game_seq` (`game_id`,`seq`);
+
+--
+-- Tablo için indeksler `move`
+--
+ALTER TABLE `move`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_move_game_seq` (`game_id`,`seq`),
+  ADD KEY `player_id` (`player_id`);
+
+--
+-- Tablo için indeksler `schema_migrations`
+--
+ALTER TABLE `schema_migrations`
+  ADD PRIMARY KEY (`version`);
 
 --
 -- Tablo için indeksler `user`
 --
 ALTER TABLE `user`
-  ADD PRIMARY KEY (`id`);
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_user_username` (`username`),
+  ADD UNIQUE KEY `uq_user_email` (`email`);
 
 --
 -- Dökümü yapılmış tablolar için AUTO_INCREMENT değeri
 --
 
+--
+-- Tablo için AUTO_INCREMENT değeri `board_layout`
+--
+ALTER TABLE `board_layout`
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
+
 --
 -- Tablo için AUTO_INCREMENT değeri `game`
 --
 ALTER TABLE `game`
-  MODIFY `id` int(255) NOT NULL AUTO_INCREMENT;
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
+
+--
+-- Tablo için AUTO_INCREMENT değeri `game_snapshot`
+--
+ALTER TABLE `game_snapshot`
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
+
+--
+-- Tablo için AUTO_INCREMENT değeri `move`
+--
+ALTER TABLE `move`
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
 
 --
 -- Tablo için AUTO_INCREMENT değeri `user`
 --
 ALTER TABLE `user`
-  MODIFY `id` int(255) NOT NULL AUTO_INCREMENT;
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
 
 --
 -- Dökümü yapılmış tablolar için kısıtlamalar
@@ -98,7 +231,22 @@ ALTER TABLE `user`
 --
 ALTER TABLE `game`
   ADD CONSTRAINT `user1` FOREIGN KEY (`user1`) REFERENCES `user` (`id`) ON DELETE CASCADE,
-  ADD CONSTRAINT `user2` FOREIGN KEY (`user2`) REFERENCES `user` (`id`) ON DELETE CASCADE;
+  ADD CONSTRAINT `user2` FOREIGN KEY (`user2`) REFERENCES `user` (`id`) ON DELETE CASCADE,
+  ADD CONSTRAINT `fk_game_board_layout` FOREIGN KEY (`board_layout_id`) REFERENCES `board_layout` (`id`),
+  ADD CONSTRAINT `fk_game_winner` FOREIGN KEY (`winner`) REFERENCES `user` (`id`);
+
+--
+-- Tablo kısıtlamaları `game_snapshot`
+--
+ALTER TABLE `game_snapshot`
+  ADD CONSTRAINT `fk_game_snapshot_game` FOREIGN KEY (`game_id`) REFERENCES `game` (`id`) ON DELETE CASCADE;
+
+--
+-- Tablo kısıtlamaları `move`
+--
+ALTER TABLE `move`
+  ADD CONSTRAINT `fk_move_game` FOREIGN KEY (`game_id`) REFERENCES `game` (`id`) ON DELETE CASCADE,
+  ADD CONSTRAINT `fk_move_player` FOREIGN KEY (`player_id`) REFERENCES `user` (`id`);
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
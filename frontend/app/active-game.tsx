@@ -23,25 +23,16 @@ const ActiveGameScreen = () => {
 
   const fetchActiveGames = async (userId: string | string[]) => {
     try {
-      const response = await axios.get(`${BASE_URL}/active-games/${userId}`, {
-        responseType: 'text', // Düz metin olarak yanıt al
-      });
-  
-      const games = response.data.split("\n").map((line: string) => {
-        const parts = line.split(", ");
-        const gameId = parts[0].split(": ")[1];
-        const opponent = parts[1].split(": ")[1];
-        const remainingTime = parts[2].split(": ")[1];
-        const gamemode = parts[3].split(": ")[1];
-  
-        return {
-          game_id: gameId,
-          opponent: opponent,
-          remaining_time: remainingTime,
-          gamemode: gamemode,
-        };
-      });
-  
+      // Backend JSON döner: { games: [{ id, opponentId, opponentName, gamemode, remainingTime }], next_cursor }
+      const response = await axios.get(`${BASE_URL}/active-games/${userId}`);
+
+      const games = (response.data?.games ?? []).map((game: any) => ({
+        game_id: game.id,
+        opponent: game.opponentName,
+        remaining_time: game.remainingTime,
+        gamemode: game.gamemode,
+      }));
+
       setActiveGames(games);
     } catch (error) {
       console.log('Aktif oyunlar alınırken hata:', error);
@@ -33,6 +33,9 @@ const CompletedGamesScreen = () => {
   const [completedGames, setCompletedGames] = useState<any[]>([]); // Tipi daha belirgin yapabiliriz
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
+  // Sayfalama: backend sonraki sayfa için imleç döner (son sayfada null)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
 
   // 1. Kullanıcı ID'sini al
   useEffect(() => {
@@ -68,12 +71,14 @@ const CompletedGamesScreen = () => {
       const response = await axios.get(`${BASE_URL}/completed-games/${currentUserId}`);
       // Backend text değil JSON döneceği için responseType'a gerek yok ve parse etmeye gerek yok
       console.log("Completed games response:", response.data);
-      if (Array.isArray(response.data)) {
-         setCompletedGames(response.data);
+      if (Array.isArray(response.data?.games)) {
+         setCompletedGames(response.data.games);
+         setNextCursor(response.data.next_cursor ?? null);
       } else {
-         // Backend boş liste [] dönmeli, string değil. Ama güvenlik için kontrol.
+         // Backend { games: [], next_cursor } dönmeli. Ama güvenlik için kontrol.
          setCompletedGames([]);
-         console.warn("Backend'den dizi formatında yanıt gelmedi.");
+         setNextCursor(null);
+         console.warn("Backend'den beklenen formatta yanıt gelmedi.");
       }
 
     } catch (error: any) {
@@ -85,6 +90,23 @@ const CompletedGamesScreen = () => {
     }
   };
 
+  // Liste sonuna gelinince sonraki sayfayı çek
+  const loadMoreCompletedGames = async () => {
+    if (!userId || !nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${BASE_URL}/completed-games/${userId}`, {
+        params: { cursor: nextCursor },
+      });
+      setCompletedGames((previous) => [...previous, ...(response.data?.games ?? [])]);
+      setNextCursor(response.data?.next_cursor ?? null);
+    } catch (error: any) {
+      console.error('Sonraki sayfa alınırken hata:', error.response?.data || error.message || error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // FlatList için renderItem fonksiyonu (küçük iyileştirmelerle)
   const renderItem = ({ item }: { item: any }) => ( // item tipini belirginleştirebiliriz
     <View style={styles.card}>
@@ -144,6 +166,9 @@ const CompletedGamesScreen = () => {
           renderItem={renderItem}
           keyExtractor={(item) => item.id.toString()} // ID'yi string yap
           contentContainerStyle={styles.list}
+          onEndReached={loadMoreCompletedGames}
+          onEndReachedThreshold={0.5}
+          ListFooterComponent={loadingMore ? <ActivityIndicator size="small" color="#4CAF50" /> : null}
           // İsteğe bağlı: Yenileme kontrolü
           // refreshing={loading}
           // onRefresh={() => userId && fetchCompletedGames(userId)}
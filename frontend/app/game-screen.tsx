@@ -46,6 +46,41 @@ const CENTER_COL = 7;
 const screenWidth = Dimensions.get('window').width;
 const letterColors = ['#f44336', '#9c27b0', '#3f51b5', '#009688', '#ff9800', '#795548', '#607d8b'];
 
+// Ödül tahtası düzenleri değişmez; her düzen sunucudan bir kez çekilip burada saklanır
+const boardLayoutCache = new Map<number, Promise<RewardBoard>>();
+const fetchBoardLayout = (layoutId: number): Promise<RewardBoard> => {
+  let layout = boardLayoutCache.get(layoutId);
+  if (!layout) {
+    layout = axios.get(`${BASE_URL}/board-layouts/${layoutId}`).then(res => res.data.cells as RewardBoard);
+    layout.catch(() => boardLayoutCache.delete(layoutId)); // Hata olursa sonraki denemede tekrar çek
+    boardLayoutCache.set(layoutId, layout);
+  }
+  return layout;
+};
+
+// Sunucudan gelen delta'yı (sadece hamlenin değiştirdikleri) son tam durumun üzerine uygular
+const applyGameDelta = (state: any, delta: any) => {
+  const board = { ...(state.game_board || {}) };
+  (delta.placed_tiles || []).forEach((t: any) => { board[`${t.row}_${t.col}`] = t.letter; });
+  const next = {
+    ...state,
+    version: delta.version,
+    game_board: board,
+    score1: delta.score1,
+    score2: delta.score2,
+    turn_order: delta.turn_order,
+    status: delta.status,
+    last_move_info: delta.last_move_info,
+  };
+  // Yeni el ve ödüller sadece hamleyi yapan oyuncuya gönderilir
+  if (delta.hand) {
+    const player = String(delta.hand.user_id) === String(state.user1) ? 'user1' : 'user2';
+    next[`${player}_letters`] = delta.hand.letters;
+    next[`${player}_rewards`] = delta.rewards.items;
+  }
+  return next;
+};
+
 // --- Component ---
 const GameScreen = () => {
   const router = useRouter();
@@ -86,6 +121,8 @@ const GameScreen = () => {
   const pollingIntervalRef = useRef<NodeJS.Timeout | null>(null); // BU ARTIK KALDIRILACAK
   const timerIntervalRef = useRef<NodeJS.Timeout | null>(null);
   const socketRef = useRef<Socket | null>(null);
+  const stateVersionRef = useRef<number>(0); // Uygulanan son durum versiyonu
+  const lastGameStateRef = useRef<any>(null); // Delta'ların uygulanacağı son tam durum
 
   // --- Constants derived from State/Props ---
   const cellSize = zoomed ? 42 : screenWidth * 0.9 / BOARD_SIZE;
@@ -121,11 +158,11 @@ const GameScreen = () => {
    const fetchUsernames = useCallback(async (myId: string, oppId: string) => {
     if (!myId || !oppId) return;
     try {
-      const [myRes, oppRes] = await Promise.all([
-        axios.get(`${BASE_URL}/user/${myId}`), // <span> kaldırıldı
-        axios.get(`${BASE_URL}/user/${oppId}`)  // <span> kaldırıldı
-      ]);      setUsername(myRes.data.username || 'Sen');
-      const oppName = oppRes.data.username || 'Rakip';
+      // İki kullanıcı tek istekte (backend önbelleğinden)
+      const res = await axios.get(`${BASE_URL}/users`, { params: { ids: `${myId},${oppId}` } });
+      const users = res.data.users || {};
+      setUsername(users[myId]?.username || 'Sen');
+      const oppName = users[oppId]?.username || 'Rakip';
       setOpponentUsername(oppName);
       // Sıra mesajını burada set et (turnOrder state'ine göre)
       //setTurnMessage(turnOrder === myId ? 'Sıra sende' : `Sıra ${oppName}'da`);
@@ -140,6 +177,13 @@ const GameScreen = () => {
     }
   }, [isMyTurn, opponentUsername, isLoading, userId]);
 
+  const loadRewardBoard = useCallback((layoutId: number | null | undefined) => {
+    if (layoutId == null) return;
+    fetchBoardLayout(layoutId)
+      .then(setRewardBoardData)
+      .catch(error => console.error("Ödül tahtası düzeni alınamadı:", error));
+  }, []);
+
   const updateGameState = useCallback((gameState: any, currentUserId: string | null) => {
     if (!gameState || !currentUserId) return;
     console.log("[updateGameState] Updating state with:", gameState);
@@ -147,7 +191,7 @@ const GameScreen = () => {
     try {
         const fetchedBoardState = parseJsonObject(gameState.game_board) as BoardState;
         setBoardState(fetchedBoardState);
-        setRewardBoardData(parseJsonObject(gameState.reward_punishment_board) as RewardBoard);
+        loadRewardBoard(gameState.board_layout_id);
         const fetchedRemainingLetters = parseJsonObject(gameState.remaining_letters) as RemainingLetters;
         setRemainingLettersData(fetchedRemainingLetters);
 
@@ -243,7 +287,7 @@ const GameScreen = () => {
          console.error("updateGameState içinde hata:", error);
          setErrorMessage("Oyun durumu işlenirken hata.");
     }
-  }, [opponentId, opponentUsername, turnOrder, isMyTurn, currentMoveTiles.length, fetchUsernames]);
+  }, [opponentId, opponentUsername, turnOrder, isMyTurn, currentMoveTiles.length, fetchUsernames, loadRewardBoard]);
 
   // --- Game State Fetching & Initialization ---
   const initializeGame = useCallback(async (currentUserId: string) => {
@@ -253,14 +297,17 @@ const GameScreen = () => {
     setIsFetching(true);
 
     try {
-      const response = await axios.get(`${BASE_URL}/game/${game_id}/initialize`);
+      // Sunucu sadece isteyen oyuncunun elini döndürür
+      const response = await axios.get(`${BASE_URL}/game/${game_id}/initialize`, { params: { user_id: currentUserId } });
       const gameState = response.data;
       if (!gameState || !gameState.id) throw new Error("Sunucudan geçerli oyun durumu alınamadı.");
+      stateVersionRef.current = gameState.version ?? 0;
+      lastGameStateRef.current = { ...gameState, game_board: parseJsonObject(gameState.game_board) };
 
       // State güncellemeleri
       const fetchedBoardState = parseJsonObject(gameState.game_board) as BoardState;
       setBoardState(fetchedBoardState);
-      setRewardBoardData(parseJsonObject(gameState.reward_punishment_board) as RewardBoard);
+      loadRewardBoard(gameState.board_layout_id);
       const fetchedRemainingLetters = parseJsonObject(gameState.remaining_letters) as RemainingLetters;
       setRemainingLettersData(fetchedRemainingLetters);
 
@@ -343,7 +390,7 @@ const GameScreen = () => {
       setIsFetching(false);
       // (isLoading) setIsLoading(false); // İlk yüklemeyi de bitir
     }
-  }, [game_id, isMyTurn, turnOrder, opponentId, opponentUsername, currentMoveTiles.length]); // Bağımlılıklar güncellendi
+  }, [game_id, isMyTurn, turnOrder, opponentId, opponentUsername, currentMoveTiles.length, loadRewardBoard]); // Bağımlılıklar güncellendi
 
 
   useEffect(() => {
@@ -358,18 +405,37 @@ const GameScreen = () => {
         socketRef.current = io(BASE_URL, {
             reconnectionAttempts: 3, // Tekrar bağlanma denemesi
             timeout: 10000,         // Bağlantı zaman aşımı
+            // Oyuncu odasına (kendi elinin güncellemeleri) sadece oturum anahtarı doğrulanan bağlantı katılabilir
+            auth: (cb) => { AsyncStorage.getItem('session_token').then((token) => cb({ token })); },
         });
 
         // Bağlantı başarılı olunca odaya katıl
         socketRef.current.on('connect', () => {
             console.log('Socket connected! ID:', socketRef.current?.id);
             console.log(`Emitting join_game for room: ${game_id}`);
-            socketRef.current?.emit('join_game', { game_id: game_id });
+            socketRef.current?.emit('join_game', { game_id: game_id, user_id: userId });
+            // Yeniden bağlanırken kaçırılmış olabilecek delta'lar için tam durumu iste
+            if (lastGameStateRef.current) socketRef.current?.emit('request_resync', { game_id: game_id });
         });
 
         // Sunucudan oyun güncellemesi gelince state'i güncelle
-        socketRef.current.on('game_updated', (updatedGameState) => {
-            console.log('Received game_updated event via WebSocket');
+        socketRef.current.on('game_updated', (update) => {
+            console.log(`Received game_updated (${update.type}, v${update.version}) via WebSocket`);
+            let updatedGameState = update;
+            if (update.type === 'delta') {
+                if (update.version <= stateVersionRef.current) return; // Zaten uygulanmış
+                if (update.base_version !== stateVersionRef.current || !lastGameStateRef.current) {
+                    // Arada kaçırılmış güncelleme var, tam durumu iste
+                    console.warn(`Version gap (have v${stateVersionRef.current}, got base v${update.base_version}), requesting resync.`);
+                    socketRef.current?.emit('request_resync', { game_id: game_id });
+                    return;
+                }
+                updatedGameState = applyGameDelta(lastGameStateRef.current, update);
+            } else if (update.version < stateVersionRef.current) {
+                return; // Eski tam durum
+            }
+            stateVersionRef.current = updatedGameState.version;
+            lastGameStateRef.current = updatedGameState;
             // Gelen veriyle state'i güncellemek için updateGameState'i kullan
             // Hamleyi kendimiz yaptıysak bu güncelleme gereksiz olabilir ama
             // genellikle senkronizasyon için yine de yapmak iyidir.
@@ -406,7 +472,7 @@ const GameScreen = () => {
         // Cleanup: Component kaldırıldığında bağlantıyı kes
         return () => {
             console.log('Disconnecting socket...');
-            socketRef.current?.emit('leave_game', { game_id: game_id }); // Odadan ayrıl (opsiyonel)
+            socketRef.current?.emit('leave_game', { game_id: game_id, user_id: userId }); // Odadan ayrıl (opsiyonel)
             socketRef.current?.disconnect();
         };
     }
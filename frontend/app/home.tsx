@@ -39,11 +39,11 @@ const HomeScreen = () => {
     console.log("Logout işlemi başlatıldı...");
     try {
       // Silinecek anahtarları bir dizi içinde belirt
-      const keysToRemove = ['user_id', 'username'];
+      const keysToRemove = ['user_id', 'username', 'session_token'];
       // AsyncStorage'dan belirtilen anahtarları sil
       await AsyncStorage.multiRemove(keysToRemove);
   
-      console.log("AsyncStorage temizlendi (user_id, username).");
+      console.log("AsyncStorage temizlendi (user_id, username, session_token).");
   
       // Başarıyla silindikten sonra Login ekranına yönlendir ve geçmişi temizle
       router.replace('/login'); // push yerine replace kullan
@@ -37,6 +37,8 @@ const LoginScreen = () => {
 
       await AsyncStorage.setItem('user_id', userId.toString());
       await AsyncStorage.setItem('username', username.toString());
+      // Socket.IO bağlantısı oyuncu odasına katılırken kimliğini bu anahtarla doğrular
+      await AsyncStorage.setItem('session_token', response.data.token);
 
       Alert.alert('Başarılı', 'Giriş başarılı!');
       router.replace('/home');
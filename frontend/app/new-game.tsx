@@ -135,7 +135,8 @@ const NewGameScreen = () => {
   }, [game_id, user_id]);
   const initializeGame = async () => {
     try {
-      const response = await axios.get(`${BASE_URL}/game/${game_id}/initialize`);
+      // Sunucu sadece isteyen oyuncunun elini döndürür
+      const response = await axios.get(`${BASE_URL}/game/${game_id}/initialize`, { params: { user_id } });
       console.log("Backend'den gelen yanıt:", response.data);
   
       const data = response.data;
@@ -172,11 +173,12 @@ const NewGameScreen = () => {
 
   const fetchUsernames = async (myId: string, oppId: string) => {
     try {
-      const myRes = await axios.get(`${BASE_URL}/user/${myId}`);
-      const oppRes = await axios.get(`${BASE_URL}/user/${oppId}`);
+      // İki kullanıcı tek istekte
+      const res = await axios.get(`${BASE_URL}/users`, { params: { ids: `${myId},${oppId}` } });
+      const users = res.data.users || {};
 
-      setUsername(myRes.data.username);
-      setOpponentUsername(oppRes.data.username);
+      setUsername(users[myId]?.username);
+      setOpponentUsername(users[oppId]?.username);
     } catch (error) {
       console.error('Kullanıcı adları alınırken hata:', error);
     }
@@ -1,16 +1,32 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { View, Text, ActivityIndicator, StyleSheet, TouchableOpacity, Alert } from 'react-native';
 import { useRouter , useLocalSearchParams } from 'expo-router';
-import axios from 'axios';
+import { io, Socket } from 'socket.io-client';
 import AsyncStorage from '@react-native-async-storage/async-storage';
 
 const BASE_URL = 'http://192.168.0.11:5000';
+const QUEUE_TIMEOUT_MS = 60000; // Bu sürede rakip bulunamazsa arama iptal edilir
+const PAIRING_TIMEOUT_MS = 30000; // Rakip seçildikten sonra 'match_found' için beklenecek en uzun süre
 
 const WaitingNewOpponent = () => {
   const router = useRouter();
   const { duration } = useLocalSearchParams();
   const [loading, setLoading] = useState(true);
   const [userId, setUserId] = useState<string | null>(null);
+  const socketRef = useRef<Socket | null>(null);
+  const timeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const timedOutRef = useRef(false); // İptal isteğini kullanıcı değil zaman aşımı gönderdi
+
+  const clearQueueTimeout = () => {
+    if (timeoutRef.current) clearTimeout(timeoutRef.current);
+    timeoutRef.current = null;
+  };
+
+  const giveUp = () => {
+    clearQueueTimeout();
+    socketRef.current?.disconnect();
+    setLoading(false);
+  };
 
   useEffect(() => {
     const getUserId = async () => {
@@ -27,58 +43,99 @@ const WaitingNewOpponent = () => {
     };
 
     getUserId();
+
+    // Cleanup: Sayfadan çıkılırsa bağlantıyı kes (sunucu kuyruktan otomatik çıkarır)
+    return () => {
+      clearQueueTimeout();
+      socketRef.current?.disconnect();
+    };
   }, [duration]);
 
-  const findOpponent = async (userId: string, gameDuration: string) => {
-    try {
-      const response = await axios.post(`${BASE_URL}/find-opponent`, {
+  // Rakip arama Socket.IO üzerinden yapılır; sunucu eşleşince 'match_found' gönderir
+  const findOpponent = (userId: string, gameDuration: string) => {
+    socketRef.current?.disconnect();
+    clearQueueTimeout();
+    timedOutRef.current = false;
+    setLoading(true);
+    socketRef.current = io(BASE_URL, {
+      reconnectionAttempts: 3,
+      timeout: 10000,
+    });
+
+    socketRef.current.on('connect', () => {
+      socketRef.current?.emit('queue_join', {
         user_id: userId,
         game_duration: gameDuration,
       });
-  
-      if (response.data.opponentFound) {
-        // Eşleşme bulunduysa new-game sayfasına yönlendiriyoruz
-        router.push({
-          pathname: '/game-screen',
-          params: {
-            game_id: response.data.game_id,
-            user_id: userId,
-            opponent_id: response.data.opponent_id,
-            duration: gameDuration,
-          },
-        });
+      // Sunucu soket kuyruğunda süre tutmaz: süre dolunca aramayı iptal et (yeniden bağlanınca süre uzamaz)
+      if (!timeoutRef.current) {
+        timeoutRef.current = setTimeout(() => {
+          timedOutRef.current = true;
+          socketRef.current?.emit('queue_cancel');
+        }, QUEUE_TIMEOUT_MS);
+      }
+    });
+
+    socketRef.current.on('match_found', (data) => {
+      // Eşleşme bulunduysa game-screen sayfasına yönlendiriyoruz
+      clearQueueTimeout();
+      socketRef.current?.disconnect();
+      router.push({
+        pathname: '/game-screen',
+        params: {
+          game_id: data.game_id,
+          user_id: userId,
+          opponent_id: data.opponent_id,
+          duration: gameDuration,
+        },
+      });
+    });
+
+    socketRef.current.on('match_error', (data) => {
+      console.error('Rakip bulma hatası:', data?.message);
+      giveUp();
+      Alert.alert('Hata', 'Rakip bulma işlemi sırasında bir hata oluştu.');
+    });
+
+    socketRef.current.on('queue_cancelled', (data) => {
+      if (!data?.cancelled) {
+        // Rakip zaten seçildi, oyun oluşturuluyor: 'match_found' (veya 'match_error') beklenir
+        console.log('İptal edilemedi, eşleşme tamamlanıyor.');
+        clearQueueTimeout();
+        timeoutRef.current = setTimeout(() => {
+          giveUp();
+          Alert.alert('Hata', 'Oyun oluşturulamadı. Lütfen tekrar deneyin.');
+        }, PAIRING_TIMEOUT_MS);
+        return;
+      }
+      console.log('Arama iptal edildi.');
+      if (timedOutRef.current) {
+        giveUp(); // Süre doldu: "Rakip bulunamadı" gösterilir
       } else {
-        setLoading(false);
-        Alert.alert('Bilgi', 'Rakip bulunamadı, yeniden deneyin.');
+        clearQueueTimeout();
+        socketRef.current?.disconnect();
         router.push('/home');
       }
-    } catch (error) {
-      console.error('Rakip bulma hatası:', error);
-      setLoading(false);
-      Alert.alert('Hata', 'Rakip bulma işlemi sırasında bir hata oluştu.');
-    }
+    });
+
+    socketRef.current.on('connect_error', (error) => {
+      console.error('Socket connection error:', error);
+      giveUp();
+      Alert.alert('Hata', 'Sunucuya bağlanılamadı. İnternetinizi kontrol edin.');
+    });
   };
   
 
-  const handleCancel = async () => {
+  const handleCancel = () => {
     if (!userId) {
       Alert.alert("Hata", "Kullanıcı kimliği bulunamadı.");
       return;
     }
-    try {
-      const response = await axios.post(`${BASE_URL}/cancel-find-opponent`, {
-        user_id: userId
-      });
-  
-      if (response.data.cancelled) {
-        console.log('İptal isteği başarıyla gönderildi.');
-        router.push('/home');
-      } else {
-         Alert.alert('Hata', 'İptal işlemi sunucu tarafından onaylanmadı.');
-      }
-    } catch (error: any) {
-      console.error('İptal etme hatası:', error.response || error.message);
-      Alert.alert('Hata', 'Arama iptal edilirken bir sorun oluştu.');
+    if (socketRef.current?.connected) {
+      timedOutRef.current = false;
+      socketRef.current.emit('queue_cancel');
+    } else {
+      router.push('/home');
     }
   };
 